@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -11,11 +11,36 @@ class ForecastRequest(BaseModel):
     target_column: str
     periods: int = 30
     frequency: str = 'D'
-    model_type: str = 'prophet'
+    model_type: str = 'prophet'  # or 'lstm', 'seasonal_naive', 'ses', 'holt', 'holt_winters', 'linear_trend'
     data: Optional[List[Dict[str, Any]]] = None
     file_path: Optional[str] = None
+    params: Optional[Dict[str, Any]] = None
+    model_id: Optional[str] = None
+    # file_path inputs: date range to load and how rows are aggregated to frequency
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    aggregation: str = 'none'  # 'sum', 'mean', 'count', or 'none' to train on the raw rows
+    # Inline base64 plots; otherwise fetch GET /{forecast_id}/plot when needed
+    include_plots: bool = False
+    # Downsample long forecasts for charting ('lttb' or 'minmax')
+    max_points: Optional[int] = Field(None, ge=3)
+    downsample: str = Field('lttb', pattern='^(lttb|minmax)$')
+
+class BatchForecastRequest(ForecastRequest):
+    # Long-format data: one row per series and date
+    series_column: str = 'series_id'
+
+class SeriesForecastResult(BaseModel):
+    series_id: Any
+    status: str
+    rows: int
+    seconds: Optional[float] = None
+    forecast: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
 
 class ForecastResult(BaseModel):
     forecast: List[Dict[str, Any]]
     plot: Optional[str] = None
-    components_plot: Optional[str] = None
\ No newline at end of file
+    components_plot: Optional[str] = None
+    model_id: Optional[str] = None
+    forecast_id: Optional[str] = None
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -14,6 +14,8 @@ class SentimentAnalysisRequest(BaseModel):
 
 class BatchSentimentRequest(BaseModel):
     texts: List[str]
+    similarity_threshold: Optional[float] = Field(None, ge=0, le=1)
     
 class BatchSentimentResponse(BaseModel):
-    results: List[SentimentAnalysisResult]
\ No newline at end of file
+    results: List[SentimentAnalysisResult]
+    dedup: Optional[Dict[str, Any]] = None
\ No newline at end of file
@@ -1,83 +1,196 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from typing import Dict, List, Any
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from app.api.services.dashboard_service import DashboardService
+from app.core.data.response_cache import ResponseCache, make_etag, etag_matches
+from app.core.data.broadcast import DeltaBroadcaster, format_sse
+from pydantic import BaseModel
+from typing import Callable, Dict, List, Any, Optional
+from datetime import datetime, date
+import json
+import os
 
 router = APIRouter()
+dashboard_service = DashboardService()
+
+# Serialized dashboard responses; ETags follow the store's data version, and
+# every store write drops the now unreachable entries
+response_cache = ResponseCache(max_entries=int(os.getenv("DASHBOARD_RESPONSE_CACHE_ENTRIES", "256")))
+dashboard_service.add_store_listener(response_cache.invalidate)
+
+# Live deltas for /stream; the state is computed once per data change and
+# shared by every subscriber
+dashboard_stream = DeltaBroadcaster(
+    compute_state=dashboard_service.get_live_state,
+    max_subscribers=int(os.getenv("DASHBOARD_STREAM_MAX_SUBSCRIBERS", "500"))
+)
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("DASHBOARD_STREAM_HEARTBEAT_SECONDS", "15"))
+
+def data_version(freshness: Dict[str, Any]) -> str:
+    """Version token of the data behind dashboard responses"""
+    version = f"{freshness['source']}:{freshness['version']}"
+    if freshness["source"] == "sample":
+        # Sample data is generated relative to today
+        version += f":{date.today().isoformat()}"
+    return version
+
+def publish_dashboard_delta(*args: Any) -> int:
+    """Push what changed to stream subscribers; registered as a store write listener"""
+    return dashboard_stream.publish(data_version(dashboard_service.freshness()))
+
+dashboard_service.add_store_listener(publish_dashboard_delta)
+
+def freshness_headers(freshness: Dict[str, Any]) -> Dict[str, str]:
+    """Expose the data version and last update time as response headers"""
+    headers = {"X-Data-Source": freshness["source"], "X-Data-Version": str(freshness["version"])}
+    if freshness["updated_at"]:
+        headers["X-Data-Updated-At"] = freshness["updated_at"]
+    return headers
+
+def cached_json(request: Request, compute: Callable[[], Any]) -> Response:
+    """
+    Serve a JSON payload through the response cache with conditional GET.
+
+    The ETag is derived from the path, query parameters and data version, so
+    an unchanged poll is answered with 304 before anything is computed, and
+    clients asking for the same view share one serialized body.
+    """
+    freshness = dashboard_service.freshness()
+    etag = make_etag(request.url.path, request.query_params.multi_items(), data_version(freshness))
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **freshness_headers(freshness)}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(etag)
+    headers["X-Cache"] = "HIT" if body is not None else "MISS"
+    if body is None:
+        body = json.dumps(jsonable_encoder(compute()), separators=(",", ":")).encode("utf-8")
+        response_cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/metrics")
-def get_dashboard_metrics():
-    """Get key metrics for the dashboard"""
+def get_dashboard_metrics(request: Request,
+                          days: int = Query(30, ge=1, le=3660),
+                          max_points: Optional[int] = Query(None, ge=3),
+                          downsample: str = Query('lttb', pattern="^(lttb|minmax)$")):
+    """Get key metrics for the dashboard; max_points downsamples the daily trend"""
     try:
-        # In a real application, these would come from a database
-        # For now, we'll generate some sample data
-        
-        # Calculate date range for the past 30 days
-        today = datetime.now()
-        date_range = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(30)]
-        date_range.reverse()  # Oldest to newest
-        
-        # Generate sample metrics
-        sentiment_scores = {
-            "positive": 0.65,
-            "neutral": 0.25,
-            "negative": 0.10,
-            "average_score": 0.75
-        }
-        
-        engagement_metrics = {
-            "total_interactions": 12500,
-            "response_time_avg": 3.5,  # hours
-            "resolution_rate": 0.85,
-            "daily_trend": [5.5, 6.2, 7.0, 6.8, 7.5, 8.0, 8.2, 8.1, 7.9, 8.5,
-                           8.6, 8.7, 8.5, 8.3, 8.2, 8.0, 8.1, 8.3, 8.5, 8.6,
-                           8.8, 8.7, 8.5, 8.4, 8.2, 8.1, 8.3, 8.5, 8.7, 8.8]
-        }
-        
-        demand_forecast = {
-            "dates": [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(1, 15)],
-            "values": [120, 125, 130, 128, 135, 140, 138, 142, 145, 150, 155, 152, 158, 160]
-        }
-        
-        # Return combined metrics
-        return {
-            "sentiment": sentiment_scores,
-            "engagement": engagement_metrics,
-            "forecast": demand_forecast,
-            "date_range": date_range
-        }
+        # Read from the pre-aggregated metrics store; sample data until something is ingested
+        return cached_json(request, lambda: dashboard_service.get_metrics(days, max_points, downsample))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sentiment-over-time")
-def get_sentiment_over_time():
-    """Get sentiment analysis results over time"""
+def get_sentiment_over_time(request: Request,
+                            days: int = Query(30, ge=1, le=3660),
+                            start: Optional[datetime] = None,
+                            end: Optional[datetime] = None,
+                            granularity: str = Query('day', pattern="^(hour|day|week)$"),
+                            platform: Optional[str] = None,
+                            product: Optional[str] = None,
+                            max_points: Optional[int] = Query(None, ge=3),
+                            downsample: str = Query('lttb', pattern="^(lttb|minmax)$")):
+    """
+    Get sentiment analysis results over time.
+
+    Without start/end, covers the last `days` days up to the latest data.
+    Ranges are answered from hour/day/week rollups, so long ranges cost the
+    same as short ones. With max_points, long series are downsampled
+    (Largest-Triangle-Three-Buckets or per-bucket min/max) to keep the chart's
+    shape; the downsampled body is cached like any other response.
+    """
     try:
-        # Calculate date range for the past 30 days
-        today = datetime.now()
-        date_range = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(30)]
-        date_range.reverse()  # Oldest to newest
-        
-        # Generate random sentiment data
-        np.random.seed(42)  # For reproducibility
-        positive_trend = np.linspace(0.50, 0.70, 30) + np.random.normal(0, 0.05, 30)
-        neutral_trend = np.linspace(0.30, 0.20, 30) + np.random.normal(0, 0.03, 30)
-        negative_trend = np.linspace(0.20, 0.10, 30) + np.random.normal(0, 0.02, 30)
-        
-        # Normalize to ensure they sum to 1.0
-        sentiment_data = []
-        for i in range(len(date_range)):
-            total = positive_trend[i] + neutral_trend[i] + negative_trend[i]
-            sentiment_data.append({
-                "date": date_range[i],
-                "positive": round(positive_trend[i] / total, 2),
-                "neutral": round(neutral_trend[i] / total, 2),
-                "negative": round(negative_trend[i] / total, 2)
-            })
-        
-        return sentiment_data
+        return cached_json(request, lambda: dashboard_service.get_sentiment_over_time(
+            days=days, start=start, end=end, granularity=granularity, platform=platform, product=product,
+            max_points=max_points, downsample=downsample
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stream")
+async def stream_dashboard(request: Request):
+    """
+    Stream live dashboard updates as server-sent events.
+
+    Sends a "snapshot" event with the full metrics, then a "delta" event with
+    only the changed fields after each data change; the event id is the data
+    version. Nested objects in a delta are partial, and a null value means
+    the field was removed. A slow client receives the merged latest delta instead of every
+    intermediate one. Between changes a comment is sent every heartbeat, which
+    also picks up writes made by other API workers sharing the store.
+    """
+    try:
+        subscription = dashboard_stream.subscribe()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    try:
+        version = data_version(await run_in_threadpool(dashboard_service.freshness))
+        snapshot = await run_in_threadpool(dashboard_stream.snapshot, version)
+    except Exception as e:
+        dashboard_stream.unsubscribe(subscription)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        try:
+            yield format_sse(jsonable_encoder(snapshot), "snapshot", version)
+            while not await request.is_disconnected():
+                update = await subscription.next(STREAM_HEARTBEAT_SECONDS)
+                if update is not None:
+                    delta, delta_version = update
+                    yield format_sse(jsonable_encoder(delta), "delta", delta_version)
+                    continue
+                yield ": heartbeat\n\n"
+                # No-op unless the version moved without a write in this process
+                await run_in_threadpool(publish_dashboard_delta)
+        finally:
+            dashboard_stream.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stream-stats")
+def get_dashboard_stream_stats():
+    """Get subscriber, computation and coalescing counters of the live stream"""
+    return dashboard_stream.stats()
+
+class IngestRequest(BaseModel):
+    # Transformed file written by the data pipeline (transformed_data_*.csv)
+    file_path: str
+    refresh_forecast: bool = True
+
+@router.post("/ingest")
+def ingest_pipeline_output(request: IngestRequest):
+    """Fold a pipeline output file into the dashboard metrics; files are ingested once"""
+    try:
+        return dashboard_service.ingest_file(request.file_path, refresh_forecast=request.refresh_forecast)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/cache/invalidate")
+def invalidate_dashboard_cache():
+    """
+    Invalidate cached dashboard responses after data changed outside the API.
+
+    Bumps the data version, so ETags held by clients and by other API workers
+    sharing the store stop matching too.
+    """
+    dashboard_service.store.touch()
+    return {"invalidated": True, "freshness": dashboard_service.freshness()}
+
+@router.get("/cache-stats")
+def get_dashboard_cache_stats():
+    """Get hit/miss and 304 counters of the dashboard response cache"""
+    return response_cache.stats()
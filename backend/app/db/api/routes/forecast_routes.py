@@ -1,74 +1,342 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.core.ai.time_series_forecasting import TimeSeriesForecaster
+from app.api.services.forecast_service import ForecastService, load_training_data, run_training_job
+from app.core.ai.training_jobs import TrainingJobQueue, QueueFullError, SUCCEEDED, FAILED
+from app.core.ai.forecast_plots import PLOT_FORMATS
+from app.api.models.forecast import ForecastRequest, BatchForecastRequest
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import pandas as pd
+import threading
+import json
+import time
+import os
 
 router = APIRouter()
+forecast_service = ForecastService()
 
-class ForecastRequest(BaseModel):
-    date_column: str
-    target_column: str
-    periods: int = 30
-    frequency: str = 'D'
-    model_type: str = 'prophet'
-    data: Optional[List[Dict[str, Any]]] = None
-    file_path: Optional[str] = None
+_training_queue: Optional[TrainingJobQueue] = None
+_training_queue_lock = threading.Lock()
+
+def get_training_queue() -> TrainingJobQueue:
+    """Create the background training queue on first use"""
+    global _training_queue
+    with _training_queue_lock:
+        if _training_queue is None:
+            _training_queue = TrainingJobQueue(
+                run_training_job,
+                db_path=os.getenv("TRAINING_JOBS_DB", "data/cache/training_jobs.sqlite"),
+                max_workers=int(os.getenv("TRAINING_MAX_WORKERS", "2")),
+                max_queued=int(os.getenv("TRAINING_MAX_QUEUED", "32")),
+                max_finished=int(os.getenv("TRAINING_KEEP_FINISHED", "1000")),
+                finished_ttl=float(os.getenv("TRAINING_FINISHED_TTL_HOURS", "168")) * 3600
+            )
+        return _training_queue
+
+@router.on_event("startup")
+def resume_training_jobs():
+    """Resubmit training jobs interrupted by the last shutdown"""
+    get_training_queue()
+
+@router.on_event("shutdown")
+def stop_training_jobs():
+    """Stop training workers; unfinished jobs resume on the next start"""
+    if _training_queue is not None:
+        _training_queue.shutdown(wait=False)
 
-@router.post("/train")
+def load_request_data(request: ForecastRequest) -> pd.DataFrame:
+    """Use provided data or load from file"""
+    try:
+        return load_training_data(request.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/train", status_code=202)
 def train_forecast_model(request: ForecastRequest):
-    """Train a forecasting model"""
+    """Enqueue a training job and return its job_id"""
+    if not request.data and not request.file_path:
+        raise HTTPException(status_code=400, detail="No data or file path provided")
     try:
-        forecaster = TimeSeriesForecaster(model_type=request.model_type)
+        job_id = get_training_queue().submit(request.dict(exclude={"model_id"}))
+        return {"job_id": job_id, "status": "queued"}
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs")
+def list_training_jobs(status: Optional[str] = None, limit: int = 100):
+    """List recent training jobs and the queue depth"""
+    queue = get_training_queue()
+    return {"jobs": queue.list(status, limit), "queue": queue.stats()}
+
+@router.get("/jobs/{job_id}")
+def get_training_job(job_id: str):
+    """Get status and progress of a training job"""
+    job = get_training_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id: {job_id}")
+    return job
+
+@router.get("/jobs/{job_id}/result")
+def get_training_job_result(job_id: str):
+    """Get the training result (including model_id) of a finished job"""
+    job = get_training_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id: {job_id}")
+    if job["status"] != SUCCEEDED:
+        detail = f"Job is {job['status']}"
+        if job["error"]:
+            detail += f": {job['error']}"
+        raise HTTPException(status_code=409, detail=detail)
+    return job["result"]
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_training_job(job_id: str):
+    """Cancel a queued or running training job"""
+    job = get_training_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id: {job_id}")
+    if job["status"] in (SUCCEEDED, FAILED) and not job["cancel_requested"]:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return job
+
+@router.post("/predict")
+def generate_forecast(request: ForecastRequest):
+    """Generate a forecast from a trained model_id, or from data"""
+    try:
+        if request.model_id:
+            try:
+                return forecast_service.predict(
+                    request.model_id,
+                    periods=request.periods,
+                    frequency=request.frequency,
+                    include_plots=request.include_plots,
+                    max_points=request.max_points,
+                    downsample=request.downsample
+                )
+            except KeyError:
+                raise HTTPException(status_code=404, detail=f"Unknown model_id: {request.model_id}")
         
-        # Use provided data or load from file
-        if request.data:
-            df = pd.DataFrame(request.data)
-        elif request.file_path:
-            df = pd.read_csv(request.file_path)
-        else:
-            raise HTTPException(status_code=400, detail="No data or file path provided")
+        df = load_request_data(request)
         
-        # Train the model
-        result = forecaster.train(
+        # Generate forecast, training only if no registered model matches
+        forecast = forecast_service.generate_forecast(
             data=df,
             date_column=request.date_column,
-            target_column=request.target_column
+            target_column=request.target_column,
+            periods=request.periods,
+            frequency=request.frequency,
+            model_type=request.model_type,
+            source=request.file_path,
+            include_plots=request.include_plots,
+            max_points=request.max_points,
+            downsample=request.downsample,
+            **(request.params or {})
         )
         
-        return result
+        return forecast
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/predict")
-def generate_forecast(request: ForecastRequest):
-    """Generate a forecast"""
+@router.get("/{forecast_id}/plot")
+def get_forecast_plot(forecast_id: str,
+                      format: str = Query('png', pattern='^(png|svg)$'),
+                      width: int = Query(800, ge=200, le=4000),
+                      height: int = Query(400, ge=150, le=4000),
+                      kind: str = Query('forecast', pattern='^(forecast|components)$')):
+    """Render (or serve the cached rendering of) a chart of a previous forecast"""
     try:
-        forecaster = TimeSeriesForecaster(model_type=request.model_type)
-        
-        # Use provided data or load from file
-        if request.data:
-            df = pd.DataFrame(request.data)
-        elif request.file_path:
-            df = pd.read_csv(request.file_path)
-        else:
-            raise HTTPException(status_code=400, detail="No data or file path provided")
-        
-        # Train the model first
-        forecaster.train(
+        image = forecast_service.render_plot(forecast_id, fmt=format, width=width, height=height, kind=kind)
+        return Response(content=image, media_type=PLOT_FORMATS[format],
+                        headers={"Cache-Control": "private, max-age=3600"})
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired forecast_id: {forecast_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{forecast_id}/series")
+def get_forecast_series(forecast_id: str,
+                        max_points: Optional[int] = Query(None, ge=3),
+                        downsample: str = Query('lttb', pattern='^(lttb|minmax)$')):
+    """Get the rows of a previous forecast, downsampled to max_points for charting"""
+    try:
+        return forecast_service.get_forecast_series(forecast_id, max_points=max_points, downsample=downsample)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired forecast_id: {forecast_id}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/plot-stats")
+def get_plot_stats():
+    """Get render and cache counters of the plot renderer"""
+    return forecast_service.renderer.stats()
+
+class BacktestRequest(BaseModel):
+    date_column: str
+    target_column: str
+    model_types: List[str] = ['prophet', 'holt_winters', 'seasonal_naive']
+    horizon: int = 30
+    n_folds: int = 3
+    step: Optional[int] = None
+    frequency: str = 'D'
+    season_length: int = 1
+    data: Optional[List[Dict[str, Any]]] = None
+    file_path: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    aggregation: str = 'none'
+    # Training hyperparameters per model type
+    params: Optional[Dict[str, Dict[str, Any]]] = None
+
+@router.post("/backtest")
+def backtest_forecast_models(request: BacktestRequest):
+    """Compare model types by rolling-origin backtest accuracy and cost"""
+    try:
+        df = load_training_data(request.dict())
+        return forecast_service.backtest(
             data=df,
             date_column=request.date_column,
-            target_column=request.target_column
+            target_column=request.target_column,
+            model_types=request.model_types,
+            horizon=request.horizon,
+            n_folds=request.n_folds,
+            step=request.step,
+            frequency=request.frequency,
+            params=request.params,
+            season_length=request.season_length
         )
-        
-        # Generate forecast
-        forecast = forecaster.predict(
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class HierarchicalForecastRequest(BaseModel):
+    date_column: str
+    target_column: str
+    # Level columns from the top of the tree down, e.g. ['platform', 'product']
+    levels: List[str]
+    periods: int = 30
+    frequency: str = 'D'
+    model_type: str = 'holt_winters'
+    method: str = 'bottom_up'  # or 'top_down', 'ols', 'wls_struct', 'mint_shrink'
+    # Levels ('total' or level columns) to fit base forecasts for; default depends on method
+    forecast_levels: Optional[List[str]] = None
+    data: Optional[List[Dict[str, Any]]] = None
+    file_path: Optional[str] = None
+    params: Optional[Dict[str, Any]] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    aggregation: str = 'none'
+
+@router.post("/hierarchical")
+def generate_hierarchical_forecast(request: HierarchicalForecastRequest):
+    """Forecast a platform/product hierarchy with reconciled, coherent aggregates"""
+    try:
+        df = load_training_data(request.dict())
+        return forecast_service.generate_hierarchical_forecast(
+            data=df,
+            levels=request.levels,
+            date_column=request.date_column,
+            target_column=request.target_column,
             periods=request.periods,
+            frequency=request.frequency,
+            model_type=request.model_type,
+            method=request.method,
+            forecast_levels=request.forecast_levels,
+            **(request.params or {})
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class ModelUpdateRequest(BaseModel):
+    # Only the newly observed rows
+    data: Optional[List[Dict[str, Any]]] = None
+    file_path: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    aggregation: str = 'none'
+    drift_threshold: float = 3.0
+    frequency: str = 'D'
+
+@router.post("/models/{model_id}/update")
+def update_forecast_model(model_id: str, request: ModelUpdateRequest):
+    """Update a trained model with new observations, refitting only on drift"""
+    try:
+        entry = forecast_service.registry.get(model_id)
+        if entry is None:
+            raise KeyError(model_id)
+        # New rows are read with the columns the model was trained on
+        new_data = load_training_data({
+            **request.dict(),
+            "date_column": entry[1]["date_column"],
+            "target_column": entry[1]["target_column"]
+        })
+        return forecast_service.update_model(
+            model_id,
+            new_data,
+            drift_threshold=request.drift_threshold,
             frequency=request.frequency
         )
-        
-        return forecast
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model_id: {model_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/models/{model_id}")
+def delete_forecast_model(model_id: str):
+    """Drop a trained model from the registry"""
+    forecast_service.registry.invalidate(model_id)
+    return {"model_id": model_id, "deleted": True}
+
+@router.post("/batch")
+def generate_batch_forecast(request: BatchForecastRequest):
+    """
+    Forecast every series of a long-format dataset in parallel.
+    
+    Results stream back as NDJSON, one line per series in completion order,
+    each with a "status" of "ok" or "error"; a final "summary" line closes the
+    stream.
+    """
+    df = load_request_data(request)
+    missing = {request.series_column, request.date_column, request.target_column} - set(df.columns)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing columns: {sorted(missing)}")
+    
+    def stream_results():
+        started = time.perf_counter()
+        counts = {"ok": 0, "error": 0}
+        try:
+            for result in forecast_service.generate_batch_forecast(
+                data=df,
+                series_column=request.series_column,
+                date_column=request.date_column,
+                target_column=request.target_column,
+                periods=request.periods,
+                frequency=request.frequency,
+                model_type=request.model_type,
+                **(request.params or {})
+            ):
+                counts[result["status"]] += 1
+                yield json.dumps(result, default=str) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield json.dumps({"error": str(e)}) + "\n"
+        yield json.dumps({"summary": {
+            "series": counts["ok"] + counts["error"],
+            "succeeded": counts["ok"],
+            "failed": counts["error"],
+            "seconds": round(time.perf_counter() - started, 3)
+        }}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
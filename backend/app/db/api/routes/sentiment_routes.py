@@ -1,24 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.core.ai.sentiment_analysis import SentimentAnalyzer
-from pydantic import BaseModel
+from app.core.ai.model_registry import registry, SharedSentimentAnalyzer
+from app.core.ai.batch_scheduler import MicroBatchScheduler
+from app.core.ai.sentiment_cache import CachedSentimentAnalyzer, get_default_cache
+from app.core.ai.near_duplicates import analyze_with_dedup
+from app.core.data.streaming import iter_record_chunks, spool_body, iter_spooled
+from app.core.data.metrics_store import get_default_metrics_store
+from pydantic import BaseModel, Field
 from typing import List, Optional
+import json
+import os
+import threading
 
 router = APIRouter()
-analyzer = SentimentAnalyzer(use_openai=False)  # Default to Hugging Face
+
+# "preload" loads the model at import time so a pre-forking server (gunicorn --preload)
+# shares the weights with its workers; "background" warms it at startup; "lazy" waits
+# for the first request
+WARM_UP_MODE = os.getenv("SENTIMENT_WARM_UP", "background")
+if WARM_UP_MODE == "preload":
+    registry.warm_up(["sentiment-huggingface"], background=False)
+
+# The cached analyzer and the scheduler are created on first use, so importing this
+# module opens no SQLite connection and starts no thread that a pre-forking server
+# would hand to every worker
+_analyzer: Optional[CachedSentimentAnalyzer] = None
+_scheduler: Optional[MicroBatchScheduler] = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer() -> CachedSentimentAnalyzer:
+    """Create the cached sentiment analyzer on first use"""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = CachedSentimentAnalyzer(
+                SharedSentimentAnalyzer(use_openai=False),  # Default to Hugging Face
+                cache=get_default_cache()
+            )
+        return _analyzer
+
+def get_scheduler() -> MicroBatchScheduler:
+    """Create the scheduler that coalesces concurrent single-text requests into batched model calls"""
+    global _scheduler
+    analyzer = get_analyzer()
+    with _analyzer_lock:
+        if _scheduler is None:
+            _scheduler = MicroBatchScheduler(
+                analyzer.analyze_batch,
+                max_batch_size=int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "32")),
+                max_wait_ms=float(os.getenv("SENTIMENT_MAX_WAIT_MS", "5"))
+            )
+        return _scheduler
+
+@router.on_event("startup")
+def warm_up_models():
+    """Start loading the default sentiment model without blocking startup"""
+    if WARM_UP_MODE == "background":
+        registry.warm_up(["sentiment-huggingface"], background=True)
 
 class SentimentRequest(BaseModel):
     text: str
 
 class BatchSentimentRequest(BaseModel):
     texts: List[str]
+    # When set, near-duplicate texts above this similarity share one inference
+    similarity_threshold: Optional[float] = Field(None, ge=0, le=1)
+    # When set, results are recorded in the dashboard metrics under this platform/product
+    platform: Optional[str] = None
+    product: Optional[str] = None
 
 @router.post("/analyze")
 def analyze_sentiment(request: SentimentRequest):
     """Analyze sentiment of a single text"""
     try:
-        result = analyzer.analyze_text(request.text)
+        result = get_scheduler().analyze_text(request.text)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -27,7 +85,77 @@ def analyze_sentiment(request: SentimentRequest):
 def analyze_batch(request: BatchSentimentRequest):
     """Analyze sentiment of multiple texts"""
     try:
-        results = analyzer.analyze_batch(request.texts)
-        return {"results": results}
+        analyzer = get_analyzer()
+        dedup = None
+        if request.similarity_threshold is not None:
+            results, dedup = analyze_with_dedup(
+                request.texts, analyzer.analyze_batch, request.similarity_threshold
+            )
+        else:
+            results = analyzer.analyze_batch(request.texts)
+        
+        if request.platform:
+            get_default_metrics_store().record_sentiment(results, request.platform, request.product)
+        return {"results": results, "dedup": dedup} if dedup is not None else {"results": results}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch/stream")
+async def analyze_batch_stream(request: Request,
+                               chunk_size: int = Query(256, ge=1, le=10000),
+                               offset: int = Query(0, ge=0)):
+    """
+    Analyze an NDJSON (or plain text, one per line) upload as a stream.
+
+    Results are written back as NDJSON, one line per input, each carrying its
+    input "index". After a disconnect, resend the input with offset set to the
+    last received index + 1 to resume.
+    """
+    ndjson = not request.headers.get("content-type", "").startswith("text/plain")
+    # Read the body before streaming starts (see spool_body); large uploads spill to disk
+    body = await spool_body(request.stream())
+
+    async def stream_results():
+        next_index = offset
+        try:
+            async for start, records in iter_record_chunks(
+                iter_spooled(body), chunk_size, offset=offset, ndjson=ndjson
+            ):
+                results = await run_in_threadpool(
+                    get_analyzer().analyze_batch, [record["text"] for record in records]
+                )
+                lines = []
+                for i, (record, result) in enumerate(zip(records, results)):
+                    line = {"index": start + i, **result}
+                    if "id" in record:
+                        line["id"] = record["id"]
+                    lines.append(json.dumps(line, default=str))
+                next_index = start + len(records)
+                yield "\n".join(lines) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield json.dumps({"error": str(e), "resume_offset": next_index}) + "\n"
+        finally:
+            body.close()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/scheduler-stats")
+def get_scheduler_stats():
+    """Get batch sizes and queue wait times achieved by the request scheduler"""
+    return get_scheduler().stats()
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Get hit/miss counters of the sentiment result cache"""
+    return get_analyzer().cache.stats()
+
+@router.get("/ready")
+def get_readiness():
+    """Report whether the sentiment models are loading or ready"""
+    status = registry.status()
+    default_status = status["models"]["sentiment-huggingface"]["status"]
+    return JSONResponse(
+        status_code=200 if default_status == "ready" else 503,
+        content={"status": default_status, "models": status["models"]}
+    )
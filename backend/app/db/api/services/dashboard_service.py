@@ -0,0 +1,273 @@
+from app.core.data.metrics_store import MetricsStore, get_default_metrics_store, SENTIMENT_LABELS
+from app.core.ai.statistical_forecasting import StatisticalForecaster
+from app.core.data.downsampling import downsample_indices, downsample_records
+from typing import Callable, List, Dict, Any, Optional
+from datetime import datetime, timedelta
+import threading
+import pandas as pd
+import numpy as np
+
+DEMAND_FORECAST_SNAPSHOT = "demand_forecast"
+
+def sample_dashboard_metrics() -> Dict[str, Any]:
+    """Sample metrics shown until real data has been ingested"""
+    # Calculate date range for the past 30 days
+    today = datetime.now()
+    date_range = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(30)]
+    date_range.reverse()  # Oldest to newest
+    
+    # Generate sample metrics
+    sentiment_scores = {
+        "positive": 0.65,
+        "neutral": 0.25,
+        "negative": 0.10,
+        "average_score": 0.75
+    }
+    
+    engagement_metrics = {
+        "total_interactions": 12500,
+        "response_time_avg": 3.5,  # hours
+        "resolution_rate": 0.85,
+        "daily_trend": [5.5, 6.2, 7.0, 6.8, 7.5, 8.0, 8.2, 8.1, 7.9, 8.5,
+                       8.6, 8.7, 8.5, 8.3, 8.2, 8.0, 8.1, 8.3, 8.5, 8.6,
+                       8.8, 8.7, 8.5, 8.4, 8.2, 8.1, 8.3, 8.5, 8.7, 8.8]
+    }
+    
+    return {
+        "sentiment": sentiment_scores,
+        "engagement": engagement_metrics,
+        "forecast": sample_demand_forecast(),
+        "date_range": date_range
+    }
+
+def sample_demand_forecast() -> Dict[str, Any]:
+    """Sample demand forecast shown until one has been computed from real data"""
+    today = datetime.now()
+    return {
+        "dates": [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(1, 15)],
+        "values": [120, 125, 130, 128, 135, 140, 138, 142, 145, 150, 155, 152, 158, 160]
+    }
+
+def sample_sentiment_over_time() -> List[Dict[str, Any]]:
+    """Sample sentiment shares shown until real data has been ingested"""
+    # Calculate date range for the past 30 days
+    today = datetime.now()
+    date_range = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(30)]
+    date_range.reverse()  # Oldest to newest
+    
+    # Generate random sentiment data
+    np.random.seed(42)  # For reproducibility
+    positive_trend = np.linspace(0.50, 0.70, 30) + np.random.normal(0, 0.05, 30)
+    neutral_trend = np.linspace(0.30, 0.20, 30) + np.random.normal(0, 0.03, 30)
+    negative_trend = np.linspace(0.20, 0.10, 30) + np.random.normal(0, 0.02, 30)
+    
+    # Normalize to ensure they sum to 1.0
+    sentiment_data = []
+    for i in range(len(date_range)):
+        total = positive_trend[i] + neutral_trend[i] + negative_trend[i]
+        sentiment_data.append({
+            "date": date_range[i],
+            "positive": round(positive_trend[i] / total, 2),
+            "neutral": round(neutral_trend[i] / total, 2),
+            "negative": round(negative_trend[i] / total, 2)
+        })
+    
+    return sentiment_data
+
+class DashboardService:
+    def __init__(self, store: MetricsStore = None):
+        # The default store is opened on first use, so creating the service at import
+        # time opens no SQLite connection for a pre-forking server to share
+        self._store = store
+        self._store_listeners: List[Callable[..., Any]] = []
+        self._store_lock = threading.Lock()
+    
+    @property
+    def store(self) -> MetricsStore:
+        """Metrics store behind the dashboard, opened on first use"""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    store = get_default_metrics_store()
+                    for listener in self._store_listeners:
+                        store.add_listener(listener)
+                    self._store = store
+        return self._store
+    
+    def add_store_listener(self, listener: Callable[..., Any]):
+        """
+        Call a function after every store write, without opening the store yet
+        
+        Args:
+            listener: Function registered with MetricsStore.add_listener once the store is open
+        """
+        with self._store_lock:
+            if self._store is None:
+                self._store_listeners.append(listener)
+                return
+        self._store.add_listener(listener)
+    
+    def freshness(self) -> Dict[str, Any]:
+        """
+        Get the freshness of the dashboard data
+        
+        Returns:
+            Dictionary with source ("store", or "sample" while nothing has been
+            ingested), data version and last update time
+        """
+        return {"source": "sample" if self.store.is_empty() else "store", **self.store.freshness()}
+    
+    def get_metrics(self, days: int = 30, max_points: Optional[int] = None, downsample: str = 'lttb') -> Dict[str, Any]:
+        """
+        Get key metrics for the dashboard from the pre-aggregated store
+        
+        Args:
+            days: Number of days covered, up to the latest day with data
+            max_points: Downsample the daily trend (and date range) to at most this many days
+            downsample: 'lttb' or 'minmax'
+        
+        Returns:
+            Dictionary with sentiment shares, engagement, demand forecast and freshness
+        """
+        if self.store.is_empty():
+            return {**sample_dashboard_metrics(), "freshness": self.freshness()}
+        
+        daily = self.store.daily_totals(days)
+        by_day = daily.groupby("day")[["posts", "engagement_sum", "interactions"]].sum()
+        by_sentiment = daily.groupby("sentiment")[["posts", "score_sum"]].sum()
+        posts = int(by_sentiment["posts"].sum())
+        
+        sentiment_scores = {
+            label: round(float(by_sentiment["posts"].get(label, 0)) / posts, 4) if posts else 0.0
+            for label in SENTIMENT_LABELS
+        }
+        sentiment_scores["average_score"] = round(float(by_sentiment["score_sum"].sum()) / posts, 4) if posts else None
+        
+        engagement_metrics = {
+            "total_posts": posts,
+            "total_interactions": int(by_day["interactions"].sum()),
+            # Average engagement score per post, per day
+            "daily_trend": (by_day["engagement_sum"] / by_day["posts"]).round(4).tolist()
+        }
+        
+        date_range = by_day.index.tolist()
+        if max_points and len(date_range) > max_points:
+            keep = downsample_indices(date_range, engagement_metrics["daily_trend"], max_points, downsample)
+            engagement_metrics["daily_trend"] = [engagement_metrics["daily_trend"][i] for i in keep]
+            date_range = [date_range[i] for i in keep]
+        
+        return {
+            "sentiment": sentiment_scores,
+            "engagement": engagement_metrics,
+            "forecast": self.store.get_snapshot(DEMAND_FORECAST_SNAPSHOT) or sample_demand_forecast(),
+            "date_range": date_range,
+            "freshness": self.freshness()
+        }
+    
+    def get_live_state(self, days: int = 30) -> Dict[str, Any]:
+        """
+        Get the dashboard state pushed to streaming clients
+        
+        Args:
+            days: Number of days covered
+        
+        Returns:
+            The dashboard metrics without freshness, which travels as the event id
+        """
+        metrics = self.get_metrics(days)
+        metrics.pop("freshness", None)
+        return metrics
+    
+    def get_sentiment_over_time(self,
+                                days: int = 30,
+                                start: Optional[datetime] = None,
+                                end: Optional[datetime] = None,
+                                granularity: str = 'day',
+                                platform: Optional[str] = None,
+                                product: Optional[str] = None,
+                                max_points: Optional[int] = None,
+                                downsample: str = 'lttb') -> List[Dict[str, Any]]:
+        """
+        Get sentiment shares per time bucket from the rollup index
+        
+        Args:
+            days: Range length when start is omitted, ending with the latest data
+            start: Range start (UTC if naive)
+            end: Range end, exclusive (UTC if naive)
+            granularity: 'hour', 'day' or 'week'
+            platform: Only this platform
+            product: Only this product
+            max_points: Return at most this many buckets, selected by their positive share
+            downsample: 'lttb' or 'minmax'
+        
+        Returns:
+            List of dictionaries with date, post count and positive/neutral/negative shares
+        """
+        if self.store.is_empty():
+            rows = sample_sentiment_over_time()
+        else:
+            frame, _ = self.store.sentiment_series(start, end, granularity, platform, product, days=days)
+            counts = frame.pivot_table(index="bucket", columns="sentiment", values="posts", aggfunc="sum", fill_value=0)
+            totals = counts.sum(axis=1)
+            date_format = "%Y-%m-%d" if granularity != "hour" else "%Y-%m-%dT%H:%M:%SZ"
+            rows = [
+                {"date": bucket.strftime(date_format), "posts": int(totals[bucket]),
+                 **{label: round(float(counts.at[bucket, label] / totals[bucket]), 2) if label in counts else 0.0
+                    for label in SENTIMENT_LABELS}}
+                for bucket in counts.index
+            ]
+        
+        if max_points:
+            rows = downsample_records(rows, max_points, x_key="date", y_key="positive", method=downsample)
+        return rows
+    
+    def refresh_demand_forecast(self, periods: int = 14, model_type: str = 'holt_winters') -> Optional[Dict[str, Any]]:
+        """
+        Forecast daily post volume and store it for the dashboard
+        
+        Runs once per ingest rather than per page load; needs two weeks of history.
+        
+        Args:
+            periods: Number of days to forecast
+            model_type: Statistical model type
+        
+        Returns:
+            The stored forecast, or None if there is not enough history
+        """
+        daily = self.store.daily_totals().groupby("day")["posts"].sum()
+        if len(daily) < 14:
+            return None
+        history = daily.reindex(
+            pd.date_range(daily.index.min(), daily.index.max(), freq="D").strftime("%Y-%m-%d"), fill_value=0
+        )
+        
+        forecaster = StatisticalForecaster(model_type=model_type)
+        forecaster.train(
+            data=pd.DataFrame({"ds": pd.to_datetime(history.index), "y": history.to_numpy(dtype=float)}),
+            date_column="ds",
+            target_column="y"
+        )
+        rows = forecaster.predict(periods=periods, frequency="D")["forecast"]
+        forecast = {
+            "dates": [pd.Timestamp(row["ds"]).strftime("%Y-%m-%d") for row in rows],
+            "values": [round(max(float(row["yhat"]), 0.0), 1) for row in rows],
+            "model_type": model_type
+        }
+        self.store.put_snapshot(DEMAND_FORECAST_SNAPSHOT, forecast)
+        return forecast
+    
+    def ingest_file(self, file_path: str, refresh_forecast: bool = True) -> Dict[str, Any]:
+        """
+        Fold a transformed pipeline file into the dashboard metrics
+        
+        Args:
+            file_path: Path of a transformed_data_*.csv file
+            refresh_forecast: Recompute the stored demand forecast afterwards
+        
+        Returns:
+            Dictionary with the rows ingested and the new freshness
+        """
+        result = self.store.ingest_file(file_path)
+        if refresh_forecast and not result["skipped"]:
+            result["forecast_refreshed"] = self.refresh_demand_forecast() is not None
+        return {**result, "freshness": self.freshness()}
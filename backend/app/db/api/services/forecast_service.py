@@ -1,38 +1,252 @@
 from sqlalchemy.orm import Session
 from app.core.ai.time_series_forecasting import TimeSeriesForecaster
-from typing import List, Dict, Any
+from app.core.ai.statistical_forecasting import (
+    StatisticalForecaster, iter_statistical_forecasts, MODEL_TYPES as STATISTICAL_MODEL_TYPES
+)
+from app.core.ai.forecast_registry import (
+    ForecastModelRegistry, get_default_registry, dataset_fingerprint, make_model_id
+)
+from app.core.ai.incremental_forecasting import update_forecaster
+from app.core.ai.backtesting import backtest_models
+from app.core.ai.forecast_plots import get_default_forecast_cache, get_default_plot_renderer, predict_forecast
+from app.core.ai.hierarchical_reconciliation import (
+    Hierarchy, bottom_level_matrix, default_forecast_levels, reconcile, METHODS as RECONCILIATION_METHODS
+)
+from app.core.data.forecast_ingestion import load_forecast_series
+from app.core.data.downsampling import get_default_downsample_cache
+from app.core.ai.batch_forecasting import iter_batch_forecasts, get_default_forecast_executor
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
 import pandas as pd
+import inspect
+import time
+
+def build_forecaster(model_type: str):
+    """
+    Create an untrained forecaster for a model type
+    
+    Args:
+        model_type: 'prophet', 'lstm', or one of the statistical types
+            ('seasonal_naive', 'ses', 'holt', 'holt_winters', 'linear_trend')
+        
+    Returns:
+        Forecaster with train() and predict()
+    """
+    if model_type in STATISTICAL_MODEL_TYPES:
+        return StatisticalForecaster(model_type=model_type)
+    return TimeSeriesForecaster(model_type=model_type)
 
 class ForecastService:
-    def __init__(self, db: Session = None):
+    def __init__(self, db: Session = None, registry: ForecastModelRegistry = None):
         self.db = db
+        self.registry = registry or get_default_registry()
+        self.forecasts = get_default_forecast_cache()
+        self.renderer = get_default_plot_renderer()
+        self.downsampler = get_default_downsample_cache()
     
     def train_model(self, 
                    data: pd.DataFrame,
                    date_column: str,
                    target_column: str,
                    model_type: str = 'prophet',
+                   source: Optional[str] = None,
+                   train_hooks: Optional[Dict[str, Any]] = None,
                    **kwargs) -> Dict[str, Any]:
         """
-        Train a forecasting model
+        Train a forecasting model, reusing a registered one fitted on identical data
         
         Args:
             data: DataFrame with time series data
             date_column: Name of column containing dates
             target_column: Name of column containing target values
-            model_type: Type of model to use ('prophet' or 'lstm')
+            model_type: Type of model to use (see build_forecaster)
+            source: Stable name of the data source (e.g. file path) used for invalidation
+            train_hooks: Extra train() arguments that do not change the model (see training_progress_hooks)
             
         Returns:
-            Dictionary with training results
+            Dictionary with training results and the model_id to predict with
         """
-        forecaster = TimeSeriesForecaster(model_type=model_type)
-        return forecaster.train(
+        model_id, _, metadata, reused = self.registry.get_or_train(
             data=data,
             date_column=date_column,
             target_column=target_column,
-            **kwargs
+            model_type=model_type,
+            factory=build_forecaster,
+            params=kwargs,
+            source=source,
+            train_hooks=train_hooks
+        )
+        result = metadata.get("train_result")
+        result = dict(result) if isinstance(result, dict) else {"result": result}
+        result.update({"model_id": model_id, "reused": reused})
+        return result
+    
+    def predict(self, model_id: str, periods: int = 30, frequency: str = 'D',
+                include_plots: bool = False, max_points: Optional[int] = None,
+                downsample: str = 'lttb') -> Dict[str, Any]:
+        """
+        Generate a forecast from a registered model
+        
+        Args:
+            model_id: Model id returned by train_model
+            periods: Number of periods to forecast
+            frequency: Frequency of predictions
+            include_plots: Keep the forecaster's inline base64 plots; by default
+                plots are rendered on demand from the returned forecast_id
+            max_points: Return at most this many forecast rows (the full
+                forecast stays available under the forecast_id)
+            downsample: 'lttb' or 'minmax'
+            
+        Returns:
+            Dictionary with forecast results and a forecast_id
+        """
+        entry = self.registry.get(model_id)
+        if entry is None:
+            raise KeyError(f"Unknown model_id: {model_id}")
+        
+        # Plots are rendered on demand by render_plot, not by the forecaster
+        forecast = predict_forecast(entry[0], periods=periods, frequency=frequency, include_plots=include_plots)
+        forecast_id = self.forecasts.put(forecast["forecast"], model_id=model_id)
+        if max_points:
+            forecast = {**forecast, **self._downsample_forecast(forecast_id, forecast["forecast"], max_points, downsample)}
+        return {**forecast, "model_id": model_id, "forecast_id": forecast_id}
+    
+    def _downsample_forecast(self, forecast_id: str, rows: List[Dict[str, Any]], max_points: int,
+                             method: str) -> Dict[str, Any]:
+        # A forecast_id's rows never change, so it identifies the series on its own
+        dates = [row["ds"] for row in rows]
+        values = [row.get("yhat") for row in rows]
+        indices = self.downsampler.indices(("forecast", forecast_id), dates, values, max_points, method)
+        return {
+            "forecast": [rows[i] for i in indices],
+            "downsampling": {"method": method, "points": len(indices), "original_points": len(rows)}
+        }
+    
+    def get_forecast_series(self, forecast_id: str, max_points: Optional[int] = None,
+                            downsample: str = 'lttb') -> Dict[str, Any]:
+        """
+        Get the rows of a previous forecast for charting
+        
+        Args:
+            forecast_id: Id returned with the forecast
+            max_points: Return at most this many rows
+            downsample: 'lttb' or 'minmax'
+            
+        Returns:
+            Dictionary with the forecast rows, model_id and forecast_id
+        """
+        entry = self.forecasts.get(forecast_id)
+        if entry is None:
+            raise KeyError(f"Unknown forecast_id: {forecast_id}")
+        
+        result = {"forecast": entry["forecast"], "model_id": entry["model_id"], "forecast_id": forecast_id}
+        if max_points:
+            result.update(self._downsample_forecast(forecast_id, entry["forecast"], max_points, downsample))
+        return result
+    
+    def render_plot(self, forecast_id: str, fmt: str = 'png', width: int = 800, height: int = 400,
+                    kind: str = 'forecast') -> bytes:
+        """
+        Render a chart of a previous forecast
+        
+        Args:
+            forecast_id: Id returned with the forecast
+            fmt: "png" or "svg"
+            width: Image width in pixels
+            height: Image height in pixels
+            kind: "forecast" or "components"
+            
+        Returns:
+            Encoded image
+        """
+        entry = self.forecasts.get(forecast_id)
+        if entry is None:
+            raise KeyError(f"Unknown forecast_id: {forecast_id}")
+        
+        # Draw the recent observed history in front of the forecast
+        history_rows = None
+        if kind == "forecast" and entry["model_id"]:
+            model_entry = self.registry.get(entry["model_id"])
+            history = self.registry.get_history(entry["model_id"])
+            if model_entry is not None and history is not None:
+                metadata = model_entry[1]
+                history = history.tail(max(4 * len(entry["forecast"]), 100))
+                history_rows = history.rename(
+                    columns={metadata["date_column"]: "ds", metadata["target_column"]: "y"}
+                ).to_dict("records")
+        
+        return self.renderer.render(
+            forecast_id, entry["forecast"], history_rows, fmt=fmt, width=width, height=height, kind=kind
         )
     
+    def update_model(self,
+                     model_id: str,
+                     new_data: pd.DataFrame,
+                     drift_threshold: float = 3.0,
+                     frequency: str = 'D') -> Dict[str, Any]:
+        """
+        Update a registered model with newly observed rows instead of refitting
+        
+        Args:
+            model_id: Model id returned by train_model
+            new_data: New rows with the model's date and target columns
+            drift_threshold: Drift score above which the model is refit from scratch
+            frequency: Frequency of the series
+            
+        Returns:
+            Dictionary with the new model_id, the update strategy and the fit time saved
+        """
+        entry = self.registry.get(model_id)
+        if entry is None:
+            raise KeyError(f"Unknown model_id: {model_id}")
+        forecaster, metadata = entry
+        history = self.registry.get_history(model_id)
+        if history is None:
+            raise ValueError(f"Training data of model {model_id} was not kept; train it again")
+        
+        date_column = metadata["date_column"]
+        target_column = metadata["target_column"]
+        model_type = metadata["model_type"]
+        params = metadata.get("params") or {}
+        
+        def refit(data: pd.DataFrame):
+            refitted = build_forecaster(model_type)
+            refitted.train(data=data, date_column=date_column, target_column=target_column, **params)
+            return refitted
+        
+        forecaster, report, combined = update_forecaster(
+            forecaster, history, new_data, date_column, target_column, refit,
+            drift_threshold=drift_threshold, frequency=frequency
+        )
+        if report["strategy"] == "unchanged":
+            return {"model_id": model_id, "previous_model_id": model_id, **report}
+        
+        # Compare against the cost of the last full fit of this series
+        full_fit_seconds = metadata.get("full_fit_seconds", metadata.get("train_seconds"))
+        if report["strategy"] == "full_refit":
+            full_fit_seconds = report["update_seconds"]
+        report["full_fit_seconds"] = full_fit_seconds
+        if full_fit_seconds is not None:
+            report["seconds_saved"] = round(full_fit_seconds - report["update_seconds"], 3)
+        
+        fingerprint = dataset_fingerprint(combined, date_column, target_column)
+        new_model_id = make_model_id(fingerprint, date_column, target_column, model_type, params)
+        # The updated model starts its own lineage: carrying the parent's series_key
+        # would make put() invalidate the parent it was derived from
+        self.registry.put(new_model_id, forecaster, {
+            **metadata,
+            "series_key": None,
+            "data_fingerprint": fingerprint,
+            "rows": len(combined),
+            "train_seconds": report["update_seconds"],
+            "full_fit_seconds": full_fit_seconds,
+            "trained_at": time.time(),
+            "updated_from": model_id,
+            "update": report
+        }, history=combined)
+        
+        return {"model_id": new_model_id, "previous_model_id": model_id, **report}
+    
     def generate_forecast(self, 
                          data: pd.DataFrame,
                          date_column: str,
@@ -40,9 +254,13 @@ class ForecastService:
                          periods: int = 30,
                          frequency: str = 'D',
                          model_type: str = 'prophet',
+                         source: Optional[str] = None,
+                         include_plots: bool = False,
+                         max_points: Optional[int] = None,
+                         downsample: str = 'lttb',
                          **kwargs) -> Dict[str, Any]:
         """
-        Train a model and generate forecast
+        Generate a forecast, training a model only if no registered one matches
         
         Args:
             data: DataFrame with time series data
@@ -51,22 +269,363 @@ class ForecastService:
             periods: Number of periods to forecast
             frequency: Frequency of predictions
             model_type: Type of model to use
+            source: Stable name of the data source (e.g. file path) used for invalidation
+            include_plots: Keep the forecaster's inline base64 plots
+            max_points: Return at most this many forecast rows
+            downsample: 'lttb' or 'minmax'
             
         Returns:
             Dictionary with forecast results
         """
-        forecaster = TimeSeriesForecaster(model_type=model_type)
-        
-        # Train the model
-        forecaster.train(
+        model_id = self.train_model(
             data=data,
             date_column=date_column,
             target_column=target_column,
+            model_type=model_type,
+            source=source,
             **kwargs
-        )
+        )["model_id"]
         
         # Generate forecast
-        return forecaster.predict(
-            periods=periods,
-            frequency=frequency
-        )
\ No newline at end of file
+        return self.predict(model_id, periods=periods, frequency=frequency, include_plots=include_plots,
+                            max_points=max_points, downsample=downsample)
+    
+    def generate_batch_forecast(self,
+                                data: pd.DataFrame,
+                                series_column: str,
+                                date_column: str,
+                                target_column: str,
+                                periods: int = 30,
+                                frequency: str = 'D',
+                                model_type: str = 'prophet',
+                                **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Forecast every series of a long-format dataset in parallel
+        
+        Args:
+            data: DataFrame with one row per series and date
+            series_column: Name of column identifying the series
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+            periods: Number of periods to forecast
+            frequency: Frequency of predictions
+            model_type: Type of model to use
+            
+        Returns:
+            Iterator of per-series results in completion order
+        """
+        if model_type in STATISTICAL_MODEL_TYPES:
+            # Vectorized over series in this process; a pool would only add overhead
+            return iter_statistical_forecasts(
+                data,
+                series_column=series_column,
+                date_column=date_column,
+                target_column=target_column,
+                model_type=model_type,
+                periods=periods,
+                frequency=frequency,
+                season_length=kwargs.get("season_length")
+            )
+        return iter_batch_forecasts(
+            data,
+            series_column=series_column,
+            date_column=date_column,
+            target_column=target_column,
+            forecast_fn=forecast_single_series,
+            options={"periods": periods, "frequency": frequency, "model_type": model_type, "params": kwargs},
+            executor=get_default_forecast_executor()
+        )
+    
+    def _forecast_nodes(self,
+                        labels: List[str],
+                        values: np.ndarray,
+                        dates: pd.DatetimeIndex,
+                        periods: int,
+                        frequency: str,
+                        model_type: str,
+                        **kwargs) -> Tuple[np.ndarray, List[Any]]:
+        # Base forecasts of hierarchy nodes, one row per label, via the batch path
+        frame = pd.DataFrame({
+            "series_id": np.repeat(labels, values.shape[1]),
+            "ds": np.tile(dates.to_numpy(), len(labels)),
+            "y": values.ravel()
+        })
+        forecasts, failures, future_dates = {}, {}, None
+        for result in self.generate_batch_forecast(
+            frame, series_column="series_id", date_column="ds", target_column="y",
+            periods=periods, frequency=frequency, model_type=model_type, **kwargs
+        ):
+            if result["status"] != "ok":
+                failures[result["series_id"]] = result["error"]
+                continue
+            # Some forecasters return fitted history ahead of the future rows
+            rows = result["forecast"][-periods:]
+            forecasts[result["series_id"]] = [row["yhat"] for row in rows]
+            future_dates = future_dates or [row["ds"] for row in rows]
+        if failures:
+            raise ValueError(f"Base forecasts failed for {len(failures)} nodes: {failures}")
+        return np.array([forecasts[label] for label in labels], dtype=float), future_dates
+    
+    def generate_hierarchical_forecast(self,
+                                       data: pd.DataFrame,
+                                       levels: List[str],
+                                       date_column: str,
+                                       target_column: str,
+                                       periods: int = 30,
+                                       frequency: str = 'D',
+                                       model_type: str = 'holt_winters',
+                                       method: str = 'bottom_up',
+                                       forecast_levels: Optional[List[str]] = None,
+                                       **kwargs) -> Dict[str, Any]:
+        """
+        Forecast a hierarchy of series (e.g. total > platform > product) coherently
+    
+        Only the nodes of forecast_levels are fitted, through the batch forecasting
+        path; every other node comes from one reconciliation matrix product, so
+        forecasts add up across levels without fitting each level separately.
+    
+        Args:
+            data: Long-format DataFrame with the level, date and target columns
+            levels: Level columns, from the top of the tree down
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+            periods: Number of periods to forecast
+            frequency: Frequency of predictions
+            model_type: Type of model used for the base forecasts
+            method: 'bottom_up', 'top_down', 'ols', 'wls_struct' or 'mint_shrink'
+            forecast_levels: Levels ('total' or level columns) to fit base forecasts
+                for; defaults to what the method needs (all levels for MinT)
+    
+        Returns:
+            Dictionary with the reconciled forecast of every node
+        """
+        started = time.perf_counter()
+        if method not in RECONCILIATION_METHODS:
+            raise ValueError(f"Unsupported method '{method}', expected one of {RECONCILIATION_METHODS}")
+        missing = set(levels + [date_column, target_column]) - set(data.columns)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+    
+        keys, bottom, dates = bottom_level_matrix(data, levels, date_column, target_column)
+        hierarchy = Hierarchy(keys, levels)
+        history = hierarchy.S @ bottom
+        forecast_levels = forecast_levels or default_forecast_levels(hierarchy, method)
+        rows = hierarchy.nodes_at(forecast_levels)
+        labels = [hierarchy.labels[i] for i in rows]
+    
+        base, future_dates = self._forecast_nodes(
+            labels, history[rows], dates, periods, frequency, model_type, **kwargs
+        )
+    
+        residuals = None
+        if method == "mint_shrink":
+            # Holdout errors of the same models over the last `periods` observations
+            if len(dates) < 3 * periods:
+                raise ValueError(f"mint_shrink needs at least {3 * periods} periods of history")
+            holdout, _ = self._forecast_nodes(
+                labels, history[rows, :-periods], dates[:-periods], periods, frequency, model_type, **kwargs
+            )
+            residuals = history[rows, -periods:] - holdout
+    
+        reconciled = reconcile(hierarchy.S, rows, base, method, bottom_history=bottom, residuals=residuals)
+    
+        base_by_node = dict(zip(rows.tolist(), base))
+        nodes = []
+        for i, label in enumerate(hierarchy.labels):
+            forecast = [{"ds": ds, "yhat": float(yhat)} for ds, yhat in zip(future_dates, reconciled[i])]
+            if i in base_by_node:
+                for row, base_yhat in zip(forecast, base_by_node[i]):
+                    row["base_yhat"] = float(base_yhat)
+            nodes.append({
+                "node": label,
+                "level": hierarchy.level_names[hierarchy.depths[i]],
+                "forecast": forecast
+            })
+    
+        return {
+            "method": method,
+            "model_type": model_type,
+            "levels": levels,
+            "forecast_levels": forecast_levels,
+            "nodes": nodes,
+            "series_fitted": len(rows) * (2 if residuals is not None else 1),
+            "series_total": len(hierarchy.labels),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+    
+    def backtest(self,
+                 data: pd.DataFrame,
+                 date_column: str,
+                 target_column: str,
+                 model_types: List[str],
+                 horizon: int = 30,
+                 n_folds: int = 3,
+                 step: Optional[int] = None,
+                 frequency: str = 'D',
+                 params: Optional[Dict[str, Dict[str, Any]]] = None,
+                 season_length: int = 1) -> Dict[str, Any]:
+        """
+        Compare model types with a rolling-origin backtest
+        
+        Args:
+            data: DataFrame with time series data
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+            model_types: Model types to compare
+            horizon: Periods forecast per fold
+            n_folds: Number of folds
+            step: Periods between fold origins (horizon if omitted)
+            frequency: Frequency of predictions
+            params: Training hyperparameters per model type
+            season_length: Seasonal period for MASE scaling
+            
+        Returns:
+            Dictionary with MAPE/sMAPE/MASE and fit/predict times per model type
+        """
+        heavy = [model_type for model_type in model_types if model_type not in STATISTICAL_MODEL_TYPES]
+        return backtest_models(
+            data,
+            date_column=date_column,
+            target_column=target_column,
+            model_types=model_types,
+            build_fn=build_forecaster,
+            horizon=horizon,
+            n_folds=n_folds,
+            step=step,
+            frequency=frequency,
+            params=params,
+            season_length=season_length,
+            # Statistical folds take milliseconds; only the heavy models go to the pool
+            executor=get_default_forecast_executor() if heavy else None,
+            parallel_model_types=heavy
+        )
+
+def load_training_data(request: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Build the training frame of a forecast request
+    
+    Files are read through the columnar ingestion path: only the date, target
+    (and series) columns, limited to start_date/end_date and aggregated to
+    the request frequency.
+    
+    Args:
+        request: Dictionary with either 'data' records or a 'file_path'
+        
+    Returns:
+        DataFrame with time series data
+    """
+    if request.get("data"):
+        return pd.DataFrame(request["data"])
+    elif request.get("file_path"):
+        return load_forecast_series(
+            request["file_path"],
+            date_column=request["date_column"],
+            target_column=request["target_column"],
+            series_column=request.get("series_column") or request.get("levels"),
+            frequency=request.get("frequency"),
+            aggregation=request.get("aggregation") or "none",
+            start_date=request.get("start_date"),
+            end_date=request.get("end_date")
+        )
+    else:
+        raise ValueError("No data or file path provided")
+
+def training_progress_hooks(model_type: str,
+                            report: Callable[[float, Optional[str]], None],
+                            start: float = 0.2,
+                            end: float = 0.95) -> Dict[str, Any]:
+    """
+    Build train() arguments that report progress from inside a fit
+    
+    Keras-based models get an epoch callback, passed as callbacks= when their
+    train() accepts it. Statistical models fit in milliseconds and Prophet
+    fits in one call, so they report no intermediate progress.
+    
+    Args:
+        model_type: Type of model being trained
+        report: Job progress callback; raises JobCancelled when the job is cancelled
+        start: Progress reported before the first epoch
+        end: Progress reported after the last epoch
+        
+    Returns:
+        Dictionary of extra train() keyword arguments (possibly empty)
+    """
+    if model_type != 'lstm':
+        return {}
+    signature = inspect.signature(TimeSeriesForecaster.train)
+    if 'callbacks' not in signature.parameters and not any(
+        p.kind == inspect.Parameter.VAR_KEYWORD for p in signature.parameters.values()
+    ):
+        return {}
+    
+    from tensorflow import keras
+    
+    class EpochProgress(keras.callbacks.Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            epochs = self.params.get("epochs") or epoch + 1
+            loss = (logs or {}).get("loss")
+            message = f"Epoch {epoch + 1}/{epochs}" + (f", loss {loss:.4f}" if loss is not None else "")
+            report(start + (end - start) * (epoch + 1) / epochs, message)
+    
+    return {"callbacks": [EpochProgress()]}
+
+def run_training_job(request: Dict[str, Any], report: Callable[[float, Optional[str]], None]) -> Dict[str, Any]:
+    """
+    Train a forecasting model as a background job
+    
+    Runs in its own job process; the fitted model is persisted to the shared
+    model registry so the API process can predict with the returned model_id.
+    
+    Args:
+        request: Forecast request as a dictionary
+        report: Progress callback of the job queue
+        
+    Returns:
+        Dictionary with training results and the model_id
+    """
+    report(0.05, "Loading data")
+    df = load_training_data(request)
+    
+    model_type = request.get("model_type", "prophet")
+    report(0.2, f"Training {model_type} model on {len(df)} rows")
+    result = ForecastService().train_model(
+        data=df,
+        date_column=request["date_column"],
+        target_column=request["target_column"],
+        model_type=model_type,
+        source=request.get("file_path"),
+        train_hooks=training_progress_hooks(model_type, report),
+        **(request.get("params") or {})
+    )
+    
+    report(1.0, "Model trained")
+    return result
+
+def forecast_single_series(data: pd.DataFrame,
+                           date_column: str,
+                           target_column: str,
+                           periods: int = 30,
+                           frequency: str = 'D',
+                           model_type: str = 'prophet',
+                           params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Fit and forecast one series of a batch request
+    
+    Runs in a batch forecasting worker. Models are not registered and plots are
+    dropped, since a batch can hold thousands of series.
+    
+    Args:
+        data: DataFrame with the series' dates and values
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        periods: Number of periods to forecast
+        frequency: Frequency of predictions
+        model_type: Type of model to use
+        params: Training hyperparameters
+        
+    Returns:
+        Dictionary with forecast rows
+    """
+    forecaster = build_forecaster(model_type)
+    forecaster.train(data=data, date_column=date_column, target_column=target_column, **(params or {}))
+    return {"forecast": predict_forecast(forecaster, periods=periods, frequency=frequency)["forecast"]}
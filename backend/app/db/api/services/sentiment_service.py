@@ -1,11 +1,17 @@
 from sqlalchemy.orm import Session
-from app.core.ai.sentiment_analysis import SentimentAnalyzer
-from typing import List, Dict, Any
+from app.core.ai.model_registry import SharedSentimentAnalyzer
+from app.core.ai.sentiment_cache import CachedSentimentAnalyzer, get_default_cache
+from app.core.ai.near_duplicates import analyze_with_dedup
+from typing import List, Dict, Any, Optional
 
 class SentimentService:
     def __init__(self, db: Session = None, use_openai: bool = False):
         self.db = db
-        self.analyzer = SentimentAnalyzer(use_openai=use_openai)
+        self.analyzer = CachedSentimentAnalyzer(
+            SharedSentimentAnalyzer(use_openai=use_openai),
+            cache=get_default_cache()
+        )
+        self.last_dedup_stats: Optional[Dict[str, Any]] = None
     
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """
@@ -19,18 +25,35 @@ class SentimentService:
         """
         return self.analyzer.analyze_text(text)
     
-    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def analyze_batch(self, texts: List[str],
+                      similarity_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Analyze sentiment of multiple texts
         
         Args:
             texts: List of texts to analyze
+            similarity_threshold: If set, near-duplicate texts above this similarity
+                share the result of their cluster representative
             
         Returns:
             List of dictionaries with sentiment analysis results
         """
+        if similarity_threshold is not None:
+            results, self.last_dedup_stats = analyze_with_dedup(
+                texts, self.analyzer.analyze_batch, similarity_threshold
+            )
+            return results
         return self.analyzer.analyze_batch(texts)
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters of the sentiment result cache
+        
+        Returns:
+            Dictionary with memory hits, disk hits, misses and hit rate
+        """
+        return self.analyzer.cache.stats()
+    
     def get_sentiment_trends(self, days: int = 30) -> Dict[str, Any]:
         """
         Get sentiment trends over time
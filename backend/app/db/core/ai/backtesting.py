@@ -0,0 +1,275 @@
+import hashlib
+import json
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.ai.forecast_plots import predict_forecast
+
+logger = logging.getLogger(__name__)
+
+
+def rolling_origin_folds(n_obs: int,
+                         horizon: int,
+                         n_folds: int = 3,
+                         step: Optional[int] = None,
+                         min_train: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Compute rolling-origin fold boundaries
+
+    The last fold ends at the last observation; earlier folds move the origin
+    back by step rows each.
+
+    Args:
+        n_obs: Number of observations
+        horizon: Rows forecast per fold
+        n_folds: Number of folds
+        step: Rows between fold origins (horizon if omitted)
+        min_train: Minimum number of training rows (2 * horizon if omitted)
+
+    Returns:
+        List of (train_end, test_end) positions, oldest first; the training
+        window is [0, train_end) and the test window [train_end, test_end)
+    """
+    step = step or horizon
+    min_train = min_train or 2 * horizon
+    folds = []
+    for i in range(n_folds):
+        train_end = n_obs - horizon - i * step
+        if train_end < min_train:
+            break
+        folds.append((train_end, train_end + horizon))
+    if not folds:
+        raise ValueError(f"Not enough observations ({n_obs}) for a {horizon}-step backtest")
+    return folds[::-1]
+
+
+def forecast_errors(actual: np.ndarray, predicted: np.ndarray, train: np.ndarray,
+                    season_length: int = 1) -> Dict[str, Optional[float]]:
+    """
+    Compute MAPE, sMAPE and MASE of one forecast
+
+    Args:
+        actual: Observed values of the test window
+        predicted: Forecast values of the test window
+        train: Training values, used to scale MASE
+        season_length: Seasonal period of the naive forecast scaling MASE
+
+    Returns:
+        Dictionary with mape and smape (in percent) and mase; None where undefined
+    """
+    errors = np.abs(actual - predicted)
+    nonzero = actual != 0
+    mape = float(np.mean(errors[nonzero] / np.abs(actual[nonzero])) * 100) if nonzero.any() else None
+    denominator = np.abs(actual) + np.abs(predicted)
+    smape = float(np.mean(np.divide(2 * errors, denominator, out=np.zeros_like(errors),
+                                    where=denominator != 0)) * 100)
+    m = season_length if len(train) > season_length else 1
+    scale = np.mean(np.abs(train[m:] - train[:-m])) if len(train) > m else 0.0
+    mase = float(np.mean(errors) / scale) if scale > 0 else None
+    return {"mape": mape, "smape": smape, "mase": mase}
+
+
+def _run_fold(build_fn: Callable[[str], Any],
+              model_type: str,
+              params: Dict[str, Any],
+              date_column: str,
+              target_column: str,
+              dates: np.ndarray,
+              values: np.ndarray,
+              horizon: int,
+              frequency: str) -> Dict[str, Any]:
+    # May run in a pool worker; returns plain arrays so nothing heavy travels back
+    frame = pd.DataFrame({date_column: dates, target_column: values}, copy=False)
+    forecaster = build_fn(model_type)
+    started = time.perf_counter()
+    forecaster.train(data=frame, date_column=date_column, target_column=target_column, **params)
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows = predict_forecast(forecaster, periods=horizon, frequency=frequency)["forecast"]
+    predict_seconds = time.perf_counter() - started
+
+    return {
+        "yhat": np.array([row["yhat"] for row in rows[-horizon:]], dtype=float),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds
+    }
+
+
+class FoldCache:
+    """
+    Bounded LRU of fold forecasts keyed by series, model and fold boundary.
+
+    Folds whose training window was already fitted with the same model and
+    settings (e.g. when a backtest is rerun with more folds or more model
+    types) are not fitted again.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of fold results kept
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(series_fingerprint: str, model_type: str, params: Dict[str, Any],
+                 train_end: int, horizon: int, frequency: str) -> str:
+        payload = json.dumps([series_fingerprint, model_type, params, train_end, horizon, frequency],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_default_fold_cache = FoldCache()
+
+
+def backtest_models(data: pd.DataFrame,
+                    date_column: str,
+                    target_column: str,
+                    model_types: List[str],
+                    build_fn: Callable[[str], Any],
+                    horizon: int = 30,
+                    n_folds: int = 3,
+                    step: Optional[int] = None,
+                    frequency: str = 'D',
+                    params: Optional[Dict[str, Dict[str, Any]]] = None,
+                    season_length: int = 1,
+                    executor: Optional[Executor] = None,
+                    parallel_model_types: Optional[List[str]] = None,
+                    cache: Optional[FoldCache] = None) -> Dict[str, Any]:
+    """
+    Compare forecast models with a rolling-origin backtest
+
+    Fold windows are slices of one sorted copy of the date and target
+    columns, so folds never copy the frame. Every (model, fold) fit is an
+    independent task.
+
+    Args:
+        data: DataFrame with time series data
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        model_types: Model types to compare
+        build_fn: Module-level function creating an untrained forecaster for a model type
+        horizon: Rows forecast per fold
+        n_folds: Number of folds
+        step: Rows between fold origins (horizon if omitted)
+        frequency: Frequency of predictions
+        params: Training hyperparameters per model type
+        season_length: Seasonal period for MASE scaling
+        executor: Pool to fit folds on (fits run in this process if None)
+        parallel_model_types: Model types sent to the executor (all if None);
+            cheap models are faster in-process
+        cache: Fold result cache (module default if omitted)
+
+    Returns:
+        Dictionary with the folds, per-model metrics and timings, and the best
+        model by mean MASE (sMAPE where MASE is undefined)
+    """
+    cache = cache or _default_fold_cache
+    params = params or {}
+    frame = data[[date_column, target_column]].dropna()
+    frame = frame.assign(**{date_column: pd.to_datetime(frame[date_column])}).sort_values(date_column)
+    dates = frame[date_column].to_numpy()
+    values = frame[target_column].to_numpy(dtype=float)
+    folds = rolling_origin_folds(len(values), horizon, n_folds, step)
+
+    fingerprint = hashlib.sha256(
+        pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()
+    ).hexdigest()
+
+    results: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    pending = {}
+    for model_type in model_types:
+        model_params = params.get(model_type, {})
+        for fold, (train_end, _) in enumerate(folds):
+            key = FoldCache.make_key(fingerprint, model_type, model_params, train_end, horizon, frequency)
+            cached = cache.get(key)
+            if cached is not None:
+                results[(model_type, fold)] = {**cached, "cached": True}
+                continue
+            args = (build_fn, model_type, model_params, date_column, target_column,
+                    dates[:train_end], values[:train_end], horizon, frequency)
+            if executor is not None and (parallel_model_types is None or model_type in parallel_model_types):
+                pending[(model_type, fold)] = (key, executor.submit(_run_fold, *args))
+            else:
+                pending[(model_type, fold)] = (key, args)
+
+    for task, (key, work) in pending.items():
+        try:
+            result = work.result() if isinstance(work, Future) else _run_fold(*work)
+            cache.set(key, result)
+            results[task] = {**result, "cached": False}
+        except Exception as e:
+            logger.warning(f"Backtest fold {task} failed: {str(e)}")
+            results[task] = {"error": f"{type(e).__name__}: {str(e)}"}
+
+    models = {}
+    for model_type in model_types:
+        fold_reports = []
+        for fold, (train_end, test_end) in enumerate(folds):
+            result = results[(model_type, fold)]
+            report = {"fold": fold, "train_end": train_end}
+            if "error" in result:
+                report["error"] = result["error"]
+            elif len(result["yhat"]) != test_end - train_end:
+                report["error"] = "Forecast is shorter than the horizon"
+            else:
+                report.update(forecast_errors(
+                    values[train_end:test_end], result["yhat"], values[:train_end], season_length
+                ))
+                report.update({
+                    "fit_seconds": round(result["fit_seconds"], 4),
+                    "predict_seconds": round(result["predict_seconds"], 4),
+                    "cached": result["cached"]
+                })
+            fold_reports.append(report)
+
+        succeeded = [r for r in fold_reports if "error" not in r]
+        summary = {"folds": fold_reports, "failed_folds": len(fold_reports) - len(succeeded)}
+        for metric in ("mape", "smape", "mase", "fit_seconds", "predict_seconds"):
+            measured = [r[metric] for r in succeeded if r.get(metric) is not None]
+            summary[metric] = round(float(np.mean(measured)), 4) if measured else None
+        models[model_type] = summary
+
+    def score(model_type: str) -> Tuple[float, float]:
+        summary = models[model_type]
+        if summary["failed_folds"]:
+            return (np.inf, np.inf)
+        mase, smape = summary["mase"], summary["smape"]
+        return (mase if mase is not None else np.inf, smape if smape is not None else np.inf)
+
+    ranked = sorted(model_types, key=score)
+    return {
+        "folds": [
+            {"fold": i, "train_end": train_end, "horizon": horizon,
+             "cutoff": pd.Timestamp(dates[train_end - 1]).isoformat()}
+            for i, (train_end, _) in enumerate(folds)
+        ],
+        "models": models,
+        "best_model": ranked[0] if ranked and np.isfinite(score(ranked[0])[1]) else None
+    }
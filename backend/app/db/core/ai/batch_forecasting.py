@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import logging
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def plan_series_chunks(sizes: List[int], max_rows: int = 20000, max_series: int = 64) -> List[List[int]]:
+    """
+    Group series into pool tasks so small series share one task
+
+    Series are packed largest first, so long fits start early and the many
+    small ones fill in behind them.
+
+    Args:
+        sizes: Number of rows of each series
+        max_rows: Maximum total rows per task (a larger series gets a task of its own)
+        max_series: Maximum number of series per task
+
+    Returns:
+        List of tasks, each a list of series positions
+    """
+    chunks, current, rows = [], [], 0
+    for i in np.argsort(sizes, kind="stable")[::-1]:
+        size = int(sizes[i])
+        if current and (rows + size > max_rows or len(current) >= max_series):
+            chunks.append(current)
+            current, rows = [], 0
+        current.append(int(i))
+        rows += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _forecast_chunk(forecast_fn: Callable[..., Dict[str, Any]],
+                    items: List[Tuple[Any, pd.DataFrame]],
+                    options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Runs in a pool worker; every series is isolated so one failure stays local
+    results = []
+    for series_id, frame in items:
+        started = time.perf_counter()
+        try:
+            forecast = forecast_fn(frame, **options)
+            results.append({"series_id": series_id, "status": "ok", "rows": len(frame),
+                            "seconds": round(time.perf_counter() - started, 4), **forecast})
+        except Exception as e:
+            results.append({"series_id": series_id, "status": "error", "rows": len(frame),
+                            "seconds": round(time.perf_counter() - started, 4),
+                            "error": f"{type(e).__name__}: {str(e)}"})
+    return results
+
+
+def _python_scalar(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def iter_batch_forecasts(data: pd.DataFrame,
+                         series_column: str,
+                         date_column: str,
+                         target_column: str,
+                         forecast_fn: Callable[..., Dict[str, Any]],
+                         options: Optional[Dict[str, Any]] = None,
+                         executor: Optional[ProcessPoolExecutor] = None,
+                         max_rows_per_task: int = 20000,
+                         max_series_per_task: int = 64) -> Iterator[Dict[str, Any]]:
+    """
+    Forecast every series of a long-format dataset, yielding results as they finish
+
+    Args:
+        data: Long-format DataFrame with one row per series and date
+        series_column: Name of column identifying the series
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        forecast_fn: Module-level function forecasting one series frame;
+            called as forecast_fn(frame, date_column=..., target_column=..., **options)
+        options: Extra keyword arguments for forecast_fn
+        executor: Process pool to fit on (fits run in this process if None)
+        max_rows_per_task: Maximum total rows per pool task
+        max_series_per_task: Maximum number of series per pool task
+
+    Returns:
+        Iterator of per-series result dictionaries in completion order, with
+        status "ok" or "error"
+    """
+    if series_column not in data.columns:
+        raise ValueError(f"Series column '{series_column}' not found")
+
+    options = {"date_column": date_column, "target_column": target_column, **(options or {})}
+    # Ship only the columns a fit needs
+    grouped = data[[series_column, date_column, target_column]].groupby(series_column, sort=False)
+    series = [
+        (_python_scalar(series_id), frame[[date_column, target_column]].reset_index(drop=True))
+        for series_id, frame in grouped
+    ]
+    chunks = plan_series_chunks([len(frame) for _, frame in series], max_rows_per_task, max_series_per_task)
+    logger.info(f"Forecasting {len(series)} series in {len(chunks)} tasks")
+
+    if executor is None:
+        for chunk in chunks:
+            yield from _forecast_chunk(forecast_fn, [series[i] for i in chunk], options)
+        return
+
+    futures: Dict[Future, List[int]] = {
+        executor.submit(_forecast_chunk, forecast_fn, [series[i] for i in chunk], options): chunk
+        for chunk in chunks
+    }
+    try:
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except Exception as e:
+                # The task itself failed (e.g. the worker died); report each of its series
+                for i in futures[future]:
+                    yield {"series_id": series[i][0], "status": "error", "rows": len(series[i][1]),
+                           "error": f"{type(e).__name__}: {str(e)}"}
+    finally:
+        # Client disconnected or the caller stopped early: drop tasks not yet started
+        for future in futures:
+            future.cancel()
+
+
+_default_executor: Optional[ProcessPoolExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_forecast_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process-wide pool for batch forecasting, configured from the environment
+
+    FORECAST_BATCH_WORKERS sets the number of processes (CPU count if unset or empty);
+    0 fits in the calling process.
+
+    Returns:
+        Shared ProcessPoolExecutor, or None when pooling is disabled
+    """
+    global _default_executor
+    value = os.getenv("FORECAST_BATCH_WORKERS", "")
+    workers = int(value) if value else (os.cpu_count() or 1)
+    if workers <= 0:
+        return None
+    with _default_executor_lock:
+        # A worker that died (e.g. OOM-killed) leaves the pool unusable; replace it
+        if _default_executor is None or getattr(_default_executor, "_broken", False):
+            _default_executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        return _default_executor
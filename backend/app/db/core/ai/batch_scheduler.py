@@ -0,0 +1,201 @@
+import threading
+import time
+import logging
+from collections import deque, Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    """A single text waiting to be scheduled into a batch"""
+
+    __slots__ = ("text", "future", "enqueued_at")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatchScheduler:
+    """
+    Coalesces concurrent single-text requests into batched inference calls.
+
+    Callers submit one text at a time and block on their own result, while a
+    background thread groups whatever arrives within ``max_wait_ms`` (up to
+    ``max_batch_size`` texts) into a single call to ``batch_fn``.
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[str]], List[Dict[str, Any]]],
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0,
+                 stats_window: int = 1000):
+        """
+        Initialize the scheduler
+
+        Args:
+            batch_fn: Function that analyzes a list of texts and returns one result per text
+            max_batch_size: Maximum number of texts per batch
+            max_wait_ms: Maximum time to wait for a batch to fill, in milliseconds
+            stats_window: Number of recent batches/requests kept for statistics
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+
+        # Statistics about what the scheduler actually achieved
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: deque = deque(maxlen=stats_window)
+        self._wait_times_ms: deque = deque(maxlen=stats_window)
+        self._total_batches = 0
+        self._total_requests = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="sentiment-micro-batcher", daemon=True
+            )
+            self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for analysis
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            Future resolving to the sentiment result for this text
+        """
+        request = _PendingRequest(text)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            self._ensure_worker()
+            self._queue.append(request)
+            self._cond.notify()
+        return request.future
+
+    def analyze_text(self, text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Analyze a single text through the batching queue
+
+        Args:
+            text: Text to analyze
+            timeout: Maximum time to wait for the result, in seconds
+
+        Returns:
+            Dictionary with sentiment analysis results
+        """
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            # Wait until the batch is full or the oldest request has waited long enough
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while len(self._queue) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                return
+            self._process_batch(batch)
+
+    def _process_batch(self, batch: List[_PendingRequest]):
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._batch_sizes.append(len(batch))
+            self._wait_times_ms.extend((started - r.enqueued_at) * 1000.0 for r in batch)
+            self._total_batches += 1
+            self._total_requests += len(batch)
+
+        try:
+            results = self.batch_fn([r.text for r in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch function returned {len(results)} results for {len(batch)} texts"
+                )
+        except Exception as e:
+            logger.error(f"Error in batched sentiment analysis: {str(e)}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the batch sizes and queue wait times achieved so far
+
+        Returns:
+            Dictionary with scheduler statistics over the recent window
+        """
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._wait_times_ms)
+            total_batches = self._total_batches
+            total_requests = self._total_requests
+
+        def percentile(values: List[float], pct: float) -> float:
+            if not values:
+                return 0.0
+            index = min(len(values) - 1, int(round(pct * (len(values) - 1))))
+            return round(values[index], 3)
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "total_batches": total_batches,
+            "total_requests": total_requests,
+            "queue_depth": len(self._queue),
+            "batch_size": {
+                "mean": round(sum(sizes) / len(sizes), 3) if sizes else 0.0,
+                "max": max(sizes) if sizes else 0,
+                "histogram": dict(sorted(Counter(sizes).items()))
+            },
+            "queue_wait_ms": {
+                "mean": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p50": percentile(waits, 0.50),
+                "p95": percentile(waits, 0.95),
+                "p99": percentile(waits, 0.99),
+                "max": round(waits[-1], 3) if waits else 0.0
+            }
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting requests and drain the queue
+
+        Args:
+            wait: Whether to block until queued requests are processed
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait and self._worker is not None:
+            self._worker.join()
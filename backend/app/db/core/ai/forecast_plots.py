@@ -0,0 +1,397 @@
+import functools
+import inspect
+import io
+import json
+import os
+import threading
+import time
+import uuid
+import logging
+import multiprocessing as mp
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLOT_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+PLOT_KINDS = ("forecast", "components")
+
+# Row keys that are part of the forecast itself rather than a component
+_FORECAST_KEYS = {"ds", "yhat", "yhat_lower", "yhat_upper"}
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_include_plots(forecaster_type: type) -> bool:
+    try:
+        parameters = inspect.signature(forecaster_type.predict).parameters
+    except (TypeError, ValueError):
+        return False
+    return "include_plots" in parameters
+
+
+def predict_forecast(forecaster: Any, periods: int, frequency: str = 'D',
+                     include_plots: bool = False) -> Dict[str, Any]:
+    """
+    Run a forecaster's predict(), skipping its inline plot rendering
+
+    Forecasters whose predict() takes include_plots are told not to render;
+    any plots other forecasters still return are dropped, so callers get
+    the same shape either way. Charts are rendered on demand by PlotRenderer.
+
+    Args:
+        forecaster: Trained forecaster
+        periods: Number of periods to forecast
+        frequency: Frequency of predictions
+        include_plots: Keep the forecaster's inline base64 plots
+
+    Returns:
+        Dictionary with forecast rows and, with include_plots, the plots
+    """
+    if _accepts_include_plots(type(forecaster)):
+        forecast = forecaster.predict(periods=periods, frequency=frequency, include_plots=include_plots)
+    else:
+        forecast = forecaster.predict(periods=periods, frequency=frequency)
+    if not isinstance(forecast, dict):
+        forecast = {"forecast": forecast}
+    if not include_plots:
+        forecast = {k: v for k, v in forecast.items() if k not in ("plot", "components_plot")}
+    return forecast
+
+
+def render_forecast_plot(forecast: List[Dict[str, Any]],
+                         history: Optional[List[Dict[str, Any]]] = None,
+                         fmt: str = "png",
+                         width: int = 800,
+                         height: int = 400,
+                         kind: str = "forecast") -> bytes:
+    """
+    Render a forecast chart
+
+    Uses matplotlib's Figure API on the Agg canvas, so no GUI backend or
+    global pyplot state is involved.
+
+    Args:
+        forecast: Forecast rows with ds, yhat and optional yhat_lower/yhat_upper
+        history: Observed rows with ds and y, drawn before the forecast
+        fmt: "png" or "svg"
+        width: Image width in pixels
+        height: Image height in pixels
+        kind: "forecast", or "components" for one panel per extra numeric
+            column of the rows (e.g. Prophet's trend and seasonalities)
+
+    Returns:
+        Encoded image
+    """
+    import pandas as pd
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    frame = pd.DataFrame(forecast)
+    frame["ds"] = pd.to_datetime(frame["ds"])
+    dpi = 100
+
+    if kind == "components":
+        components = [
+            column for column in frame.columns
+            if column not in _FORECAST_KEYS and not column.endswith(("_lower", "_upper"))
+            and pd.api.types.is_numeric_dtype(frame[column])
+        ]
+        if not components:
+            raise ValueError("Forecast has no component columns to plot")
+        figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        axes = figure.subplots(len(components), 1, sharex=True, squeeze=False)[:, 0]
+        for ax, column in zip(axes, components):
+            ax.plot(frame["ds"], frame[column], color="#0072B2")
+            ax.set_ylabel(column)
+            ax.grid(True, alpha=0.3)
+    else:
+        figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        ax = figure.subplots()
+        if history:
+            observed = pd.DataFrame(history)
+            ax.plot(pd.to_datetime(observed["ds"]), observed["y"], "k.", markersize=3, label="observed")
+        ax.plot(frame["ds"], frame["yhat"], color="#0072B2", label="forecast")
+        if {"yhat_lower", "yhat_upper"} <= set(frame.columns):
+            ax.fill_between(frame["ds"], frame["yhat_lower"], frame["yhat_upper"], color="#0072B2", alpha=0.2)
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc="upper left")
+
+    figure.autofmt_xdate()
+    figure.tight_layout()
+    FigureCanvasAgg(figure)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+class ForecastResultCache:
+    """
+    Forecast results addressed by forecast_id.
+
+    Results are kept in a bounded in-memory LRU and, with a cache_dir, also
+    written there as JSON so any worker process sharing the directory can
+    serve a forecast_id another worker issued. Files older than max_age_hours
+    and the oldest beyond max_on_disk are deleted.
+    """
+
+    def __init__(self,
+                 max_entries: int = 1000,
+                 cache_dir: Optional[str] = None,
+                 max_on_disk: int = 10000,
+                 max_age_hours: float = 24):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of forecasts kept in memory
+            cache_dir: Directory shared by the worker processes (memory only if None)
+            max_on_disk: Maximum number of forecasts kept in cache_dir
+            max_age_hours: Hours after which a forecast is deleted from cache_dir
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_on_disk = max_on_disk
+        self.max_age_hours = max_age_hours
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def _path(self, forecast_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{forecast_id}.json")
+
+    def _remember(self, forecast_id: str, entry: Dict[str, Any]):
+        # Called with the lock held
+        self._entries[forecast_id] = entry
+        self._entries.move_to_end(forecast_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _prune(self):
+        # Scans the directory, so runs at most once a minute
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+
+        files = []
+        for file_name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                files.append((os.stat(path).st_mtime, path))
+            except OSError:
+                continue
+        files.sort()
+        cutoff = now - self.max_age_hours * 3600
+        excess = len(files) - self.max_on_disk
+        for index, (mtime, path) in enumerate(files):
+            if mtime >= cutoff and index >= excess:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def put(self, forecast: List[Dict[str, Any]], model_id: Optional[str] = None) -> str:
+        """
+        Store forecast rows
+
+        Args:
+            forecast: Forecast rows
+            model_id: Model the forecast came from, used to draw observed history
+
+        Returns:
+            New forecast_id
+        """
+        forecast_id = uuid.uuid4().hex
+        entry = {"forecast": forecast, "model_id": model_id, "created_at": time.time()}
+        with self._lock:
+            self._remember(forecast_id, entry)
+
+        if self.cache_dir:
+            tmp_path = f"{self._path(forecast_id)}.tmp"
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(tmp_path, "w") as f:
+                    json.dump(entry, f, default=str)
+                os.replace(tmp_path, self._path(forecast_id))
+                self._prune()
+            except OSError as e:
+                logger.warning(f"Could not persist forecast {forecast_id}: {str(e)}")
+        return forecast_id
+
+    def get(self, forecast_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a forecast
+
+        Args:
+            forecast_id: Id returned by put
+
+        Returns:
+            Dictionary with forecast rows and model_id, or None if unknown or evicted
+        """
+        with self._lock:
+            entry = self._entries.get(forecast_id)
+            if entry is not None:
+                self._entries.move_to_end(forecast_id)
+                return entry
+        if not self.cache_dir or not forecast_id.isalnum():
+            return None
+
+        # Issued by another worker, or evicted from this one's memory
+        try:
+            with open(self._path(forecast_id)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._remember(forecast_id, entry)
+        return entry
+
+
+class PlotRenderer:
+    """
+    Renders forecast plots in a process pool and caches the encoded images.
+
+    Rendered images are kept in an LRU bounded by total bytes and keyed by
+    forecast id, kind, format and size, so repeated views of a chart cost a
+    dictionary lookup. Concurrent requests for the same image share one render.
+    """
+
+    def __init__(self, max_workers: int = 2, max_cache_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the renderer
+
+        Args:
+            max_workers: Number of rendering processes
+            max_cache_bytes: Maximum total size of cached images
+        """
+        self.max_workers = max_workers
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self._in_flight: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.renders = 0
+        self.hits = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None or getattr(self._pool, "_broken", False):
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp.get_context("spawn"))
+        return self._pool
+
+    def render(self,
+               forecast_id: str,
+               forecast: List[Dict[str, Any]],
+               history: Optional[List[Dict[str, Any]]] = None,
+               fmt: str = "png",
+               width: int = 800,
+               height: int = 400,
+               kind: str = "forecast",
+               timeout: float = 60.0) -> bytes:
+        """
+        Get a rendered plot, rendering it in the pool on a cache miss
+
+        Args:
+            forecast_id: Id of the forecast, part of the cache key
+            forecast: Forecast rows
+            history: Observed rows with ds and y
+            fmt: "png" or "svg"
+            width: Image width in pixels
+            height: Image height in pixels
+            kind: "forecast" or "components"
+            timeout: Maximum seconds to wait for a render
+
+        Returns:
+            Encoded image
+        """
+        if fmt not in PLOT_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}', expected one of {tuple(PLOT_FORMATS)}")
+        if kind not in PLOT_KINDS:
+            raise ValueError(f"Unsupported plot kind '{kind}', expected one of {PLOT_KINDS}")
+
+        key = (forecast_id, kind, fmt, width, height)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._get_pool().submit(
+                    render_forecast_plot, forecast, history, fmt, width, height, kind
+                )
+                self._in_flight[key] = future
+                self.renders += 1
+
+        try:
+            image = future.result(timeout=timeout)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        with self._lock:
+            if key not in self._cache and len(image) <= self.max_cache_bytes:
+                self._cache[key] = image
+                self._cache_bytes += len(image)
+                while self._cache_bytes > self.max_cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(evicted)
+        return image
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get render and cache counters
+
+        Returns:
+            Dictionary with renders, cache hits, cached images and bytes
+        """
+        with self._lock:
+            return {
+                "renders": self.renders,
+                "hits": self.hits,
+                "cached_images": len(self._cache),
+                "cached_bytes": self._cache_bytes
+            }
+
+
+_default_forecast_cache: Optional[ForecastResultCache] = None
+_default_renderer: Optional[PlotRenderer] = None
+_defaults_lock = threading.Lock()
+
+
+def get_default_forecast_cache() -> ForecastResultCache:
+    """
+    Get the process-wide forecast result cache, configured from the environment
+
+    Returns:
+        Shared ForecastResultCache instance
+    """
+    global _default_forecast_cache
+    with _defaults_lock:
+        if _default_forecast_cache is None:
+            _default_forecast_cache = ForecastResultCache(
+                max_entries=int(os.getenv("FORECAST_RESULTS_IN_MEMORY", "1000")),
+                cache_dir=os.getenv("FORECAST_RESULTS_DIR", "data/cache/forecast_results") or None,
+                max_on_disk=int(os.getenv("FORECAST_RESULTS_ON_DISK", "10000")),
+                max_age_hours=float(os.getenv("FORECAST_RESULTS_TTL_HOURS", "24"))
+            )
+        return _default_forecast_cache
+
+
+def get_default_plot_renderer() -> PlotRenderer:
+    """
+    Get the process-wide plot renderer, configured from the environment
+
+    Returns:
+        Shared PlotRenderer instance
+    """
+    global _default_renderer
+    with _defaults_lock:
+        if _default_renderer is None:
+            _default_renderer = PlotRenderer(
+                max_workers=int(os.getenv("FORECAST_PLOT_WORKERS", "2")),
+                max_cache_bytes=int(os.getenv("FORECAST_PLOT_CACHE_MB", "64")) * 1024 * 1024
+            )
+        return _default_renderer
@@ -0,0 +1,385 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_fingerprint(data: pd.DataFrame, date_column: str, target_column: str) -> str:
+    """
+    Fingerprint the part of a dataset a forecaster is trained on
+
+    Args:
+        data: DataFrame with time series data
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+
+    Returns:
+        Hex digest over the date and target values
+    """
+    hashed = pd.util.hash_pandas_object(data[[date_column, target_column]], index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def make_model_id(data_fingerprint: str,
+                  date_column: str,
+                  target_column: str,
+                  model_type: str,
+                  params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the registry key of a fitted model
+
+    Args:
+        data_fingerprint: Fingerprint of the training data
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        model_type: Type of model
+        params: Training hyperparameters
+
+    Returns:
+        Model id
+    """
+    payload = json.dumps({
+        "data": data_fingerprint,
+        "date_column": date_column,
+        "target_column": target_column,
+        "model_type": model_type,
+        "params": params or {}
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ForecastModelRegistry:
+    """
+    Registry of fitted forecasters keyed by dataset fingerprint and settings.
+
+    Hot models stay in a bounded in-memory LRU; every model is also pickled to
+    disk so it survives restarts and can be shared between workers. A model
+    trained from a named source (e.g. a file path) replaces older models of
+    the same source and settings once that source's data changes. On disk,
+    models unused for max_age_days are deleted, as are the least recently
+    used ones beyond max_on_disk; a model file's mtime records its last use.
+    """
+
+    def __init__(self,
+                 cache_dir: str = "data/cache/forecast_models",
+                 max_in_memory: int = 16,
+                 max_on_disk: int = 500,
+                 max_age_days: Optional[float] = 30):
+        """
+        Initialize the registry
+
+        Args:
+            cache_dir: Directory for persisted models
+            max_in_memory: Maximum number of models kept in memory
+            max_on_disk: Maximum number of models kept on disk
+            max_age_days: Days without use after which a model is deleted (None keeps them)
+        """
+        self.cache_dir = cache_dir
+        self.max_in_memory = max_in_memory
+        self.max_on_disk = max_on_disk
+        self.max_age_days = max_age_days
+        self._touched: Dict[str, float] = {}
+        self._memory: "OrderedDict[str, Tuple[Any, Dict[str, Any]]]" = OrderedDict()
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._train_locks: Dict[str, threading.Lock] = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        for file_name in os.listdir(cache_dir):
+            if file_name.endswith(".json"):
+                try:
+                    with open(os.path.join(cache_dir, file_name)) as f:
+                        metadata = json.load(f)
+                    self._metadata[metadata["model_id"]] = metadata
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable model metadata {file_name}: {str(e)}")
+        self.cleanup()
+
+    def _paths(self, model_id: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, model_id)
+        return f"{base}.pkl", f"{base}.json"
+
+    def _history_path(self, model_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{model_id}.history.pkl")
+
+    def _remember(self, model_id: str, forecaster: Any, metadata: Dict[str, Any]):
+        self._memory[model_id] = (forecaster, metadata)
+        self._memory.move_to_end(model_id)
+        while len(self._memory) > self.max_in_memory:
+            self._memory.popitem(last=False)
+
+    def _touch(self, model_id: str):
+        # Record the use in the model file's mtime, at most once a minute per model
+        now = time.time()
+        if now - self._touched.get(model_id, 0.0) < 60:
+            return
+        self._touched[model_id] = now
+        try:
+            os.utime(self._paths(model_id)[0])
+        except OSError:
+            pass
+
+    def get(self, model_id: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """
+        Look up a fitted model
+
+        Args:
+            model_id: Model id returned by training
+
+        Returns:
+            Tuple of (forecaster, metadata), or None if unknown
+        """
+        with self._lock:
+            if model_id in self._memory:
+                self._memory.move_to_end(model_id)
+                self._touch(model_id)
+                return self._memory[model_id]
+            metadata = self._metadata.get(model_id)
+
+        model_path, metadata_path = self._paths(model_id)
+        if metadata is None:
+            # The model may have been trained by another process sharing cache_dir
+            try:
+                with open(metadata_path) as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+        try:
+            with open(model_path, "rb") as f:
+                forecaster = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            # AttributeError/ImportError: pickled by code whose classes have since moved or changed
+            logger.warning(f"Could not load model {model_id} from disk: {str(e)}")
+            return None
+
+        with self._lock:
+            self._metadata[model_id] = metadata
+            self._remember(model_id, forecaster, metadata)
+            self._touch(model_id)
+        return forecaster, metadata
+
+    def put(self, model_id: str, forecaster: Any, metadata: Dict[str, Any],
+            history: Optional[pd.DataFrame] = None):
+        """
+        Store a fitted model in memory and on disk
+
+        Models carrying a series_key replace older models of the same series.
+
+        Args:
+            model_id: Model id
+            forecaster: Fitted forecaster
+            metadata: JSON-serializable description of the model
+            history: Rows the model was trained on, kept for incremental updates
+        """
+        metadata = {**metadata, "model_id": model_id}
+        model_path, metadata_path = self._paths(model_id)
+        try:
+            tmp_path = f"{model_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(forecaster, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, model_path)
+            if history is not None:
+                history.to_pickle(self._history_path(model_id))
+            with open(metadata_path, "w") as f:
+                json.dump(metadata, f, default=str)
+        except Exception as e:
+            # Unpicklable models still work from memory for this process
+            logger.warning(f"Could not persist model {model_id}: {str(e)}")
+
+        with self._lock:
+            self._metadata[model_id] = metadata
+            self._remember(model_id, forecaster, metadata)
+
+        if metadata.get("series_key"):
+            self._invalidate_stale(metadata["series_key"], model_id)
+        self.cleanup()
+
+    def get_history(self, model_id: str) -> Optional[pd.DataFrame]:
+        """
+        Load the rows a model was trained on
+
+        Args:
+            model_id: Model id
+
+        Returns:
+            DataFrame with the date and target columns, or None if not kept
+        """
+        try:
+            return pd.read_pickle(self._history_path(model_id))
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def invalidate(self, model_id: str):
+        """
+        Remove a model from memory and disk
+
+        Args:
+            model_id: Model id
+        """
+        with self._lock:
+            self._memory.pop(model_id, None)
+            self._metadata.pop(model_id, None)
+            self._touched.pop(model_id, None)
+        for path in (*self._paths(model_id), self._history_path(model_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self) -> int:
+        """
+        Delete models unused for max_age_days and the least recently used ones beyond max_on_disk
+
+        Covers every model in cache_dir, including those written by other processes.
+
+        Returns:
+            Number of models deleted
+        """
+        last_used: Dict[str, float] = {}
+        try:
+            file_names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        for file_name in file_names:
+            model_id = file_name.split(".", 1)[0]
+            try:
+                mtime = os.stat(os.path.join(self.cache_dir, file_name)).st_mtime
+            except OSError:
+                continue
+            # A model's files share one id; its .pkl mtime tracks use
+            if file_name.endswith(".pkl") and not file_name.endswith(".history.pkl"):
+                last_used[model_id] = mtime
+            else:
+                last_used.setdefault(model_id, mtime)
+
+        by_age = sorted(last_used, key=last_used.get)
+        expired = set()
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            expired.update(model_id for model_id in by_age if last_used[model_id] < cutoff)
+        excess = len(by_age) - self.max_on_disk
+        if excess > 0:
+            expired.update(by_age[:excess])
+
+        for model_id in expired:
+            self.invalidate(model_id)
+        if expired:
+            logger.info(f"Deleted {len(expired)} unused forecast models from {self.cache_dir}")
+        return len(expired)
+
+    def _invalidate_stale(self, series_key: str, current_model_id: str):
+        with self._lock:
+            stale = [
+                model_id for model_id, metadata in self._metadata.items()
+                if metadata.get("series_key") == series_key and model_id != current_model_id
+            ]
+        for model_id in stale:
+            logger.info(f"Invalidating model {model_id}: source data changed")
+            self.invalidate(model_id)
+
+    def get_or_train(self,
+                     data: pd.DataFrame,
+                     date_column: str,
+                     target_column: str,
+                     model_type: str,
+                     factory: Callable[[str], Any],
+                     params: Optional[Dict[str, Any]] = None,
+                     source: Optional[str] = None,
+                     train_hooks: Optional[Dict[str, Any]] = None) -> Tuple[str, Any, Dict[str, Any], bool]:
+        """
+        Reuse a model fitted on identical data and settings, or train and register one
+
+        Args:
+            data: DataFrame with time series data
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+            model_type: Type of model
+            factory: Function building an untrained forecaster for a model type
+            params: Training hyperparameters passed to train()
+            source: Stable name of the data source; older models of the same source are invalidated
+            train_hooks: Extra train() arguments that do not change the model, such as
+                progress callbacks; not part of the model id
+
+        Returns:
+            Tuple of (model id, forecaster, metadata, whether an existing model was reused)
+        """
+        params = params or {}
+        fingerprint = dataset_fingerprint(data, date_column, target_column)
+        model_id = make_model_id(fingerprint, date_column, target_column, model_type, params)
+
+        with self._lock:
+            train_lock = self._train_locks.setdefault(model_id, threading.Lock())
+
+        # Concurrent requests for the same model wait for one fit instead of each training
+        try:
+            with train_lock:
+                entry = self.get(model_id)
+                if entry is not None:
+                    return model_id, entry[0], entry[1], True
+
+                forecaster = factory(model_type)
+                started = time.perf_counter()
+                train_result = forecaster.train(
+                    data=data,
+                    date_column=date_column,
+                    target_column=target_column,
+                    **params,
+                    **(train_hooks or {})
+                )
+                train_seconds = time.perf_counter() - started
+
+                series_key = None
+                if source:
+                    series_key = make_model_id(source, date_column, target_column, model_type, params)
+                metadata = {
+                    "date_column": date_column,
+                    "target_column": target_column,
+                    "model_type": model_type,
+                    "params": params,
+                    "data_fingerprint": fingerprint,
+                    "source": source,
+                    "series_key": series_key,
+                    "rows": len(data),
+                    "train_seconds": round(train_seconds, 3),
+                    "trained_at": time.time(),
+                    "train_result": train_result
+                }
+                self.put(model_id, forecaster, metadata, history=data[[date_column, target_column]])
+        finally:
+            # Also when the fit raised, so failed trainings do not leak lock entries
+            with self._lock:
+                self._train_locks.pop(model_id, None)
+        return model_id, forecaster, metadata, False
+
+
+_default_registry: Optional[ForecastModelRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_default_registry() -> ForecastModelRegistry:
+    """
+    Get the process-wide forecast model registry, configured from the environment
+
+    Returns:
+        Shared ForecastModelRegistry instance
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ForecastModelRegistry(
+                cache_dir=os.getenv("FORECAST_MODEL_CACHE_DIR", "data/cache/forecast_models"),
+                max_in_memory=int(os.getenv("FORECAST_MODELS_IN_MEMORY", "16")),
+                max_on_disk=int(os.getenv("FORECAST_MODELS_ON_DISK", "500")),
+                max_age_days=float(os.getenv("FORECAST_MODEL_TTL_DAYS", "30")) or None
+            )
+        return _default_registry
@@ -0,0 +1,229 @@
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("bottom_up", "top_down", "ols", "wls_struct", "mint_shrink")
+
+
+class Hierarchy:
+    """
+    Aggregation tree of a set of bottom-level series.
+
+    Levels are nested grouping columns, e.g. ["platform", "product"]: the
+    nodes are the total, every platform, and every platform/product pair
+    (the bottom level). The summing matrix S maps bottom series to all nodes,
+    so any aggregate is a matrix product away.
+    """
+
+    def __init__(self, bottom_keys: pd.DataFrame, levels: List[str]):
+        """
+        Build the hierarchy
+
+        Args:
+            bottom_keys: One row per bottom series with the level columns
+            levels: Level columns, from the top of the tree down
+        """
+        self.levels = levels
+        self.bottom_keys = bottom_keys[levels].reset_index(drop=True)
+        n_bottom = len(self.bottom_keys)
+
+        labels, depths, rows = ["total"], [0], [np.ones(n_bottom)]
+        for depth in range(1, len(levels) + 1):
+            columns = levels[:depth]
+            codes, uniques = pd.MultiIndex.from_frame(self.bottom_keys[columns]).factorize()
+            indicator = np.zeros((len(uniques), n_bottom))
+            indicator[codes, np.arange(n_bottom)] = 1.0
+            rows.extend(indicator)
+            for key in uniques:
+                key = key if isinstance(key, tuple) else (key,)
+                labels.append("/".join(f"{column}={value}" for column, value in zip(columns, key)))
+                depths.append(depth)
+
+        self.S = np.vstack(rows)
+        self.labels = labels
+        self.depths = np.array(depths)
+
+    @property
+    def level_names(self) -> List[str]:
+        return ["total"] + list(self.levels)
+
+    def level_index(self, name: str) -> int:
+        """Depth of a level given by name ('total' or a level column)"""
+        if name not in self.level_names:
+            raise ValueError(f"Unknown level '{name}', expected one of {self.level_names}")
+        return self.level_names.index(name)
+
+    def nodes_at(self, level_names: List[str]) -> np.ndarray:
+        """Row indices of S for all nodes at the given levels"""
+        depths = [self.level_index(name) for name in level_names]
+        return np.flatnonzero(np.isin(self.depths, depths))
+
+
+def bottom_level_matrix(data: pd.DataFrame,
+                        levels: List[str],
+                        date_column: str,
+                        target_column: str) -> Tuple[pd.DataFrame, np.ndarray, pd.DatetimeIndex]:
+    """
+    Pivot long-format data into one row per bottom series
+
+    Args:
+        data: Long-format DataFrame with the level, date and target columns
+        levels: Level columns, from the top of the tree down
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+
+    Returns:
+        Tuple of (bottom keys, values of shape (n_bottom, n_dates) with missing
+        periods as 0, sorted dates)
+    """
+    frame = data[levels + [date_column, target_column]].dropna(subset=[target_column])
+    frame = frame.assign(**{date_column: pd.to_datetime(frame[date_column])})
+    pivot = frame.pivot_table(index=levels, columns=date_column, values=target_column,
+                              aggfunc="sum", fill_value=0.0).sort_index(axis=1)
+    keys = pivot.index.to_frame(index=False)
+    return keys, pivot.to_numpy(dtype=float), pd.DatetimeIndex(pivot.columns)
+
+
+def shrunk_covariance(residuals: np.ndarray) -> np.ndarray:
+    """
+    Covariance of forecast residuals, shrunk towards its diagonal
+
+    Uses the Schäfer-Strimmer shrinkage intensity, so the estimate stays
+    positive definite even with more series than residual periods.
+
+    Args:
+        residuals: Array of shape (n_series, n_periods)
+
+    Returns:
+        Array of shape (n_series, n_series)
+    """
+    n = residuals.shape[1]
+    if n < 2:
+        raise ValueError("Shrinkage needs residuals for at least two periods")
+    centered = residuals - residuals.mean(axis=1, keepdims=True)
+    std = centered.std(axis=1, keepdims=True)
+    std[std == 0] = 1.0
+    standardized = centered / std
+    correlation = standardized @ standardized.T / n
+
+    # Variance of the correlation estimates drives the shrinkage intensity
+    squared = standardized ** 2
+    variance = (squared @ squared.T / n - correlation ** 2) * n / (n - 1) ** 2
+    off_diagonal = ~np.eye(len(correlation), dtype=bool)
+    denominator = (correlation[off_diagonal] ** 2).sum()
+    intensity = 1.0
+    if denominator > 0:
+        intensity = float(np.clip(variance[off_diagonal].sum() / denominator, 0, 1))
+
+    shrunk = correlation * (1 - intensity)
+    np.fill_diagonal(shrunk, 1.0)
+    return shrunk * (std @ std.T)
+
+
+def reconciliation_matrix(S: np.ndarray,
+                          forecast_rows: np.ndarray,
+                          method: str,
+                          bottom_history: Optional[np.ndarray] = None,
+                          residuals: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Compute the matrix G mapping base forecasts to bottom-level forecasts
+
+    Reconciled forecasts for every node are then S @ G @ y_hat, where y_hat
+    holds the base forecasts of the nodes in forecast_rows.
+
+    Args:
+        S: Summing matrix of shape (n_nodes, n_bottom)
+        forecast_rows: Indices of the nodes that have base forecasts
+        method: bottom_up, top_down, ols, wls_struct or mint_shrink
+        bottom_history: Bottom-level history (n_bottom, n_dates), for top_down proportions
+        residuals: Base forecast residuals (len(forecast_rows), n_periods), for mint_shrink
+
+    Returns:
+        Array of shape (n_bottom, len(forecast_rows))
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported method '{method}', expected one of {METHODS}")
+    n_nodes, n_bottom = S.shape
+    S_sub = S[forecast_rows]
+
+    if method == "bottom_up":
+        bottom_rows = np.arange(n_nodes - n_bottom, n_nodes)
+        positions = np.searchsorted(forecast_rows, bottom_rows)
+        if not np.array_equal(forecast_rows[np.minimum(positions, len(forecast_rows) - 1)], bottom_rows):
+            raise ValueError("bottom_up needs base forecasts for the bottom level")
+        G = np.zeros((n_bottom, len(forecast_rows)))
+        G[np.arange(n_bottom), positions] = 1.0
+        return G
+
+    if method == "top_down":
+        if 0 not in forecast_rows:
+            raise ValueError("top_down needs a base forecast for the total")
+        if bottom_history is None:
+            raise ValueError("top_down needs the bottom-level history")
+        # Average historical proportions
+        totals = bottom_history.sum(axis=0)
+        totals[totals == 0] = np.nan
+        proportions = np.nan_to_num(np.nanmean(bottom_history / totals, axis=1))
+        G = np.zeros((n_bottom, len(forecast_rows)))
+        G[:, int(np.flatnonzero(forecast_rows == 0)[0])] = proportions
+        return G
+
+    if method == "ols":
+        W_inv = np.eye(len(forecast_rows))
+    elif method == "wls_struct":
+        W_inv = np.diag(1.0 / S_sub.sum(axis=1))
+    else:
+        if residuals is None:
+            raise ValueError("mint_shrink needs base forecast residuals")
+        W_inv = np.linalg.pinv(shrunk_covariance(residuals))
+
+    # G = (S' W^-1 S)^-1 S' W^-1 over the forecast nodes; pinv covers level
+    # subsets that do not identify every bottom series
+    StW = S_sub.T @ W_inv
+    return np.linalg.pinv(StW @ S_sub) @ StW
+
+
+def reconcile(S: np.ndarray,
+              forecast_rows: np.ndarray,
+              base_forecasts: np.ndarray,
+              method: str,
+              bottom_history: Optional[np.ndarray] = None,
+              residuals: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Reconcile base forecasts into coherent forecasts for every node
+
+    Args:
+        S: Summing matrix of shape (n_nodes, n_bottom)
+        forecast_rows: Indices of the nodes that have base forecasts
+        base_forecasts: Array of shape (len(forecast_rows), horizon)
+        method: bottom_up, top_down, ols, wls_struct or mint_shrink
+        bottom_history: Bottom-level history, for top_down
+        residuals: Base forecast residuals, for mint_shrink
+
+    Returns:
+        Array of shape (n_nodes, horizon)
+    """
+    G = reconciliation_matrix(S, forecast_rows, method, bottom_history, residuals)
+    return S @ (G @ base_forecasts)
+
+
+def default_forecast_levels(hierarchy: Hierarchy, method: str) -> List[str]:
+    """
+    Levels that need base forecasts for a method
+
+    Args:
+        hierarchy: The hierarchy
+        method: Reconciliation method
+
+    Returns:
+        Level names
+    """
+    if method == "bottom_up":
+        return [hierarchy.level_names[-1]]
+    if method == "top_down":
+        return ["total"]
+    return hierarchy.level_names
@@ -0,0 +1,245 @@
+import copy
+import time
+import logging
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.ai.forecast_plots import predict_forecast
+
+logger = logging.getLogger(__name__)
+
+# Prophet constructor arguments that are stored verbatim as attributes
+_PROPHET_SETTINGS = (
+    "growth", "n_changepoints", "changepoint_range", "yearly_seasonality", "weekly_seasonality",
+    "daily_seasonality", "holidays", "seasonality_mode", "seasonality_prior_scale",
+    "holidays_prior_scale", "changepoint_prior_scale", "mcmc_samples", "interval_width",
+    "uncertainty_samples"
+)
+_AUTO_SEASONALITIES = ("yearly", "weekly", "daily")
+
+
+def prophet_stan_init(model: Any) -> Dict[str, Any]:
+    """
+    Extract the fitted parameters of a Prophet model as a Stan initialization
+
+    Args:
+        model: Fitted Prophet model
+
+    Returns:
+        Dictionary usable as Prophet.fit(..., init=...)
+    """
+    params = {}
+    for name in ("k", "m", "sigma_obs"):
+        params[name] = model.params[name][0][0]
+    for name in ("delta", "beta"):
+        params[name] = model.params[name][0]
+    return params
+
+
+def clone_prophet(model: Any) -> Any:
+    """
+    Build an unfitted Prophet model with the settings of a fitted one
+
+    Args:
+        model: Fitted Prophet model
+
+    Returns:
+        Unfitted Prophet model with the same settings, custom seasonalities and regressors
+    """
+    from prophet import Prophet
+
+    clone = Prophet(**{name: copy.deepcopy(getattr(model, name)) for name in _PROPHET_SETTINGS})
+    for name, props in model.seasonalities.items():
+        if name in _AUTO_SEASONALITIES:
+            continue
+        clone.add_seasonality(
+            name=name,
+            period=props["period"],
+            fourier_order=props["fourier_order"],
+            prior_scale=props["prior_scale"],
+            mode=props["mode"],
+            condition_name=props.get("condition_name")
+        )
+    for name, props in model.extra_regressors.items():
+        clone.add_regressor(name, prior_scale=props["prior_scale"], standardize=props["standardize"],
+                            mode=props["mode"])
+    return clone
+
+
+def is_prophet_model(model: Any) -> bool:
+    """Whether an object is a fitted Prophet model"""
+    try:
+        from prophet import Prophet
+    except ImportError:
+        return False
+    return isinstance(model, Prophet) and bool(getattr(model, "params", None))
+
+
+def new_observations(history: pd.DataFrame,
+                     new_data: pd.DataFrame,
+                     date_column: str,
+                     target_column: str) -> pd.DataFrame:
+    """
+    Get the rows of an upload that extend the training history
+
+    Rows are sorted by date, repeated dates keep their last value, and rows
+    dated at or before the last trained date are dropped, so re-uploading
+    overlapping or unsorted data does not count as new observations.
+
+    Args:
+        history: Rows the forecaster was trained on
+        new_data: Uploaded rows
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+
+    Returns:
+        DataFrame with the date (as datetimes) and target columns of the new rows
+    """
+    frame = new_data[[date_column, target_column]].dropna()
+    frame = frame.assign(**{date_column: pd.to_datetime(frame[date_column])})
+    frame = frame.sort_values(date_column, kind="stable").drop_duplicates(subset=date_column, keep="last")
+    last_trained = pd.to_datetime(history[date_column]).max()
+    return frame[frame[date_column] > last_trained].reset_index(drop=True)
+
+
+def drift_score(forecaster: Any,
+                history: pd.DataFrame,
+                new_data: pd.DataFrame,
+                date_column: str,
+                target_column: str,
+                frequency: str = 'D') -> float:
+    """
+    Score how far new observations are from what the current model expected
+
+    The model's forecast error on the new rows is scaled by the in-sample MAE
+    of a naive one-step forecast on the history (as in MASE), so 1.0 means the
+    model did about as well as repeating the last value. Only rows after the
+    last trained date count (see new_observations), and each is compared with
+    the forecast for its own date.
+
+    Args:
+        forecaster: Fitted forecaster
+        history: Rows the forecaster was trained on
+        new_data: Newly observed rows
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        frequency: Frequency of the series
+
+    Returns:
+        Scaled forecast error (0.0 without new rows, inf if it cannot be computed)
+    """
+    observed = new_observations(history, new_data, date_column, target_column)
+    if observed.empty:
+        return 0.0
+
+    # Forecast far enough past the last trained date to cover the newest observation
+    last_trained = pd.to_datetime(history[date_column]).max()
+    periods = len(pd.date_range(start=last_trained, end=observed[date_column].iloc[-1], freq=frequency)) - 1
+    rows = predict_forecast(forecaster, periods=max(periods, 1), frequency=frequency)["forecast"]
+    predicted = pd.Series(
+        [row["yhat"] for row in rows], index=pd.to_datetime([row["ds"] for row in rows]), dtype=float
+    )
+    predicted = predicted[~predicted.index.duplicated(keep="last")]
+    expected = predicted.reindex(observed[date_column]).to_numpy()
+    matched = ~np.isnan(expected)
+    if not matched.any():
+        return float("inf")
+    actual = observed[target_column].to_numpy(dtype=float)
+
+    scale = np.mean(np.abs(np.diff(history[target_column].to_numpy(dtype=float))))
+    if not np.isfinite(scale) or scale == 0:
+        return float("inf")
+    return float(np.mean(np.abs(actual[matched] - expected[matched])) / scale)
+
+
+def update_forecaster(forecaster: Any,
+                      history: pd.DataFrame,
+                      new_data: pd.DataFrame,
+                      date_column: str,
+                      target_column: str,
+                      refit: Callable[[pd.DataFrame], Any],
+                      drift_threshold: float = 3.0,
+                      frequency: str = 'D') -> Tuple[Any, Dict[str, Any], pd.DataFrame]:
+    """
+    Update a fitted forecaster with new observations, as cheaply as drift allows
+
+    Only rows after the last trained date are used (see new_observations).
+
+    Strategies, cheapest first:
+        unchanged: the upload has no rows after the last trained date
+        state_update: the forecaster has its own update(new_data, ...) method
+        warm_start: the underlying model is Prophet; refit from the previous
+            parameters, which converges in a fraction of the iterations
+        full_refit: drift above drift_threshold, or no cheaper path exists
+
+    Args:
+        forecaster: Fitted forecaster
+        history: Rows the forecaster was trained on
+        new_data: Newly observed rows
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        refit: Function training a new forecaster on a full frame
+        drift_threshold: Drift score above which the model is refit from scratch
+        frequency: Frequency of the series
+
+    Returns:
+        Tuple of (updated forecaster, report with strategy, drift score and
+        update_seconds, combined history)
+    """
+    observed = new_observations(history, new_data, date_column, target_column)
+    if observed.empty:
+        # Nothing after the last trained date: keep the model as it is
+        report = {
+            "strategy": "unchanged",
+            "drift_score": None,
+            "drift_threshold": drift_threshold,
+            "new_rows": 0,
+            "rows": len(history),
+            "update_seconds": 0.0
+        }
+        return forecaster, report, history
+
+    combined = pd.concat(
+        [history.assign(**{date_column: pd.to_datetime(history[date_column])}), observed], ignore_index=True
+    )
+
+    try:
+        drift = drift_score(forecaster, history, observed, date_column, target_column, frequency)
+    except Exception as e:
+        logger.warning(f"Could not score drift, refitting: {str(e)}")
+        drift = float("inf")
+
+    started = time.perf_counter()
+    strategy = "full_refit"
+    if drift <= drift_threshold:
+        model = getattr(forecaster, "model", None)
+        if callable(getattr(forecaster, "update", None)):
+            # The previous model may still be served from the registry, so update a copy
+            forecaster = copy.deepcopy(forecaster)
+            forecaster.update(observed, date_column=date_column, target_column=target_column)
+            strategy = "state_update"
+        elif is_prophet_model(model):
+            warm = clone_prophet(model)
+            frame = combined.rename(columns={date_column: "ds", target_column: "y"})
+            frame["ds"] = pd.to_datetime(frame["ds"])
+            warm.fit(frame, init=prophet_stan_init(model))
+            updated = copy.copy(forecaster)
+            updated.model = warm
+            forecaster = updated
+            strategy = "warm_start"
+
+    if strategy == "full_refit":
+        forecaster = refit(combined)
+
+    report = {
+        "strategy": strategy,
+        "drift_score": round(drift, 4) if np.isfinite(drift) else None,
+        "drift_threshold": drift_threshold,
+        "new_rows": len(observed),
+        "rows": len(combined),
+        "update_seconds": round(time.perf_counter() - started, 3)
+    }
+    logger.info(f"Forecaster update: {strategy} (drift {report['drift_score']})")
+    return forecaster, report, combined
@@ -0,0 +1,255 @@
+import argparse
+import time
+import logging
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def approximate_token_count(texts: List[str]) -> np.ndarray:
+    """
+    Estimate token counts when no tokenizer is available
+
+    Args:
+        texts: List of texts
+
+    Returns:
+        Array with an approximate token count per text (~1.3 subword tokens per word)
+    """
+    return np.array([int(len(text.split()) * 1.3) + 2 for text in texts], dtype=np.int64)
+
+
+def tokenizer_token_count(tokenizer: Any, texts: List[str], max_length: int = 512) -> np.ndarray:
+    """
+    Count tokens with a Hugging Face tokenizer, without padding
+
+    Args:
+        tokenizer: Hugging Face tokenizer
+        texts: List of texts
+        max_length: Truncation length used by the model
+
+    Returns:
+        Array with the token count per text
+    """
+    encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)
+    return np.array([len(ids) for ids in encoded["input_ids"]], dtype=np.int64)
+
+
+def plan_token_batches(lengths: np.ndarray,
+                       max_tokens: int = 8192,
+                       max_batch_size: int = 64) -> List[np.ndarray]:
+    """
+    Group inputs into length-sorted batches under a padded token budget
+
+    Inputs are sorted by length so each batch holds similar lengths, and a batch
+    is closed once (batch size x longest input) would exceed ``max_tokens``.
+
+    Args:
+        lengths: Token count per input
+        max_tokens: Maximum padded tokens per batch
+        max_batch_size: Maximum number of inputs per batch
+
+    Returns:
+        List of index arrays into the original inputs, one per batch
+    """
+    order = np.argsort(lengths, kind="stable")
+    sorted_lengths = lengths[order]
+
+    batches = []
+    start = 0
+    n = len(order)
+    while start < n:
+        end = start + 1
+        # Lengths are ascending, so the padded cost of [start, end) is (end - start) * sorted_lengths[end - 1]
+        while (end < n
+               and end - start < max_batch_size
+               and (end - start + 1) * sorted_lengths[end] <= max_tokens):
+            end += 1
+        batches.append(order[start:end])
+        start = end
+    return batches
+
+
+def padded_token_count(lengths: np.ndarray, batches: List[np.ndarray]) -> int:
+    """
+    Count the tokens actually computed when each batch is padded to its longest input
+
+    Args:
+        lengths: Token count per input
+        batches: Index arrays, one per batch
+
+    Returns:
+        Total padded tokens
+    """
+    return int(sum(len(batch) * lengths[batch].max() for batch in batches if len(batch)))
+
+
+class BucketedBatchAnalyzer:
+    """
+    Runs analyze_batch over length-bucketed, token-budgeted sub-batches.
+
+    Results are returned in the original input order.
+    """
+
+    def __init__(self,
+                 analyzer: Any,
+                 max_tokens: int = 8192,
+                 max_batch_size: int = 64,
+                 count_tokens: Optional[Callable[[List[str]], np.ndarray]] = None):
+        """
+        Initialize the wrapper
+
+        Args:
+            analyzer: Object providing analyze_text(text) and analyze_batch(texts)
+            max_tokens: Maximum padded tokens per model call
+            max_batch_size: Maximum number of texts per model call
+            count_tokens: Function returning token counts (uses the analyzer's tokenizer if omitted)
+        """
+        self.analyzer = analyzer
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+
+        if count_tokens is None:
+            tokenizer = getattr(analyzer, "tokenizer", None)
+            if tokenizer is not None:
+                count_tokens = lambda texts: tokenizer_token_count(tokenizer, texts)
+            else:
+                count_tokens = approximate_token_count
+        self.count_tokens = count_tokens
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose model identity and other attributes of the wrapped analyzer
+        if name == "analyzer":
+            raise AttributeError(name)
+        return getattr(self.analyzer, name)
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        return self.analyzer.analyze_text(text)
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts in length-sorted sub-batches
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results, in input order
+        """
+        if len(texts) <= 1:
+            return self.analyzer.analyze_batch(texts)
+
+        lengths = self.count_tokens(texts)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        for batch in plan_token_batches(lengths, self.max_tokens, self.max_batch_size):
+            batch_results = self.analyzer.analyze_batch([texts[i] for i in batch])
+            for i, result in zip(batch, batch_results):
+                results[i] = result
+        return results
+
+
+def benchmark_bucketing(texts: List[str],
+                        analyze_batch: Optional[Callable[[List[str]], List[Dict[str, Any]]]] = None,
+                        count_tokens: Callable[[List[str]], np.ndarray] = approximate_token_count,
+                        batch_size: int = 32,
+                        max_tokens: int = 8192) -> Dict[str, Any]:
+    """
+    Compare fixed-size batching in arrival order with length-bucketed batching
+
+    Args:
+        texts: Corpus to analyze (ideally mixed tweets, reviews and reddit posts)
+        analyze_batch: Model batch function to time (padding statistics only if omitted)
+        count_tokens: Function returning token counts
+        batch_size: Batch size of the naive strategy, and the cap for bucketed batches
+        max_tokens: Padded token budget per bucketed batch
+
+    Returns:
+        Dictionary with padded token counts, padding efficiency and throughput per strategy
+    """
+    lengths = count_tokens(texts)
+    naive = [np.arange(i, min(i + batch_size, len(texts))) for i in range(0, len(texts), batch_size)]
+    bucketed = plan_token_batches(lengths, max_tokens, batch_size)
+    real_tokens = int(lengths.sum())
+
+    report = {"texts": len(texts), "real_tokens": real_tokens}
+    for name, batches in (("naive", naive), ("bucketed", bucketed)):
+        padded = padded_token_count(lengths, batches)
+        entry = {
+            "batches": len(batches),
+            "padded_tokens": padded,
+            "padding_efficiency": round(real_tokens / padded, 4) if padded else 1.0
+        }
+        if analyze_batch is not None:
+            started = time.perf_counter()
+            for batch in batches:
+                analyze_batch([texts[i] for i in batch])
+            elapsed = time.perf_counter() - started
+            entry["seconds"] = round(elapsed, 3)
+            entry["texts_per_second"] = round(len(texts) / elapsed, 1) if elapsed else None
+        report[name] = entry
+
+    if analyze_batch is not None and report["bucketed"]["seconds"]:
+        report["speedup"] = round(report["naive"]["seconds"] / report["bucketed"]["seconds"], 2)
+    report["padded_token_reduction"] = round(
+        1 - report["bucketed"]["padded_tokens"] / report["naive"]["padded_tokens"], 4
+    ) if report["naive"]["padded_tokens"] else 0.0
+    return report
+
+
+def load_scraped_texts(file_paths: List[str]) -> List[str]:
+    """
+    Load texts from the data pipeline's scraper CSV output
+
+    Reddit rows use title plus content, matching how they are analyzed.
+
+    Args:
+        file_paths: Paths of twitter/reddit/reviews CSV files
+
+    Returns:
+        List of texts in file order
+    """
+    import pandas as pd
+
+    texts = []
+    for file_path in file_paths:
+        df = pd.read_csv(file_path)
+        if "title" in df.columns and "content" in df.columns:
+            texts.extend((df["title"].fillna("") + " " + df["content"].fillna("")).tolist())
+        elif "text" in df.columns:
+            texts.extend(df["text"].fillna("").tolist())
+    return texts
+
+
+def main():
+    """Run the bucketing benchmark on scraper output files"""
+    parser = argparse.ArgumentParser(description="Benchmark length-bucketed sentiment batching")
+    parser.add_argument("files", nargs="+", help="Scraper CSV files (twitter, reddit, reviews)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=8192)
+    parser.add_argument("--padding-only", action="store_true",
+                        help="Only report padding statistics, without running the model")
+    args = parser.parse_args()
+
+    import random
+    texts = load_scraped_texts(args.files)
+    random.Random(0).shuffle(texts)  # Interleave sources like live traffic
+
+    analyze_batch = None
+    count_tokens = approximate_token_count
+    if not args.padding_only:
+        from app.core.ai.model_registry import get_sentiment_analyzer
+        analyzer = get_sentiment_analyzer()
+        if isinstance(analyzer, BucketedBatchAnalyzer):
+            # Time the raw model so the naive strategy is not bucketed behind our back
+            analyzer = analyzer.analyzer
+        analyze_batch = analyzer.analyze_batch
+        tokenizer = getattr(analyzer, "tokenizer", None)
+        if tokenizer is not None:
+            count_tokens = lambda batch: tokenizer_token_count(tokenizer, batch)
+
+    print(benchmark_bucketing(texts, analyze_batch, count_tokens, args.batch_size, args.max_tokens))
+
+
+if __name__ == "__main__":
+    main()
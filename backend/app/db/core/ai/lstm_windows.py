@@ -0,0 +1,328 @@
+import argparse
+import time
+import logging
+import tracemalloc
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WindowedSeries:
+    """
+    Lookback windows over one or more series, without materializing them.
+
+    All series are standardized into one contiguous float32 buffer; windows
+    are strided views into it (sliding_window_view), so the dataset costs no
+    memory beyond the raw series. Only the windows of the batch being yielded
+    are copied, with a single fancy index per batch. Windows never cross
+    series boundaries.
+    """
+
+    def __init__(self,
+                 series: Sequence[np.ndarray],
+                 lookback: int,
+                 horizon: int = 1,
+                 target_index: int = 0,
+                 scale: bool = True):
+        """
+        Build the window index
+
+        Args:
+            series: Arrays of shape (n_obs,) or (n_obs, n_features), one per series
+            lookback: Input steps per window
+            horizon: Target steps after each window
+            target_index: Feature column that is forecast
+            scale: Standardize each series by its own mean and standard deviation
+        """
+        if lookback < 1 or horizon < 1:
+            raise ValueError("lookback and horizon must be positive")
+        if not len(series):
+            raise ValueError("No series provided")
+        self.lookback = lookback
+        self.horizon = horizon
+        self.target_index = target_index
+        window = lookback + horizon
+
+        shapes = [np.shape(values) for values in series]
+        self.n_features = shapes[0][1] if len(shapes[0]) > 1 else 1
+        if any((shape[1] if len(shape) > 1 else 1) != self.n_features for shape in shapes):
+            raise ValueError("All series must have the same number of features")
+        lengths = np.array([shape[0] for shape in shapes], dtype=np.int64)
+        starts = np.concatenate([[0], np.cumsum(lengths)])
+
+        self.buffer = np.empty((int(starts[-1]), self.n_features), dtype=np.float32)
+        self.mean = np.zeros((len(series), self.n_features), dtype=np.float32)
+        self.std = np.ones((len(series), self.n_features), dtype=np.float32)
+        for i, values in enumerate(series):
+            part = self.buffer[starts[i]:starts[i + 1]]
+            part[:] = np.asarray(values, dtype=np.float32).reshape(len(part), self.n_features)
+            if scale and len(part):
+                self.mean[i] = part.mean(axis=0)
+                std = part.std(axis=0)
+                self.std[i] = np.where(std > 0, std, 1.0)
+                part -= self.mean[i]
+                part /= self.std[i]
+        self.series = [self.buffer[starts[i]:starts[i + 1]] for i in range(len(series))]
+
+        # Window k of series i starts at buffer row k + shift[i]; series shorter
+        # than one window contribute none
+        counts = np.maximum(lengths - window + 1, 0)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        if self._offsets[-1] == 0:
+            raise ValueError(f"No series is longer than lookback + horizon ({window})")
+        self._shift = starts[:-1] - self._offsets[:-1]
+        # (n_rows - window + 1, window, n_features) view of the buffer
+        self._view = np.lib.stride_tricks.sliding_window_view(self.buffer, window, axis=0).transpose(0, 2, 1)
+
+    @classmethod
+    def from_frame(cls,
+                   data: pd.DataFrame,
+                   date_column: str,
+                   target_column: str,
+                   lookback: int,
+                   horizon: int = 1,
+                   series_column: Optional[str] = None,
+                   feature_columns: Optional[List[str]] = None,
+                   scale: bool = True) -> "WindowedSeries":
+        """
+        Build windows from a (long-format) DataFrame
+
+        Args:
+            data: DataFrame with time series data
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+            lookback: Input steps per window
+            horizon: Target steps after each window
+            series_column: Name of column identifying series, to train on several at once
+            feature_columns: Extra input columns besides the target
+            scale: Standardize each series by its own mean and standard deviation
+
+        Returns:
+            WindowedSeries with the target as feature 0
+        """
+        columns = [target_column] + list(feature_columns or [])
+        frame = data.sort_values([series_column, date_column] if series_column else date_column, kind="stable")
+        if series_column is None:
+            series = [frame[columns].to_numpy(dtype=np.float32)]
+        else:
+            series = [group[columns].to_numpy(dtype=np.float32)
+                      for _, group in frame.groupby(series_column, sort=False)]
+        return cls(series, lookback, horizon, target_index=0, scale=scale)
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the series buffer"""
+        return self.buffer.nbytes
+
+    def steps_per_epoch(self, batch_size: int, drop_last: bool = False) -> int:
+        return len(self) // batch_size if drop_last else -(-len(self) // batch_size)
+
+    def gather(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy a set of windows into a training batch
+
+        Args:
+            indices: Global window indices
+
+        Returns:
+            Tuple of X with shape (len(indices), lookback, n_features) and
+            y with shape (len(indices), horizon), both standardized
+        """
+        series_ids = np.searchsorted(self._offsets, indices, side="right") - 1
+        windows = self._view[indices + self._shift[series_ids]]
+        return windows[:, :self.lookback], windows[:, self.lookback:, self.target_index]
+
+    def iter_batches(self,
+                     batch_size: int = 32,
+                     shuffle: bool = True,
+                     seed: Optional[int] = None,
+                     drop_last: bool = False) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stream one epoch of training batches
+
+        Args:
+            batch_size: Windows per batch
+            shuffle: Shuffle windows across all series
+            seed: Random seed for shuffling
+            drop_last: Skip the final incomplete batch
+
+        Yields:
+            Tuples of (X, y) as returned by gather
+        """
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        stop = len(order) - len(order) % batch_size if drop_last else len(order)
+        for start in range(0, stop, batch_size):
+            indices = order[start:start + batch_size]
+            if shuffle:
+                # Sorted indices read the buffer in order
+                indices = np.sort(indices)
+            yield self.gather(indices)
+
+    def to_tf_dataset(self, batch_size: int = 32, shuffle: bool = True, seed: Optional[int] = None):
+        """
+        Wrap the batch generator as a tf.data.Dataset for Keras fit()
+
+        Args:
+            batch_size: Windows per batch
+            shuffle: Shuffle windows across all series each epoch
+            seed: Random seed of the first epoch
+
+        Returns:
+            tf.data.Dataset yielding (X, y) batches, prefetched
+        """
+        import tensorflow as tf
+
+        epochs = iter(range(1 << 30))
+
+        def generate():
+            epoch = next(epochs)
+            return self.iter_batches(batch_size, shuffle, None if seed is None else seed + epoch)
+
+        dataset = tf.data.Dataset.from_generator(
+            generate,
+            output_signature=(
+                tf.TensorSpec(shape=(None, self.lookback, self.n_features), dtype=tf.float32),
+                tf.TensorSpec(shape=(None, self.horizon), dtype=tf.float32)
+            )
+        )
+        return dataset.prefetch(2)
+
+
+def naive_windows(series: Sequence[np.ndarray],
+                  lookback: int,
+                  horizon: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Materialize every window with a Python loop, for comparison
+
+    Args:
+        series: Arrays of shape (n_obs,) or (n_obs, n_features), one per series
+        lookback: Input steps per window
+        horizon: Target steps after each window
+
+    Returns:
+        Tuple of X with shape (n_windows, lookback, n_features) and y with shape (n_windows, horizon)
+    """
+    X, y = [], []
+    for values in series:
+        values = np.asarray(values, dtype=np.float32)
+        values = values.reshape(len(values), -1)
+        mean, std = values.mean(axis=0), values.std(axis=0)
+        values = (values - mean) / np.where(std > 0, std, 1.0)
+        for start in range(len(values) - lookback - horizon + 1):
+            X.append(values[start:start + lookback])
+            y.append(values[start + lookback:start + lookback + horizon, 0])
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+
+
+def _measure(run: Callable[[], Any]) -> Tuple[float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        run()
+        return time.perf_counter() - started, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_windows(series: Sequence[np.ndarray],
+                      lookback: int,
+                      horizon: int = 1,
+                      batch_size: int = 64,
+                      epochs: int = 1,
+                      train_step: Optional[Callable[[np.ndarray, np.ndarray], Any]] = None) -> Dict[str, Any]:
+    """
+    Compare naive window materialization with strided windows
+
+    Both strategies build their dataset and run the epochs inside the
+    measurement; peak memory is the tracemalloc peak above the raw series.
+
+    Args:
+        series: Arrays of shape (n_obs,) or (n_obs, n_features), one per series
+        lookback: Input steps per window
+        horizon: Target steps after each window
+        batch_size: Windows per batch
+        epochs: Epochs to run
+        train_step: Function called with each (X, y) batch, e.g. a Keras
+            train_on_batch; batches are only produced if omitted
+
+    Returns:
+        Dictionary with build time, epoch time and peak memory per strategy
+    """
+    train_step = train_step or (lambda X, y: None)
+    raw_bytes = sum(np.asarray(values, dtype=np.float32).nbytes for values in series)
+    report: Dict[str, Any] = {"series": len(series), "raw_bytes": raw_bytes}
+
+    def run_naive():
+        started = time.perf_counter()
+        X, y = naive_windows(series, lookback, horizon)
+        report["naive"] = {"windows": len(X), "build_seconds": time.perf_counter() - started}
+        rng = np.random.default_rng(0)
+        started = time.perf_counter()
+        for _ in range(epochs):
+            order = rng.permutation(len(X))
+            for start in range(0, len(order), batch_size):
+                indices = order[start:start + batch_size]
+                train_step(X[indices], y[indices])
+        report["naive"]["epoch_seconds"] = (time.perf_counter() - started) / epochs
+
+    def run_strided():
+        started = time.perf_counter()
+        windows = WindowedSeries(series, lookback, horizon)
+        report["strided"] = {"windows": len(windows), "build_seconds": time.perf_counter() - started}
+        started = time.perf_counter()
+        for epoch in range(epochs):
+            for X, y in windows.iter_batches(batch_size, shuffle=True, seed=epoch):
+                train_step(X, y)
+        report["strided"]["epoch_seconds"] = (time.perf_counter() - started) / epochs
+
+    for name, run in (("naive", run_naive), ("strided", run_strided)):
+        _, peak = _measure(run)
+        entry = report[name]
+        entry["build_seconds"] = round(entry["build_seconds"], 4)
+        entry["epoch_seconds"] = round(entry["epoch_seconds"], 4)
+        entry["peak_bytes"] = peak
+        entry["peak_to_raw"] = round(peak / raw_bytes, 2) if raw_bytes else None
+
+    report["memory_reduction"] = round(report["naive"]["peak_bytes"] / max(report["strided"]["peak_bytes"], 1), 1)
+    return report
+
+
+def main():
+    """Benchmark LSTM window construction on synthetic or CSV series"""
+    parser = argparse.ArgumentParser(description="Benchmark strided LSTM training windows")
+    parser.add_argument("--file", help="CSV file with the series (synthetic series if omitted)")
+    parser.add_argument("--date-column", default="date")
+    parser.add_argument("--target-column", default="value")
+    parser.add_argument("--series-column")
+    parser.add_argument("--series", type=int, default=20, help="Synthetic series count")
+    parser.add_argument("--length", type=int, default=5000, help="Synthetic series length")
+    parser.add_argument("--lookback", type=int, default=60)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.file:
+        columns = [c for c in (args.series_column, args.date_column, args.target_column) if c]
+        data = pd.read_csv(args.file, usecols=columns)
+        series = WindowedSeries.from_frame(
+            data, args.date_column, args.target_column, args.lookback, args.horizon, args.series_column
+        ).series
+    else:
+        rng = np.random.default_rng(0)
+        steps = np.arange(args.length)
+        series = [
+            10 + np.sin(2 * np.pi * steps / 24) + 0.01 * steps + rng.normal(0, 0.3, args.length)
+            for _ in range(args.series)
+        ]
+
+    print(benchmark_windows(series, args.lookback, args.horizon, args.batch_size, args.epochs))
+
+
+if __name__ == "__main__":
+    main()
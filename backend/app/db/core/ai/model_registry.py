@@ -0,0 +1,266 @@
+import functools
+import os
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _ModelSlot:
+    """Holds one lazily loaded model and its loading state"""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.model: Any = None
+        self.status = "idle"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of shared, lazily loaded models.
+
+    Each model is built at most once per process, either on first use or by
+    ``warm_up()``. Calling ``warm_up(background=False)`` in a pre-fork master
+    (e.g. gunicorn ``--preload``) loads weights before workers are forked so
+    they share the memory copy-on-write.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, _ModelSlot] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """
+        Register a model factory
+
+        Args:
+            name: Name used to look the model up
+            factory: Zero-argument function that builds the model
+        """
+        with self._lock:
+            if name not in self._slots:
+                self._slots[name] = _ModelSlot(name, factory)
+
+    def _slot(self, name: str) -> _ModelSlot:
+        slot = self._slots.get(name)
+        if slot is None:
+            raise KeyError(f"Unknown model: {name}")
+        return slot
+
+    def _load(self, slot: _ModelSlot):
+        with slot.lock:
+            if slot.status == "ready":
+                return
+            slot.status = "loading"
+            slot.error = None
+            logger.info(f"Loading model '{slot.name}'")
+            started = time.perf_counter()
+            try:
+                slot.model = slot.factory()
+            except Exception as e:
+                slot.status = "failed"
+                slot.error = str(e)
+                logger.error(f"Error loading model '{slot.name}': {str(e)}")
+                raise
+            slot.load_seconds = round(time.perf_counter() - started, 3)
+            slot.status = "ready"
+            logger.info(f"Model '{slot.name}' ready in {slot.load_seconds}s")
+
+    def get(self, name: str) -> Any:
+        """
+        Get a model, loading it on first use
+
+        Args:
+            name: Registered model name
+
+        Returns:
+            The shared model instance
+        """
+        slot = self._slot(name)
+        if slot.status != "ready":
+            self._load(slot)
+        return slot.model
+
+    def warm_up(self, names: Optional[list] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request
+
+        Args:
+            names: Models to load (all registered models if omitted)
+            background: Load in a daemon thread instead of blocking
+
+        Returns:
+            The loading thread when background is True, otherwise None
+        """
+        slots = [self._slot(name) for name in (names or list(self._slots))]
+
+        def load_all():
+            for slot in slots:
+                try:
+                    self._load(slot)
+                except Exception:
+                    # Already logged; the slot reports the failure
+                    pass
+
+        if not background:
+            load_all()
+            return None
+
+        for slot in slots:
+            if slot.status == "idle":
+                slot.status = "loading"
+        thread = threading.Thread(target=load_all, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get loading status of all registered models
+
+        Returns:
+            Dictionary with an overall readiness flag and per-model status
+        """
+        models = {
+            name: {
+                "status": slot.status,
+                "load_seconds": slot.load_seconds,
+                "error": slot.error
+            }
+            for name, slot in self._slots.items()
+        }
+        return {
+            "ready": bool(models) and all(m["status"] == "ready" for m in models.values()),
+            "models": models
+        }
+
+
+def build_sentiment_analyzer(use_openai: bool = False) -> Any:
+    """
+    Build a sentiment analyzer in the current process
+
+    Args:
+        use_openai: Whether to use the OpenAI backend instead of Hugging Face
+
+    Returns:
+        SentimentAnalyzer, wrapped with length bucketing for the local model
+    """
+    # Imported lazily so registering models does not pull in torch/transformers
+    precision = os.getenv("SENTIMENT_PRECISION", "")
+    if use_openai or not precision:
+        from app.core.ai.sentiment_analysis import SentimentAnalyzer
+        analyzer = SentimentAnalyzer(use_openai=use_openai)
+    else:
+        # Explicit precision selects the model at construction, e.g. cached int8 weights
+        from app.core.ai.quantized_model import DEFAULT_MODEL_NAME, TransformerSentimentModel
+        analyzer = TransformerSentimentModel(
+            model_name=os.getenv("SENTIMENT_MODEL_NAME", DEFAULT_MODEL_NAME),
+            precision=precision,
+            cache_dir=os.getenv("SENTIMENT_MODEL_CACHE_DIR", "data/cache/models")
+        )
+    if use_openai:
+        return analyzer
+
+    # Keep similar lengths together so local transformer batches carry little padding
+    from app.core.ai.length_bucketing import BucketedBatchAnalyzer
+    return BucketedBatchAnalyzer(
+        analyzer,
+        max_tokens=int(os.getenv("SENTIMENT_MAX_BATCH_TOKENS", "8192")),
+        max_batch_size=int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "32"))
+    )
+
+
+def _build_default_sentiment_engine() -> Any:
+    # Opt-in multi-process inference for CPU-only nodes
+    workers = int(os.getenv("SENTIMENT_INFERENCE_WORKERS", "0"))
+    if workers <= 0:
+        return build_sentiment_analyzer(use_openai=False)
+
+    from app.core.ai.inference_pool import ProcessPoolInferenceEngine
+    return ProcessPoolInferenceEngine(
+        functools.partial(build_sentiment_analyzer, use_openai=False),
+        num_workers=workers,
+        intra_op_threads=int(os.getenv("SENTIMENT_INTRA_OP_THREADS", "2")),
+        shard_size=int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "32"))
+    )
+
+
+def _build_openai_backend() -> Any:
+    # Packed, concurrency-limited async client instead of one blocking call per text
+    from app.core.ai.openai_backend import build_openai_backend_from_env
+    return build_openai_backend_from_env()
+
+
+def _cascade_threshold() -> Optional[float]:
+    value = os.getenv("SENTIMENT_CASCADE_THRESHOLD", "")
+    return float(value) if value else None
+
+
+def _with_cascade(analyzer: Any, tier: str) -> Any:
+    # Let the lexicon tier answer confident texts before the model sees them
+    threshold = _cascade_threshold()
+    if threshold is None:
+        return analyzer
+
+    from app.core.ai.sentiment_cascade import CascadeSentimentAnalyzer
+    return CascadeSentimentAnalyzer(analyzer, threshold=threshold, fallback_tier=tier)
+
+
+registry = ModelRegistry()
+registry.register(
+    "sentiment-huggingface",
+    lambda: _with_cascade(_build_default_sentiment_engine(), tier="transformer")
+)
+registry.register(
+    "sentiment-openai",
+    lambda: _with_cascade(_build_openai_backend(), tier="openai")
+)
+
+
+def get_sentiment_analyzer(use_openai: bool = False) -> Any:
+    """
+    Get the shared sentiment analyzer for this process
+
+    Args:
+        use_openai: Whether to use the OpenAI backend instead of Hugging Face
+
+    Returns:
+        Shared SentimentAnalyzer instance
+    """
+    return registry.get("sentiment-openai" if use_openai else "sentiment-huggingface")
+
+
+class SharedSentimentAnalyzer:
+    """
+    Lightweight handle to the registry's shared sentiment analyzer.
+
+    Constructing it is free; the underlying model is resolved on first call.
+    """
+
+    def __init__(self, use_openai: bool = False):
+        self.use_openai = use_openai
+        # Cache identity; the model, precision and cascade settings change the results
+        if use_openai:
+            backend = f"openai|model={os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')}"
+        else:
+            from app.core.ai.quantized_model import DEFAULT_MODEL_NAME
+            backend = (
+                f"huggingface|model={os.getenv('SENTIMENT_MODEL_NAME', DEFAULT_MODEL_NAME)}"
+                f"|precision={os.getenv('SENTIMENT_PRECISION', '')}"
+            )
+        self.model_id = f"{backend}|cascade={_cascade_threshold()}"
+
+    @property
+    def analyzer(self) -> Any:
+        return get_sentiment_analyzer(self.use_openai)
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        return self.analyzer.analyze_text(text)
+
+    def analyze_batch(self, texts: list) -> list:
+        return self.analyzer.analyze_batch(texts)
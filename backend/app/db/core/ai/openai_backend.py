@@ -0,0 +1,377 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+SYSTEM_PROMPT = (
+    "You are a sentiment classifier. You receive a JSON array of objects with an "
+    "'index' and a 'text'. Respond with a JSON object of the form "
+    '{"results": [{"index": <int>, "sentiment": "positive"|"neutral"|"negative", '
+    '"confidence": <float between 0 and 1>}]} containing exactly one entry per input.'
+)
+
+
+class TokenBudget:
+    """
+    Token bucket enforcing a per-minute token budget across concurrent requests.
+
+    Tokens are reserved under a thread lock and the wait for a negative
+    balance happens outside it, so one budget can be shared by requests on
+    any number of event loops.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        """
+        Initialize the budget
+
+        Args:
+            tokens_per_minute: Maximum tokens spent per minute
+        """
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: int):
+        """
+        Wait until the requested tokens are available and spend them
+
+        Args:
+            tokens: Estimated tokens for the request
+        """
+        # A single request larger than the whole budget would otherwise wait forever
+        tokens = min(float(tokens), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve now; a negative balance is the debt this request waits out
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def estimate_tokens(texts: List[str], completion_tokens_per_text: int = 20) -> int:
+    """
+    Roughly estimate prompt plus completion tokens for a packed request
+
+    Args:
+        texts: Texts packed into the request
+        completion_tokens_per_text: Expected output tokens per text
+
+    Returns:
+        Estimated token count (~4 characters per token)
+    """
+    prompt_chars = len(SYSTEM_PROMPT) + sum(len(text) + 24 for text in texts)
+    return prompt_chars // 4 + completion_tokens_per_text * len(texts)
+
+
+def parse_packed_response(content: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Parse the structured output of a packed request
+
+    Args:
+        content: Message content returned by the model
+        count: Number of texts packed into the request
+
+    Returns:
+        One {"sentiment", "confidence"} dictionary per packed text, in order
+    """
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("Response does not contain a JSON object")
+    payload = json.loads(content[start:end + 1])
+
+    by_index = {}
+    for item in payload.get("results", []):
+        sentiment = str(item.get("sentiment", "")).lower()
+        if sentiment not in ("positive", "neutral", "negative"):
+            continue
+        confidence = float(item.get("confidence", 0.0))
+        by_index[int(item["index"])] = {
+            "sentiment": sentiment,
+            "confidence": min(max(confidence, 0.0), 1.0)
+        }
+
+    missing = [i for i in range(count) if i not in by_index]
+    if missing:
+        raise ValueError(f"Response is missing results for indexes {missing}")
+    return [by_index[i] for i in range(count)]
+
+
+class AsyncOpenAISentimentBackend:
+    """
+    Asynchronous OpenAI sentiment backend.
+
+    Texts are packed several per prompt and sent over one pooled HTTP client,
+    with a bounded number of requests in flight, jittered exponential backoff
+    on 429/5xx responses and a per-minute token budget charged for every
+    attempt. The HTTP client and the concurrency limit are created per event
+    loop, so analyze_batch_async can be awaited from any loop; the token
+    budget is shared by all of them. A pack that still fails after its
+    retries yields neutral results carrying an "error" instead of failing the
+    whole batch.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: str = "https://api.openai.com/v1",
+                 model: str = "gpt-3.5-turbo",
+                 max_concurrency: int = 8,
+                 texts_per_request: int = 20,
+                 tokens_per_minute: int = 90000,
+                 max_retries: int = 5,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 20.0,
+                 timeout: float = 30.0):
+        """
+        Initialize the backend
+
+        Args:
+            api_key: OpenAI API key (OPENAI_API_KEY if omitted)
+            base_url: Base URL of the completion API (point at tests/openai_stub.py for offline runs)
+            model: Chat model name
+            max_concurrency: Maximum number of requests in flight
+            texts_per_request: Maximum number of texts packed into one prompt
+            tokens_per_minute: Token budget per minute
+            max_retries: Retries per request on 429/5xx and transport errors
+            backoff_base: Base delay of the exponential backoff, in seconds
+            backoff_max: Maximum backoff delay, in seconds
+            timeout: Request timeout, in seconds
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.model_name = f"openai:{model}"
+        self.use_openai = True
+        self.max_concurrency = max_concurrency
+        self.texts_per_request = texts_per_request
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        # Synchronous callers share one event loop running in a background thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        # HTTP client and semaphore of each event loop that used the backend
+        self._loop_state: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._budget = TokenBudget(tokens_per_minute)
+
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "texts": 0, "failed_texts": 0}
+
+    def _async_state(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        # httpx clients and asyncio primitives only work on the loop that created them
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            state = self._loop_state.get(loop)
+            if state is None:
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency
+                    )
+                )
+                state = self._loop_state[loop] = (client, asyncio.Semaphore(self.max_concurrency))
+            return state
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps concurrent retries from synchronizing
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _post_completion(self, texts: List[str]) -> str:
+        body = {
+            "model": self.model,
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps(
+                    [{"index": i, "text": text} for i, text in enumerate(texts)]
+                )}
+            ]
+        }
+
+        client, semaphore = self._async_state()
+        tokens = estimate_tokens(texts)
+        attempt = 0
+        while True:
+            # Every attempt spends tokens, so retries count against the budget too
+            await self._budget.acquire(tokens)
+            async with semaphore:
+                self.stats["requests"] += 1
+                try:
+                    response = await client.post("/chat/completions", json=body)
+                except httpx.TransportError as e:
+                    response = None
+                    error = str(e)
+
+            if response is not None:
+                if response.status_code < 400:
+                    return response.json()["choices"][0]["message"]["content"]
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                if response.status_code == 429:
+                    self.stats["rate_limited"] += 1
+                error = f"HTTP {response.status_code}"
+
+            if attempt >= self.max_retries:
+                raise RuntimeError(f"OpenAI request failed after {attempt + 1} attempts: {error}")
+
+            delay = self._backoff_delay(
+                attempt, response.headers.get("retry-after") if response is not None else None
+            )
+            attempt += 1
+            self.stats["retries"] += 1
+            logger.warning(f"OpenAI request failed ({error}); retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _analyze_pack(self, texts: List[str]) -> List[Dict[str, Any]]:
+        content = await self._post_completion(texts)
+        try:
+            parsed = parse_packed_response(content, len(texts))
+        except (ValueError, KeyError, TypeError) as e:
+            if len(texts) == 1:
+                raise RuntimeError(f"Could not parse OpenAI response: {str(e)}")
+            # Retry the halves so one malformed answer does not sink the whole pack
+            middle = len(texts) // 2
+            return await self._analyze_packs([texts[:middle], texts[middle:]])
+
+        return [
+            {"text": text, "sentiment": item["sentiment"],
+             "confidence": item["confidence"], "source": "openai"}
+            for text, item in zip(texts, parsed)
+        ]
+
+    async def _analyze_packs(self, packs: List[List[str]]) -> List[Dict[str, Any]]:
+        pack_results = await asyncio.gather(
+            *(self._analyze_pack(pack) for pack in packs), return_exceptions=True
+        )
+        results = []
+        for pack, pack_result in zip(packs, pack_results):
+            if isinstance(pack_result, BaseException):
+                if not isinstance(pack_result, Exception):
+                    # Cancellation and interpreter exits still propagate
+                    raise pack_result
+                logger.error(f"OpenAI sentiment failed for {len(pack)} texts: {str(pack_result)}")
+                self.stats["failed_texts"] += len(pack)
+                results.extend(
+                    {"text": text, "sentiment": "neutral", "confidence": 0.0, "source": "openai",
+                     "error": str(pack_result)}
+                    for text in pack
+                )
+            else:
+                results.extend(pack_result)
+        return results
+
+    async def analyze_batch_async(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts concurrently
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results, in input order;
+            texts whose request failed are neutral with confidence 0 and an "error"
+        """
+        packs = [
+            texts[start:start + self.texts_per_request]
+            for start in range(0, len(texts), self.texts_per_request)
+        ]
+        results = await self._analyze_packs(packs)
+        self.stats["texts"] += len(texts)
+        return results
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="openai-sentiment-loop", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts (blocking wrapper for synchronous callers)
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results, in input order
+        """
+        if not texts:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self.analyze_batch_async(texts), self._ensure_loop())
+        return future.result()
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze sentiment of a single text
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            Dictionary with sentiment analysis results
+        """
+        return self.analyze_batch([text])[0]
+
+    def close(self):
+        """Close the HTTP clients and stop the background event loop"""
+        with self._loop_lock:
+            states = list(self._loop_state.items())
+            self._loop_state.clear()
+        for loop, (client, _) in states:
+            # Clients of loops that already stopped are left to the garbage collector
+            if loop.is_running() and not loop.is_closed():
+                future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                if loop is self._loop:
+                    future.result()
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop = None
+
+
+def build_openai_backend_from_env() -> AsyncOpenAISentimentBackend:
+    """
+    Build the OpenAI backend from environment settings
+
+    Returns:
+        Configured AsyncOpenAISentimentBackend
+    """
+    return AsyncOpenAISentimentBackend(
+        base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+        max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+        texts_per_request=int(os.getenv("OPENAI_TEXTS_PER_REQUEST", "20")),
+        tokens_per_minute=int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "90000"))
+    )
@@ -0,0 +1,280 @@
+import argparse
+import os
+import pickle
+import re
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+PRECISIONS = ("fp32", "int8")
+
+# Fixed corpus for parity checks, covering the collectors' templates and longer posts
+DEFAULT_PARITY_CORPUS = [
+    "Great product! Exactly what I needed.",
+    "Love this product. Highly recommend it!",
+    "The product is okay. Nothing special.",
+    "Average product. Gets the job done.",
+    "Disappointed with this product. Wouldn't recommend.",
+    "Had issues with the product. Waste of money.",
+    "Loving the customer service at #CompanyX! Quick response to my customer service issue.",
+    "Anyone else having issues with customer service today?",
+    "Frustrated with the customer service team. Still waiting for a response after 2 days.",
+    "Is the customer service service down? Can't seem to connect.",
+    "[Rant] Frustrated with customer service customer service Spent hours trying to resolve "
+    "an issue with customer service with no success. Avoid if possible.",
+    "Just wanted to share my positive experience with customer service. I was skeptical at "
+    "first, but customer service exceeded my expectations. Highly recommend!",
+    "Has anyone tried the new customer service service? Trying to decide between customer "
+    "service and their competitors. Pros and cons?",
+    "Not bad, not great. The product is just average. Good features but a bit overpriced.",
+    "The product stopped working after a week. Poor quality. The materials feel cheap and flimsy.",
+    "Best product I've used. Highly recommend! Delivery was fast and the packaging was secure.",
+]
+
+
+def _process_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TransformerSentimentModel:
+    """
+    Hugging Face sequence classification model with a selectable precision.
+
+    "int8" applies dynamic int8 quantization to the Linear layers. The converted
+    weights are cached on disk, keyed by model name and torch and transformers
+    versions; later startups rebuild the quantized architecture from the model
+    config and load them instead of repeating the conversion.
+    """
+
+    def __init__(self,
+                 model_name: str = DEFAULT_MODEL_NAME,
+                 precision: str = "fp32",
+                 cache_dir: str = "data/cache/models",
+                 max_length: int = 512):
+        """
+        Initialize the model
+
+        Args:
+            model_name: Hugging Face model name
+            precision: "fp32" or "int8"
+            cache_dir: Directory for converted models
+            max_length: Truncation length
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{precision}', expected one of {PRECISIONS}")
+
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._torch = torch
+        self.precision = precision
+        self.max_length = max_length
+        self.model_name = f"{model_name}@{precision}"
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        if precision == "int8":
+            self.model = self._load_int8(model_name, cache_dir)
+        else:
+            self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+        self.labels = [
+            self.model.config.id2label[i].lower() for i in range(self.model.config.num_labels)
+        ]
+
+    def _quantize(self, fp32_model: Any) -> Any:
+        torch = self._torch
+        fp32_model.eval()
+        return torch.quantization.quantize_dynamic(fp32_model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def _load_int8(self, model_name: str, cache_dir: str) -> Any:
+        import transformers
+        from transformers import AutoConfig, AutoModelForSequenceClassification
+
+        torch = self._torch
+        safe_name = re.sub(r"[^\w.-]+", "_", model_name)
+        path = os.path.join(
+            cache_dir,
+            f"{safe_name}-int8-torch{torch.__version__}-transformers{transformers.__version__}.pt"
+        )
+
+        if os.path.exists(path):
+            logger.info(f"Loading cached int8 weights from {path}")
+            # Randomly initialized architecture only; the cached weights replace every parameter
+            config = AutoConfig.from_pretrained(model_name)
+            model = self._quantize(AutoModelForSequenceClassification.from_config(config))
+            try:
+                model.load_state_dict(torch.load(path, weights_only=True))
+                return model
+            except (OSError, EOFError, RuntimeError, pickle.UnpicklingError) as e:
+                logger.warning(f"Ignoring unusable int8 cache {path}: {str(e)}")
+
+        logger.info(f"Quantizing {model_name} to int8 (first run)")
+        model = self._quantize(AutoModelForSequenceClassification.from_pretrained(model_name))
+
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)  # Never leave a half-written cache file behind
+        return model
+
+    def predict_proba(self, texts: List[str]) -> Any:
+        """
+        Compute class probabilities
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Tensor of shape (n, num_labels)
+        """
+        torch = self._torch
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt"
+        )
+        with torch.inference_mode():
+            logits = self.model(**encoded).logits
+        return torch.softmax(logits, dim=-1)
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results
+        """
+        if not texts:
+            return []
+        proba = self.predict_proba(texts)
+        confidence, best = proba.max(dim=-1)
+        return [
+            {"text": text, "sentiment": self.labels[int(label)],
+             "confidence": round(float(conf), 4), "source": "huggingface"}
+            for text, label, conf in zip(texts, best, confidence)
+        ]
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze sentiment of a single text
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            Dictionary with sentiment analysis results
+        """
+        return self.analyze_batch([text])[0]
+
+
+def _measure_precision(model_name: str, precision: str, cache_dir: str,
+                       texts: List[str], repeats: int) -> Dict[str, Any]:
+    # Runs in a fresh process so RSS reflects this precision only
+    rss_before = _process_rss_mb()
+    started = time.perf_counter()
+    model = TransformerSentimentModel(model_name, precision=precision, cache_dir=cache_dir)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = _process_rss_mb()
+
+    model.predict_proba(texts[:2])  # Warm up kernels
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        proba = model.predict_proba(texts)
+        latencies.append(time.perf_counter() - started)
+
+    return {
+        "probabilities": proba.tolist(),
+        "load_seconds": round(load_seconds, 3),
+        "batch_latency_ms": round(1000 * min(latencies), 2),
+        "per_text_ms": round(1000 * min(latencies) / len(texts), 3),
+        "model_rss_mb": round(rss_loaded - rss_before, 1),
+        "peak_rss_mb": round(_process_rss_mb(), 1)
+    }
+
+
+def compare_precisions(texts: Optional[List[str]] = None,
+                       model_name: str = DEFAULT_MODEL_NAME,
+                       cache_dir: str = "data/cache/models",
+                       repeats: int = 5,
+                       min_agreement: float = 0.98,
+                       max_probability_delta: float = 0.1) -> Dict[str, Any]:
+    """
+    Check int8 accuracy parity against fp32 and compare latency and memory
+
+    Each precision is loaded in its own spawned process so their RSS does not
+    overlap.
+
+    Args:
+        texts: Fixed evaluation corpus (DEFAULT_PARITY_CORPUS if omitted)
+        model_name: Hugging Face model name
+        cache_dir: Directory for converted models
+        repeats: Timed repetitions per precision (best is reported)
+        min_agreement: Minimum share of identical labels for the check to pass
+        max_probability_delta: Maximum mean absolute probability difference to pass
+
+    Returns:
+        Dictionary with parity metrics, per-precision measurements and a pass flag
+    """
+    texts = texts or DEFAULT_PARITY_CORPUS
+    measurements = {}
+    for precision in PRECISIONS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            measurements[precision] = pool.submit(
+                _measure_precision, model_name, precision, cache_dir, texts, repeats
+            ).result()
+
+    import numpy as np
+    fp32 = np.array(measurements["fp32"].pop("probabilities"))
+    int8 = np.array(measurements["int8"].pop("probabilities"))
+    agreement = float((fp32.argmax(axis=1) == int8.argmax(axis=1)).mean())
+    delta = np.abs(fp32 - int8)
+
+    report = {
+        "model_name": model_name,
+        "texts": len(texts),
+        "label_agreement": round(agreement, 4),
+        "mean_probability_delta": round(float(delta.mean()), 4),
+        "max_probability_delta": round(float(delta.max()), 4),
+        "fp32": measurements["fp32"],
+        "int8": measurements["int8"],
+        "speedup": round(
+            measurements["fp32"]["batch_latency_ms"] / measurements["int8"]["batch_latency_ms"], 2
+        ),
+        "passes": agreement >= min_agreement and float(delta.mean()) <= max_probability_delta
+    }
+    return report
+
+
+def main():
+    """Run the int8 parity check"""
+    parser = argparse.ArgumentParser(description="Compare int8 and fp32 sentiment inference")
+    parser.add_argument("--model", default=os.getenv("SENTIMENT_MODEL_NAME", DEFAULT_MODEL_NAME))
+    parser.add_argument("--corpus", help="CSV file with a 'text' column (built-in corpus if omitted)")
+    parser.add_argument("--cache-dir", default=os.getenv("SENTIMENT_MODEL_CACHE_DIR", "data/cache/models"))
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = None
+    if args.corpus:
+        import pandas as pd
+        texts = pd.read_csv(args.corpus)["text"].dropna().astype(str).tolist()
+
+    print(compare_precisions(texts, args.model, args.cache_dir, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before hashing so trivially different copies share a key
+
+    Args:
+        text: Raw input text
+
+    Returns:
+        Text with collapsed whitespace, stripped and lowercased
+    """
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def make_cache_key(text: str, model_id: str) -> str:
+    """
+    Build a content-addressed cache key
+
+    Args:
+        text: Raw input text
+        model_id: Identity of the model that produced the result
+
+    Returns:
+        Hex digest of the model identity and normalized text
+    """
+    payload = f"{model_id}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class MemoryLRUCache:
+    """Bounded in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl_seconds: Time to live for each entry (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], stored_at: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (stored_at or time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteResultStore:
+    """Persistent on-disk result store backed by SQLite"""
+
+    def __init__(self, path: str, max_entries: int = 1000000, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the store
+
+        Args:
+            path: Path of the SQLite database file
+            max_entries: Maximum number of rows kept on disk
+            ttl_seconds: Time to live for each entry (None for no expiry)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sentiment_cache_accessed "
+            "ON sentiment_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        """
+        Look up several keys at once
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Dictionary mapping found keys to (stored_at, value)
+        """
+        if not keys:
+            return {}
+
+        now = time.time()
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, stored_at FROM sentiment_cache WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, value, stored_at in rows:
+                    if self.ttl_seconds is not None and now - stored_at > self.ttl_seconds:
+                        continue
+                    found[key] = (stored_at, json.loads(value))
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE sentiment_cache SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]):
+        """
+        Store several results at once
+
+        Args:
+            items: Dictionary mapping cache keys to results
+        """
+        if not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value, default=str), now, now) for key, value in items.items()]
+            )
+            self._conn.commit()
+
+            self._writes_since_evict += len(items)
+            if self._writes_since_evict >= 1000:
+                self._evict()
+                self._writes_since_evict = 0
+
+    def _evict(self):
+        # Drop expired rows, then the least recently accessed rows above the size limit
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM sentiment_cache WHERE stored_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+        count = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM sentiment_cache WHERE key IN ("
+                "SELECT key FROM sentiment_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+        self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM sentiment_cache")
+            self._conn.commit()
+
+
+class SentimentResultCache:
+    """Two-tier (memory LRU + SQLite) cache for sentiment results"""
+
+    def __init__(self,
+                 memory_entries: int = 10000,
+                 disk_path: Optional[str] = None,
+                 disk_entries: int = 1000000,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        """
+        Initialize the cache
+
+        Args:
+            memory_entries: Maximum number of entries in the in-process tier
+            disk_path: Path of the SQLite file for the persistent tier (None to disable)
+            disk_entries: Maximum number of entries in the persistent tier
+            ttl_seconds: Time to live for cached results
+        """
+        self.memory = MemoryLRUCache(memory_entries, ttl_seconds)
+        self.disk = SQLiteResultStore(disk_path, disk_entries, ttl_seconds) if disk_path else None
+
+        self._stats_lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up keys in memory first, then on disk
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Dictionary mapping found keys to cached results
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        memory_hits = len(found)
+
+        disk_found = self.disk.get_many(missing) if self.disk and missing else {}
+        for key, (stored_at, value) in disk_found.items():
+            # Promote to the memory tier, keeping the original TTL
+            self.memory.set(key, value, stored_at=stored_at)
+            found[key] = value
+
+        with self._stats_lock:
+            self._memory_hits += memory_hits
+            self._disk_hits += len(disk_found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]):
+        """
+        Store results in both tiers
+
+        Args:
+            items: Dictionary mapping cache keys to results
+        """
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if self.disk:
+            self.disk.set_many(items)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._stats_lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self.memory)
+            }
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+
+class CachedSentimentAnalyzer:
+    """
+    Wraps a sentiment analyzer so repeated texts skip inference.
+
+    Only cache misses are sent to the underlying analyzer; results are merged
+    back in the original input order.
+    """
+
+    def __init__(self, analyzer: Any, cache: SentimentResultCache, model_id: Optional[str] = None):
+        """
+        Initialize the wrapper
+
+        Args:
+            analyzer: Object providing analyze_batch(texts)
+            cache: Result cache to read from and write to
+            model_id: Identity of the model (derived from the analyzer if omitted)
+        """
+        self.analyzer = analyzer
+        self.cache = cache
+        self.model_id = model_id or self._derive_model_id(analyzer)
+
+    @staticmethod
+    def _derive_model_id(analyzer: Any) -> str:
+        parts = [type(analyzer).__name__]
+        for attr in ("model_name", "model_id", "use_openai"):
+            if hasattr(analyzer, attr):
+                parts.append(f"{attr}={getattr(analyzer, attr)}")
+        return "|".join(parts)
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze sentiment of a single text
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            Dictionary with sentiment analysis results
+        """
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts, running inference only on cache misses
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results, in input order
+        """
+        keys = [make_cache_key(text, self.model_id) for text in texts]
+        cached = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        # Run each distinct missing text through the model once
+        miss_positions: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key not in cached and key not in miss_positions:
+                miss_positions[key] = i
+
+        if miss_positions:
+            miss_texts = [texts[i] for i in miss_positions.values()]
+            miss_results = self.analyzer.analyze_batch(miss_texts)
+            fresh = dict(zip(miss_positions.keys(), miss_results))
+            # Failed results (e.g. an OpenAI request out of retries) are returned but not cached
+            self.cache.set_many({key: result for key, result in fresh.items() if "error" not in result})
+            cached.update(fresh)
+
+        results = []
+        for text, key in zip(texts, keys):
+            result = dict(cached[key])
+            result["text"] = text
+            results.append(result)
+        return results
+
+
+_default_cache: Optional[SentimentResultCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> SentimentResultCache:
+    """
+    Get the process-wide sentiment result cache, configured from the environment
+
+    Returns:
+        Shared SentimentResultCache instance
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            ttl = float(os.getenv("SENTIMENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+            _default_cache = SentimentResultCache(
+                memory_entries=int(os.getenv("SENTIMENT_CACHE_MEMORY_ENTRIES", "10000")),
+                disk_path=os.getenv("SENTIMENT_CACHE_PATH", "data/cache/sentiment_cache.sqlite") or None,
+                disk_entries=int(os.getenv("SENTIMENT_CACHE_DISK_ENTRIES", "1000000")),
+                ttl_seconds=ttl if ttl > 0 else None
+            )
+        return _default_cache
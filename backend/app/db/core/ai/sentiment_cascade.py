@@ -0,0 +1,255 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from sklearn.feature_extraction.text import CountVectorizer
+
+logger = logging.getLogger(__name__)
+
+# Weights are summed over matched n-grams; multi-word entries let negations
+# such as "not impressed" outweigh the unigram they contain
+DEFAULT_LEXICON = {
+    # Positive
+    "love": 2.0, "loving": 2.0, "amazing": 2.0, "fantastic": 2.0, "excellent": 2.0,
+    "great": 1.5, "best": 1.5, "awesome": 2.0, "perfect": 2.0, "perfectly": 1.5,
+    "impressed": 1.5, "satisfied": 1.5, "recommend": 1.0, "recommended": 1.0,
+    "highly recommend": 1.5, "kudos": 1.5, "helpful": 1.0, "happy": 1.5,
+    "exceeded": 1.5, "easy": 0.5, "intuitive": 1.0, "durable": 1.0, "fast": 0.5,
+    "underrated": 1.0, "shoutout": 1.5, "responsive": 1.0, "solved": 1.0, "better": 0.5,
+    "good": 1.0, "nice": 1.0, "thanks": 1.0, "worth": 0.5,
+    # Negative
+    "disappointed": -2.0, "disappointing": -2.0, "terrible": -2.5, "awful": -2.5,
+    "frustrated": -2.0, "frustrating": -2.0, "bad": -1.5, "poor": -1.5, "worst": -2.5,
+    "waste": -2.0, "avoid": -2.0, "ridiculous": -2.0, "unhelpful": -2.0, "broken": -1.5,
+    "issues": -1.0, "issue": -0.5, "problem": -1.0, "cheap": -1.0, "flimsy": -1.5,
+    "misleading": -1.5, "refund": -1.0, "declined": -1.5, "downhill": -1.5,
+    "rant": -1.5, "vent": -1.5, "warning": -1.0, "returned": -1.0, "hate": -2.5,
+    "stopped working": -2.0, "doesn't work": -2.0, "charged me twice": -2.0,
+    # Negations outweigh the unigram they contain and flip its polarity
+    "not impressed": -3.0, "not worth": -2.5, "not recommend": -2.5,
+    "don't recommend": -2.5, "wouldn't recommend": -2.5, "not great": -2.0,
+    "not good": -2.5, "no success": -2.0, "expected better": -1.5,
+    "not bad": 3.0, "better alternatives": -2.5,
+}
+
+SENTIMENT_LABELS = np.array(["positive", "neutral", "negative"])
+
+
+class LexiconSentimentClassifier:
+    """
+    Cheap vectorized sentiment classifier.
+
+    Texts are turned into a sparse 1-3 word n-gram count matrix and scored with a
+    single sparse matrix-vector product against the lexicon weights. Class
+    probabilities come from a softmax over (score, neutral bias, -score).
+    """
+
+    def __init__(self,
+                 lexicon: Optional[Dict[str, float]] = None,
+                 neutral_bias: float = 0.5,
+                 question_bias: float = 1.0,
+                 temperature: float = 0.5):
+        """
+        Initialize the classifier
+
+        Args:
+            lexicon: Mapping of lowercase terms (one to three words) to weights
+            neutral_bias: Logit of the neutral class when no sentiment terms match
+            question_bias: Extra neutral logit for texts containing a question mark
+            temperature: Softmax temperature applied to the scores; at 0.5 a single
+                strong cue (|score| >= 1.5) reaches 0.88 confidence, clearing the
+                cascade's default threshold, while weaker or mixed cues escalate
+        """
+        self.lexicon = lexicon or DEFAULT_LEXICON
+        self.neutral_bias = neutral_bias
+        self.question_bias = question_bias
+        self.temperature = temperature
+
+        terms = list(self.lexicon)
+        self.vectorizer = CountVectorizer(
+            vocabulary=terms,
+            ngram_range=(1, 3),
+            token_pattern=r"(?u)\b\w[\w']*\b",
+            lowercase=True
+        )
+        self.weights = np.array([self.lexicon[term] for term in terms], dtype=np.float64)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute class probabilities
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Array of shape (n, 3) with positive/neutral/negative probabilities
+        """
+        counts = self.vectorizer.transform(texts)
+        scores = counts @ self.weights
+        has_question = np.fromiter(("?" in text for text in texts), dtype=bool, count=len(texts))
+
+        logits = np.column_stack([
+            scores,
+            np.full(len(texts), self.neutral_bias) + self.question_bias * has_question,
+            -scores
+        ]) / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Predict sentiment labels and confidences
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Dictionary with "sentiment" labels and "confidence" arrays
+        """
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return {
+            "sentiment": SENTIMENT_LABELS[best],
+            "confidence": proba[np.arange(len(texts)), best]
+        }
+
+
+class CascadeSentimentAnalyzer:
+    """
+    Answers confident texts with the lexicon classifier and escalates the rest.
+
+    Each result records the tier that produced it in a "tier" field.
+    """
+
+    def __init__(self,
+                 fallback: Any,
+                 threshold: float = 0.85,
+                 classifier: Optional[LexiconSentimentClassifier] = None,
+                 fallback_tier: str = "transformer"):
+        """
+        Initialize the cascade
+
+        Args:
+            fallback: Analyzer providing analyze_batch(texts), e.g. Hugging Face or OpenAI
+            threshold: Minimum lexicon confidence to answer without escalating
+            classifier: First-tier classifier (default lexicon if omitted)
+            fallback_tier: Tier name recorded for escalated results
+        """
+        self.fallback = fallback
+        self.threshold = threshold
+        self.classifier = classifier or LexiconSentimentClassifier()
+        self.fallback_tier = fallback_tier
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "fallback":
+            raise AttributeError(name)
+        return getattr(self.fallback, name)
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts through the cascade
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results, in input order
+        """
+        if not texts:
+            return []
+
+        predictions = self.classifier.predict(texts)
+        confident = predictions["confidence"] >= self.threshold
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        for i in np.flatnonzero(confident):
+            results[i] = {
+                "text": texts[i],
+                "sentiment": str(predictions["sentiment"][i]),
+                "confidence": round(float(predictions["confidence"][i]), 4),
+                "source": "lexicon",
+                "tier": "lexicon"
+            }
+
+        escalated = np.flatnonzero(~confident)
+        if len(escalated):
+            fallback_results = self.fallback.analyze_batch([texts[i] for i in escalated])
+            for i, result in zip(escalated, fallback_results):
+                results[i] = {**result, "tier": self.fallback_tier}
+        return results
+
+
+def evaluate_cascade(df: pd.DataFrame,
+                     fallback: Optional[Any] = None,
+                     thresholds: Optional[List[float]] = None,
+                     text_column: str = "text",
+                     label_column: Optional[str] = None,
+                     classifier: Optional[LexiconSentimentClassifier] = None) -> pd.DataFrame:
+    """
+    Measure the accuracy/throughput tradeoff of the cascade at several thresholds
+
+    Both tiers are run once over the whole frame; each threshold is then
+    evaluated by selecting per text which tier's answer would have been used,
+    and throughput is estimated from the measured per-text cost of each tier.
+
+    Args:
+        df: Labelled data, e.g. from DataCollector or SocialMediaScraper
+        fallback: Second-tier analyzer (lexicon-only coverage/accuracy if omitted)
+        thresholds: Confidence thresholds to evaluate
+        text_column: Column containing text
+        label_column: Column with the true label ('implied_sentiment' or 'sentiment' if omitted)
+        classifier: First-tier classifier (default lexicon if omitted)
+
+    Returns:
+        DataFrame with one row per threshold
+    """
+    if label_column is None:
+        label_column = "implied_sentiment" if "implied_sentiment" in df.columns else "sentiment"
+    thresholds = thresholds or [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+    classifier = classifier or LexiconSentimentClassifier()
+
+    texts = df[text_column].fillna("").astype(str).tolist()
+    labels = df[label_column].astype(str).str.lower().to_numpy()
+    n = len(texts)
+
+    started = time.perf_counter()
+    lexicon = classifier.predict(texts)
+    lexicon_seconds = time.perf_counter() - started
+    lexicon_correct = lexicon["sentiment"] == labels
+
+    fallback_correct = None
+    fallback_per_text = 0.0
+    if fallback is not None:
+        started = time.perf_counter()
+        fallback_results = fallback.analyze_batch(texts)
+        fallback_per_text = (time.perf_counter() - started) / max(n, 1)
+        fallback_labels = np.array([str(r.get("sentiment", "")).lower() for r in fallback_results])
+        fallback_correct = fallback_labels == labels
+
+    rows = []
+    for threshold in thresholds:
+        confident = lexicon["confidence"] >= threshold
+        escalated = int((~confident).sum())
+        row = {
+            "threshold": threshold,
+            "lexicon_share": round(float(confident.mean()), 4) if n else 0.0,
+            "lexicon_accuracy": round(float(lexicon_correct[confident].mean()), 4) if confident.any() else None
+        }
+        if fallback_correct is not None:
+            correct = np.where(confident, lexicon_correct, fallback_correct)
+            seconds = lexicon_seconds + escalated * fallback_per_text
+            row["accuracy"] = round(float(correct.mean()), 4) if n else None
+            row["texts_per_second"] = round(n / seconds, 1) if seconds else None
+        rows.append(row)
+
+    if fallback_correct is not None:
+        logger.info(
+            f"Fallback-only accuracy {fallback_correct.mean():.4f} at "
+            f"{1 / fallback_per_text if fallback_per_text else float('inf'):.1f} texts/s"
+        )
+    return pd.DataFrame(rows)
@@ -0,0 +1,438 @@
+import time
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MODEL_TYPES = ("seasonal_naive", "ses", "holt", "holt_winters", "linear_trend")
+
+# Two-sided z for an 80% interval, Prophet's default interval_width
+_INTERVAL_Z = 1.2816
+
+_ALPHAS = np.linspace(0.05, 0.95, 19)
+_HOLT_ALPHAS = np.linspace(0.1, 0.9, 9)
+_HOLT_BETAS = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+_HW_ALPHAS = np.array([0.1, 0.2, 0.35, 0.5, 0.7, 0.9])
+_HW_BETAS = np.array([0.01, 0.05, 0.1, 0.2])
+_HW_GAMMAS = np.array([0.05, 0.1, 0.2, 0.4])
+
+
+def infer_season_length(dates: pd.Series) -> int:
+    """
+    Guess the seasonal period from the spacing of the dates
+
+    Args:
+        dates: Observation dates
+
+    Returns:
+        24 for hourly, 7 for daily, 52 for weekly, 12 for monthly, 4 for quarterly data, else 1
+    """
+    dates = pd.to_datetime(dates)
+    if len(dates) < 2:
+        return 1
+    step = pd.Series(dates).diff().median()
+    if step <= pd.Timedelta(hours=1):
+        return 24
+    if step <= pd.Timedelta(days=1):
+        return 7
+    if step <= pd.Timedelta(days=7):
+        return 52
+    if step <= pd.Timedelta(days=31):
+        return 12
+    if step <= pd.Timedelta(days=92):
+        return 4
+    return 1
+
+
+def _parameter_grid(model_type: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Smoothing parameters in state space form: beta = alpha * beta*, gamma = (1 - alpha) * gamma*
+    if model_type == "ses":
+        alpha = _ALPHAS
+        return alpha, np.zeros_like(alpha), np.zeros_like(alpha)
+    if model_type == "holt":
+        alpha, beta_star = (g.ravel() for g in np.meshgrid(_HOLT_ALPHAS, _HOLT_BETAS, indexing="ij"))
+        return alpha, alpha * beta_star, np.zeros_like(alpha)
+    alpha, beta_star, gamma_star = (
+        g.ravel() for g in np.meshgrid(_HW_ALPHAS, _HW_BETAS, _HW_GAMMAS, indexing="ij")
+    )
+    return alpha, alpha * beta_star, (1 - alpha) * gamma_star
+
+
+def _smooth(values: np.ndarray,
+            alpha: np.ndarray, beta: np.ndarray, gamma: np.ndarray,
+            level: np.ndarray, trend: np.ndarray, season: np.ndarray,
+            phase: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Additive error-correction recursions, vectorized over series (axis 0) and
+    # parameter combinations (axis 1); only time is iterated
+    m = season.shape[-1]
+    sse = np.zeros(level.shape)
+    for t in range(values.shape[1]):
+        position = (phase + t) % m
+        error = values[:, t, None] - (level + trend + season[..., position])
+        sse += error * error
+        level = level + trend + alpha * error
+        trend = trend + beta * error
+        season[..., position] = season[..., position] + gamma * error
+    return level, trend, season, sse
+
+
+def fit_many(values: np.ndarray, model_type: str, season_length: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Fit one statistical model to many equal-length series at once
+
+    Exponential smoothing parameters are chosen per series by minimizing the
+    one-step-ahead squared error over a parameter grid, with all series and
+    grid points updated together.
+
+    Args:
+        values: Array of shape (n_series, n_observations) without missing values
+        model_type: One of MODEL_TYPES
+        season_length: Seasonal period for seasonal_naive and holt_winters
+
+    Returns:
+        Dictionary of state arrays (leading dimension n_series) for forecast_many and update_many
+    """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unsupported model type '{model_type}', expected one of {MODEL_TYPES}")
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[None, :]
+    n, length = values.shape
+    if length < 2:
+        raise ValueError("At least two observations are required")
+
+    m = max(int(season_length), 1)
+    if model_type == "holt_winters" and length < 2 * m:
+        logger.info(f"Fewer than two seasons of data ({length} < {2 * m}), using holt instead")
+        model_type = "holt"
+    if model_type == "seasonal_naive" and length <= m:
+        m = 1
+
+    state: Dict[str, Any] = {"model_type": model_type, "nobs": np.full(n, length)}
+
+    if model_type == "linear_trend":
+        t = np.arange(length, dtype=float)
+        state.update({
+            "sum_t": np.full(n, t.sum()), "sum_tt": np.full(n, (t * t).sum()),
+            "sum_y": values.sum(axis=1), "sum_ty": values @ t, "sum_yy": (values * values).sum(axis=1)
+        })
+        _, _, sse = _linear_trend_coefficients(state)
+        state["sse"] = sse
+        return state
+
+    if model_type == "seasonal_naive":
+        season = np.empty((n, m))
+        positions = np.arange(length - m, length) % m
+        season[:, positions] = values[:, -m:]
+        errors = values[:, m:] - values[:, :-m]
+        state.update({
+            "level": np.zeros(n), "trend": np.zeros(n), "season": season,
+            "phase": length % m, "sse": (errors * errors).sum(axis=1), "nobs": np.full(n, length - m)
+        })
+        return state
+
+    if model_type == "holt_winters":
+        first, second = values[:, :m].mean(axis=1), values[:, m:2 * m].mean(axis=1)
+        trend0 = (second - first) / m
+        level0 = first - trend0 * (m + 1) / 2
+        season0 = values[:, :m] - first[:, None]
+    elif model_type == "holt":
+        m = 1
+        trend0 = values[:, 1] - values[:, 0]
+        level0 = values[:, 0] - trend0
+        season0 = np.zeros((n, 1))
+    else:
+        m = 1
+        trend0 = np.zeros(n)
+        level0 = values[:, 0]
+        season0 = np.zeros((n, 1))
+
+    alpha, beta, gamma = _parameter_grid(model_type)
+    k = len(alpha)
+    level, trend, season, sse = _smooth(
+        values, alpha[None, :], beta[None, :], gamma[None, :],
+        np.repeat(level0[:, None], k, axis=1), np.repeat(trend0[:, None], k, axis=1),
+        np.repeat(season0[:, None, :], k, axis=1), phase=0
+    )
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(n)
+    state.update({
+        "alpha": alpha[best], "beta": beta[best], "gamma": gamma[best],
+        "level": level[rows, best], "trend": trend[rows, best], "season": season[rows, best],
+        "phase": length % m, "sse": sse[rows, best]
+    })
+    return state
+
+
+def _linear_trend_coefficients(state: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n = state["nobs"].astype(float)
+    denominator = n * state["sum_tt"] - state["sum_t"] ** 2
+    slope = np.divide(n * state["sum_ty"] - state["sum_t"] * state["sum_y"], denominator,
+                      out=np.zeros_like(n), where=denominator != 0)
+    intercept = (state["sum_y"] - slope * state["sum_t"]) / n
+    sse = np.maximum(state["sum_yy"] - intercept * state["sum_y"] - slope * state["sum_ty"], 0.0)
+    return intercept, slope, sse
+
+
+def update_many(state: Dict[str, np.ndarray], values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Advance fitted models over new observations without refitting
+
+    Costs O(1) per new observation and series; parameters stay fixed.
+
+    Args:
+        state: State returned by fit_many
+        values: Array of shape (n_series, n_new)
+
+    Returns:
+        Updated state (the input is not modified)
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[None, :]
+    state = {key: (value.copy() if isinstance(value, np.ndarray) else value) for key, value in state.items()}
+    new = values.shape[1]
+
+    if state["model_type"] == "linear_trend":
+        t = state["nobs"][:, None] + np.arange(new)
+        state["sum_t"] += t.sum(axis=1)
+        state["sum_tt"] += (t * t).sum(axis=1)
+        state["sum_y"] += values.sum(axis=1)
+        state["sum_ty"] += (values * t).sum(axis=1)
+        state["sum_yy"] += (values * values).sum(axis=1)
+        state["nobs"] = state["nobs"] + new
+        state["sse"] = _linear_trend_coefficients(state)[2]
+        return state
+
+    m = state["season"].shape[-1]
+    if state["model_type"] == "seasonal_naive":
+        season = state["season"]
+        sse = state["sse"]
+        for j in range(new):
+            position = (state["phase"] + j) % m
+            error = values[:, j] - season[:, position]
+            sse = sse + error * error
+            season[:, position] = values[:, j]
+        state["sse"] = sse
+    else:
+        level, trend, season, sse = _smooth(
+            values, state["alpha"][:, None], state["beta"][:, None], state["gamma"][:, None],
+            state["level"][:, None], state["trend"][:, None], state["season"][:, None, :],
+            phase=state["phase"]
+        )
+        state.update({"level": level[:, 0], "trend": trend[:, 0], "season": season[:, 0],
+                      "sse": state["sse"] + sse[:, 0]})
+    state["phase"] = (state["phase"] + new) % m
+    state["nobs"] = state["nobs"] + new
+    return state
+
+
+def forecast_many(state: Dict[str, np.ndarray], horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Forecast all fitted series
+
+    Args:
+        state: State returned by fit_many or update_many
+        horizon: Number of periods to forecast
+
+    Returns:
+        Tuple of (yhat, yhat_lower, yhat_upper), each of shape (n_series, horizon)
+    """
+    steps = np.arange(1, horizon + 1)
+    nobs = state["nobs"].astype(float)
+
+    if state["model_type"] == "linear_trend":
+        intercept, slope, sse = _linear_trend_coefficients(state)
+        yhat = intercept[:, None] + slope[:, None] * (nobs[:, None] + steps - 1)
+        sigma = np.sqrt(sse / np.maximum(nobs - 2, 1))
+        spread = np.ones(horizon)
+    else:
+        m = state["season"].shape[-1]
+        positions = (state["phase"] + steps - 1) % m
+        yhat = state["level"][:, None] + state["trend"][:, None] * steps + state["season"][:, positions]
+        sigma = np.sqrt(state["sse"] / np.maximum(nobs, 1))
+        # Uncertainty grows with the horizon (seasonal naive: with each completed season)
+        spread = np.sqrt((steps - 1) // m + 1) if state["model_type"] == "seasonal_naive" else np.sqrt(steps)
+
+    width = _INTERVAL_Z * sigma[:, None] * spread
+    return yhat, yhat - width, yhat + width
+
+
+class StatisticalForecaster:
+    """
+    Lightweight NumPy forecaster with the TimeSeriesForecaster interface.
+
+    Model types: seasonal_naive, ses (simple exponential smoothing), holt
+    (double), holt_winters (triple, additive) and linear_trend. Fits take
+    milliseconds and no heavy dependencies, and update() advances a fitted
+    model over new rows in O(1) per observation.
+    """
+
+    def __init__(self, model_type: str = "holt_winters", season_length: Optional[int] = None):
+        """
+        Initialize the forecaster
+
+        Args:
+            model_type: One of MODEL_TYPES
+            season_length: Seasonal period (inferred from the dates if omitted)
+        """
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"Unsupported model type '{model_type}', expected one of {MODEL_TYPES}")
+        self.model_type = model_type
+        self.season_length = season_length
+        self.state: Optional[Dict[str, Any]] = None
+        self.last_date: Optional[pd.Timestamp] = None
+
+    def train(self, data: pd.DataFrame, date_column: str, target_column: str,
+              season_length: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Fit the model
+
+        Args:
+            data: DataFrame with time series data
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+            season_length: Seasonal period (overrides the constructor value)
+
+        Returns:
+            Dictionary with the fitted parameters and fit time
+        """
+        started = time.perf_counter()
+        frame = data[[date_column, target_column]].dropna()
+        frame = frame.assign(**{date_column: pd.to_datetime(frame[date_column])}).sort_values(date_column)
+
+        self.season_length = season_length or self.season_length or infer_season_length(frame[date_column])
+        self.state = fit_many(frame[target_column].to_numpy(dtype=float), self.model_type, self.season_length)
+        self.last_date = frame[date_column].iloc[-1]
+
+        params = {
+            key: round(float(self.state[key][0]), 4)
+            for key in ("alpha", "beta", "gamma") if key in self.state
+        }
+        return {
+            "model_type": self.model_type,
+            "fitted_model_type": self.state["model_type"],
+            "season_length": self.season_length,
+            "rows": len(frame),
+            "params": params,
+            "fit_ms": round(1000 * (time.perf_counter() - started), 3)
+        }
+
+    def update(self, new_data: pd.DataFrame, date_column: str, target_column: str):
+        """
+        Advance the fitted model over new rows without refitting
+
+        Args:
+            new_data: New rows, after the last trained date
+            date_column: Name of column containing dates
+            target_column: Name of column containing target values
+        """
+        if self.state is None:
+            raise ValueError("Model has not been trained")
+        frame = new_data[[date_column, target_column]].dropna()
+        frame = frame.assign(**{date_column: pd.to_datetime(frame[date_column])}).sort_values(date_column)
+        frame = frame[frame[date_column] > self.last_date]
+        if frame.empty:
+            return
+        self.state = update_many(self.state, frame[target_column].to_numpy(dtype=float))
+        self.last_date = frame[date_column].iloc[-1]
+
+    def predict(self, periods: int = 30, frequency: str = 'D', include_plots: bool = False) -> Dict[str, Any]:
+        """
+        Generate a forecast
+
+        Args:
+            periods: Number of periods to forecast
+            frequency: Frequency of predictions
+            include_plots: Accepted for interface compatibility; nothing is rendered
+
+        Returns:
+            Dictionary with forecast rows (ds, yhat, yhat_lower, yhat_upper); no plots
+        """
+        if self.state is None:
+            raise ValueError("Model has not been trained")
+        yhat, lower, upper = forecast_many(self.state, periods)
+        dates = pd.date_range(start=self.last_date, periods=periods + 1, freq=frequency)[1:]
+        return {
+            "forecast": [
+                {"ds": ds.isoformat(), "yhat": float(y), "yhat_lower": float(lo), "yhat_upper": float(hi)}
+                for ds, y, lo, hi in zip(dates, yhat[0], lower[0], upper[0])
+            ],
+            "plot": None,
+            "components_plot": None
+        }
+
+
+def iter_statistical_forecasts(data: pd.DataFrame,
+                               series_column: str,
+                               date_column: str,
+                               target_column: str,
+                               model_type: str,
+                               periods: int = 30,
+                               frequency: str = 'D',
+                               season_length: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Forecast every series of a long-format dataset with one vectorized fit per series length
+
+    Series of equal length are stacked into a 2-D array and fitted together,
+    so no process pool is needed.
+
+    Args:
+        data: Long-format DataFrame with one row per series and date
+        series_column: Name of column identifying the series
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        model_type: One of MODEL_TYPES
+        periods: Number of periods to forecast
+        frequency: Frequency of predictions
+        season_length: Seasonal period (inferred from the dates if omitted)
+
+    Returns:
+        Iterator of per-series result dictionaries, as produced by iter_batch_forecasts
+    """
+    frame = data[[series_column, date_column, target_column]].dropna()
+    frame = frame.assign(**{date_column: pd.to_datetime(frame[date_column])})
+    frame = frame.sort_values([series_column, date_column], kind="stable")
+    if season_length is None:
+        season_length = infer_season_length(frame[date_column].drop_duplicates().sort_values())
+
+    ids = frame[series_column].to_numpy()
+    values = frame[target_column].to_numpy(dtype=float)
+    dates = frame[date_column].to_numpy()
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    lengths = ends - starts
+
+    for length in np.unique(lengths):
+        group = np.flatnonzero(lengths == length)
+        started = time.perf_counter()
+        series_ids = [ids[starts[g]] for g in group]
+        try:
+            if length < 2:
+                raise ValueError("At least two observations are required")
+            matrix = values[starts[group][:, None] + np.arange(length)]
+            state = fit_many(matrix, model_type, season_length)
+            yhat, lower, upper = forecast_many(state, periods)
+        except Exception as e:
+            for series_id in series_ids:
+                yield {"series_id": series_id.item() if isinstance(series_id, np.generic) else series_id,
+                       "status": "error", "rows": int(length), "error": f"{type(e).__name__}: {str(e)}"}
+            continue
+
+        seconds = (time.perf_counter() - started) / len(group)
+        for row, (g, series_id) in enumerate(zip(group, series_ids)):
+            future = pd.date_range(start=dates[ends[g] - 1], periods=periods + 1, freq=frequency)[1:]
+            yield {
+                "series_id": series_id.item() if isinstance(series_id, np.generic) else series_id,
+                "status": "ok",
+                "rows": int(length),
+                "seconds": round(seconds, 6),
+                "forecast": [
+                    {"ds": ds.isoformat(), "yhat": float(y), "yhat_lower": float(lo), "yhat_upper": float(hi)}
+                    for ds, y, lo, hi in zip(future, yhat[row], lower[row], upper[row])
+                ]
+            }
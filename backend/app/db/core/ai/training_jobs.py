@@ -0,0 +1,466 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+import multiprocessing as mp
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class JobStore:
+    """SQLite-backed job state, shared by the API process and the pool workers"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the store
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS training_jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, progress REAL NOT NULL, "
+            "message TEXT, request TEXT NOT NULL, result TEXT, error TEXT, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_training_jobs_status ON training_jobs (status)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(training_jobs)")}
+        if "owner" not in columns:
+            # Databases created before jobs recorded the queue that runs them
+            self._conn.execute("ALTER TABLE training_jobs ADD COLUMN owner TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS training_owners (owner TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _row_to_job(self, row: sqlite3.Row, include_request: bool = False) -> Dict[str, Any]:
+        job = dict(row)
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        request = json.loads(job.pop("request"))
+        if include_request:
+            job["request"] = request
+        return job
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            cursor.row_factory = sqlite3.Row
+            return cursor.fetchall()
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def insert(self, job_id: str, request: Dict[str, Any], owner: Optional[str] = None):
+        """Insert a new queued job, run by the queue with the given owner id"""
+        self._execute(
+            "INSERT INTO training_jobs (job_id, status, progress, message, request, created_at, owner) "
+            "VALUES (?, ?, 0, 'Queued', ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(request, default=str), time.time(), owner)
+        )
+
+    def get(self, job_id: str, include_request: bool = False) -> Optional[Dict[str, Any]]:
+        """Look up a job, or None if unknown"""
+        rows = self._query("SELECT * FROM training_jobs WHERE job_id = ?", (job_id,))
+        return self._row_to_job(rows[0], include_request) if rows else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """List the most recent jobs, optionally filtered by status"""
+        if status:
+            rows = self._query(
+                "SELECT * FROM training_jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+                (status, limit)
+            )
+        else:
+            rows = self._query("SELECT * FROM training_jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._row_to_job(row) for row in rows]
+
+    def count(self, status: str) -> int:
+        """Count jobs in a state"""
+        return self._query("SELECT COUNT(*) FROM training_jobs WHERE status = ?", (status,))[0][0]
+
+    def start(self, job_id: str) -> bool:
+        """Move a queued job to running; False if it was cancelled or already finished"""
+        return self._execute(
+            "UPDATE training_jobs SET status = ?, started_at = ?, attempts = attempts + 1, "
+            "message = 'Started' WHERE job_id = ? AND status = ? AND cancel_requested = 0",
+            (RUNNING, time.time(), job_id, QUEUED)
+        ) == 1
+
+    def set_progress(self, job_id: str, progress: float, message: Optional[str] = None) -> bool:
+        """Record progress; returns whether cancellation has been requested"""
+        self._execute(
+            "UPDATE training_jobs SET progress = ?, message = COALESCE(?, message) WHERE job_id = ?",
+            (min(max(progress, 0.0), 1.0), message, job_id)
+        )
+        rows = self._query("SELECT cancel_requested FROM training_jobs WHERE job_id = ?", (job_id,))
+        return bool(rows and rows[0][0])
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        """Record the final state of a job"""
+        self._execute(
+            "UPDATE training_jobs SET status = ?, progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END, "
+            "result = ?, error = ?, message = ?, finished_at = ? WHERE job_id = ?",
+            (status, status, json.dumps(result, default=str) if result is not None else None,
+             error, status.capitalize(), time.time(), job_id)
+        )
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a job for cancellation; False if it already finished"""
+        return self._execute(
+            "UPDATE training_jobs SET cancel_requested = 1 WHERE job_id = ? AND status IN (?, ?)",
+            (job_id, QUEUED, RUNNING)
+        ) == 1
+
+    def heartbeat(self, owner: str):
+        """Record that the queue with this owner id is alive"""
+        self._execute(
+            "INSERT OR REPLACE INTO training_owners (owner, heartbeat_at) VALUES (?, ?)", (owner, time.time())
+        )
+
+    def release(self, owner: str):
+        """Forget a stopping queue, so other queues take over its unfinished jobs right away"""
+        self._execute("DELETE FROM training_owners WHERE owner = ?", (owner,))
+
+    def claim_orphaned(self, owner: str, stale_after: float) -> List[Dict[str, Any]]:
+        """
+        Take over unfinished jobs whose queue is gone
+
+        A queue is gone once it has not sent a heartbeat for stale_after
+        seconds. Its running jobs are reset to queued; jobs of live queues,
+        which may still be training them, are left alone.
+
+        Args:
+            owner: Owner id of the claiming queue
+            stale_after: Seconds without a heartbeat after which a queue counts as gone
+
+        Returns:
+            The claimed jobs with their requests, oldest first
+        """
+        with self._lock:
+            # Take the write lock first so two queues never claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM training_owners WHERE heartbeat_at < ?", (time.time() - stale_after,)
+                )
+                cursor = self._conn.execute(
+                    "SELECT * FROM training_jobs WHERE status IN (?, ?) AND (owner IS NULL OR owner NOT IN "
+                    "(SELECT owner FROM training_owners)) ORDER BY created_at",
+                    (QUEUED, RUNNING)
+                )
+                cursor.row_factory = sqlite3.Row
+                rows = cursor.fetchall()
+                for row in rows:
+                    self._conn.execute(
+                        "UPDATE training_jobs SET owner = ?, status = ?, "
+                        "message = CASE WHEN status = ? THEN 'Requeued after restart' ELSE message END "
+                        "WHERE job_id = ?",
+                        (owner, QUEUED, RUNNING, row["job_id"])
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return [self._row_to_job(row, include_request=True) for row in rows]
+
+    def prune(self, max_age: float, max_finished: int) -> int:
+        """
+        Delete old finished jobs
+
+        Args:
+            max_age: Seconds after which a finished job is deleted
+            max_finished: Maximum number of finished jobs kept (the most recent ones)
+
+        Returns:
+            Number of jobs deleted
+        """
+        return self._execute(
+            "DELETE FROM training_jobs WHERE status IN (?, ?, ?) AND (finished_at < ? OR job_id NOT IN "
+            "(SELECT job_id FROM training_jobs WHERE status IN (?, ?, ?) ORDER BY finished_at DESC LIMIT ?))",
+            (*FINISHED_STATES, time.time() - max_age, *FINISHED_STATES, max_finished)
+        )
+
+def _run_job(train_fn: Callable, db_path: str, job_id: str, request: Dict[str, Any]):
+    # Runs in a pool worker; all state goes through the shared SQLite store
+    store = JobStore(db_path)
+    if not store.start(job_id):
+        # Cancelled before it started; a job another queue already runs is left alone
+        job = store.get(job_id)
+        if job and job["status"] == QUEUED:
+            store.finish(job_id, CANCELLED)
+        return
+
+    def report(progress: float, message: Optional[str] = None):
+        if store.set_progress(job_id, progress, message):
+            raise JobCancelled()
+
+    try:
+        result = train_fn(request, report)
+        store.finish(job_id, SUCCEEDED, result=result)
+    except JobCancelled:
+        store.finish(job_id, CANCELLED)
+    except Exception as e:
+        logger.exception(f"Training job {job_id} failed")
+        store.finish(job_id, FAILED, error=f"{type(e).__name__}: {str(e)}")
+
+
+class TrainingJobQueue:
+    """
+    Bounded background queue for model training jobs.
+
+    Each job runs in its own process so long fits never hold an API worker
+    and a running job can be cancelled by terminating its process. At most
+    max_workers jobs run at once; a supervisor thread starts queued jobs as
+    slots free up and records jobs whose process died. The job function is
+    called as ``train_fn(request, report)`` and must be importable by the
+    workers; ``report(progress, message)`` records progress (and raises
+    JobCancelled once cancellation was requested).
+
+    State lives in SQLite, which several API worker processes may share.
+    Each queue records itself as the owner of the jobs it accepts and sends
+    heartbeats; unfinished jobs of a queue that stopped sending them (its
+    process exited or was killed) are taken over by a live queue, so a
+    restarting worker never re-runs jobs other workers are still training.
+    Finished jobs are pruned after finished_ttl or beyond max_finished.
+    """
+
+    def __init__(self,
+                 train_fn: Callable[[Dict[str, Any], Callable[[float, Optional[str]], None]], Any],
+                 db_path: str = "data/cache/training_jobs.sqlite",
+                 max_workers: int = 2,
+                 max_queued: int = 32,
+                 max_attempts: int = 3,
+                 start_method: str = "spawn",
+                 heartbeat_interval: float = 5.0,
+                 stale_after: float = 30.0,
+                 max_finished: int = 1000,
+                 finished_ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the queue and take over jobs of queues that are gone
+
+        Args:
+            train_fn: Module-level function running one job and returning its result
+            db_path: Path of the SQLite job database
+            max_workers: Maximum number of jobs running at once
+            max_queued: Maximum number of jobs waiting to start before submissions are rejected
+            max_attempts: Jobs interrupted this many times by restarts are marked failed
+            start_method: Multiprocessing start method of the job processes
+            heartbeat_interval: Seconds between heartbeats, orphan checks and pruning
+            stale_after: Seconds without a heartbeat after which another queue's jobs are taken over
+            max_finished: Maximum number of finished jobs kept
+            finished_ttl: Seconds a finished job is kept
+        """
+        self.train_fn = train_fn
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.store = JobStore(db_path)
+        self._mp_context = mp.get_context(start_method)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._waiting: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._running: Dict[str, Any] = {}
+        self._closing = False
+        self._next_maintenance = 0.0
+
+        with self._lock:
+            self._maintain()
+
+        self._supervisor = threading.Thread(target=self._supervise, name="training-supervisor", daemon=True)
+        self._supervisor.start()
+
+    def _supervise(self):
+        with self._wakeup:
+            while not self._closing:
+                self._reap()
+                if time.monotonic() >= self._next_maintenance:
+                    try:
+                        self._maintain()
+                    except sqlite3.Error:
+                        logger.exception("Training job maintenance failed")
+                while self._waiting and len(self._running) < self.max_workers:
+                    job_id, request = self._waiting.popitem(last=False)
+                    process = self._mp_context.Process(
+                        target=_run_job, args=(self.train_fn, self.db_path, job_id, request),
+                        name=f"training-job-{job_id[:8]}", daemon=True
+                    )
+                    process.start()
+                    self._running[job_id] = process
+                self._wakeup.wait(timeout=0.5)
+
+    def _maintain(self):
+        # Called with the lock held: heartbeat, adopt orphaned jobs, prune finished ones
+        self._next_maintenance = time.monotonic() + self.heartbeat_interval
+        self.store.heartbeat(self.owner)
+        for job in self.store.claim_orphaned(self.owner, self.stale_after):
+            if job["attempts"] >= self.max_attempts:
+                self.store.finish(job["job_id"], FAILED, error="Interrupted too many times")
+                continue
+            logger.info(f"Resubmitting training job {job['job_id']} after restart")
+            self._waiting[job["job_id"]] = job["request"]
+        self.store.prune(self.finished_ttl, self.max_finished)
+
+    def _reap(self):
+        # Called with the lock held
+        for job_id, process in list(self._running.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._running[job_id]
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                continue
+            if job["cancel_requested"]:
+                self.store.finish(job_id, CANCELLED)
+            else:
+                # _run_job records its own failures, so this is the process dying (e.g. OOM-killed)
+                self.store.finish(job_id, FAILED, error=f"Worker process exited with code {process.exitcode}")
+
+    def submit(self, request: Dict[str, Any]) -> str:
+        """
+        Enqueue a training job
+
+        Args:
+            request: JSON-serializable job description passed to train_fn
+
+        Returns:
+            Job id
+
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting
+        """
+        with self._lock:
+            if self.store.count(QUEUED) >= self.max_queued:
+                raise QueueFullError(f"Training queue is full ({self.max_queued} jobs waiting)")
+            job_id = uuid.uuid4().hex
+            self.store.insert(job_id, request, self.owner)
+            self._waiting[job_id] = request
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the state of a job
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            Dictionary with status, progress, message, result, error and timestamps, or None
+        """
+        return self.store.get(job_id)
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List recent jobs
+
+        Args:
+            status: Only return jobs in this state
+            limit: Maximum number of jobs
+
+        Returns:
+            List of job dictionaries, newest first
+        """
+        return self.store.list(status, limit)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job
+
+        Queued jobs are dropped and running jobs have their process
+        terminated, so both stop immediately.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Updated job dictionary, or None if unknown
+        """
+        if self.store.request_cancel(job_id):
+            with self._lock:
+                if self._waiting.pop(job_id, None) is not None:
+                    self.store.finish(job_id, CANCELLED)
+                process = self._running.get(job_id)
+            if process is not None:
+                process.terminate()
+                process.join(10)
+                with self._wakeup:
+                    self._reap()
+                    self._wakeup.notify()
+        return self.store.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and limits
+
+        Returns:
+            Dictionary with job counts per state and the configured limits
+        """
+        return {
+            "queued": self.store.count(QUEUED),
+            "running": self.store.count(RUNNING),
+            "max_queued": self.max_queued,
+            "max_workers": self.max_workers
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop starting jobs; unfinished jobs are taken over by another live queue or the next start
+
+        Args:
+            wait: Wait for running jobs to finish instead of terminating them
+        """
+        with self._wakeup:
+            self._closing = True
+            self._wakeup.notify()
+            running = list(self._running.values())
+        self._supervisor.join()
+        for process in running:
+            if not wait:
+                process.terminate()
+            process.join()
+        self.store.release(self.owner)
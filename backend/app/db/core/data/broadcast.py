@@ -0,0 +1,232 @@
+import asyncio
+import json
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def diff_state(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the parts of a state that changed
+
+    Nested dictionaries are compared key by key; any other changed value
+    (including lists) is sent whole. Keys missing from the new state are
+    sent as None, which clients apply by deleting the key.
+
+    Args:
+        old: Previous state (None to send everything)
+        new: Current state
+
+    Returns:
+        Dictionary with only the changed and removed keys
+    """
+    if old is None:
+        return new
+    delta = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_state(previous, value)
+            if nested:
+                delta[key] = nested
+        elif key not in old or previous != value:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+
+def merge_delta(pending: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold a newer delta into a pending one, newer values winning
+
+    Neither input is modified, so one delta can be shared by every subscriber.
+    """
+    merged = dict(pending)
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(pending.get(key), dict):
+            merged[key] = merge_delta(pending[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def format_sse(data: Dict[str, Any], event: str, event_id: Optional[str] = None) -> str:
+    """Format one server-sent event"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """
+    One subscriber's mailbox.
+
+    Holds at most one pending delta: deltas published while the subscriber
+    is still sending the previous one are merged into it, so a slow client
+    skips intermediate states instead of queueing them, and its memory is
+    bounded by the size of the state.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._version: Any = None
+        self.delivered = 0
+        self.coalesced = 0
+
+    def offer(self, delta: Dict[str, Any], version: Any):
+        # Called from any thread; never blocks on the subscriber
+        with self._lock:
+            if self._pending is None:
+                self._pending = delta
+            else:
+                self._pending = merge_delta(self._pending, delta)
+                self.coalesced += 1
+            self._version = version
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Event loop already closed; the subscriber is gone
+            pass
+
+    async def next(self, timeout: float) -> Optional[Tuple[Dict[str, Any], Any]]:
+        """
+        Wait for the next (coalesced) delta
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            Tuple of (delta, data version), or None on timeout
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        with self._lock:
+            self._ready.clear()
+            delta, version, self._pending = self._pending, self._version, None
+        if delta is None:
+            return None
+        self.delivered += 1
+        return delta, version
+
+
+class DeltaBroadcaster:
+    """
+    In-process fan-out of state deltas to streaming subscribers.
+
+    On every publish the state is computed and diffed once, then the same
+    delta is handed to each subscriber's mailbox, so N open dashboards cost
+    one computation per data change rather than N polls. Publishing never
+    waits for subscribers (see Subscription).
+    """
+
+    def __init__(self, compute_state: Callable[[], Dict[str, Any]], max_subscribers: int = 500):
+        """
+        Initialize the broadcaster
+
+        Args:
+            compute_state: Function returning the current state as a JSON-serializable dictionary
+            max_subscribers: Maximum number of concurrent subscribers
+        """
+        self.compute_state = compute_state
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, Any]] = None
+        self._version: Any = None
+        self.published = 0
+        self.computations = 0
+
+    def subscribe(self) -> Subscription:
+        """
+        Register a subscriber; must be called on the subscriber's event loop
+
+        Deltas are absolute values, so one published between subscribing and
+        taking the snapshot is safe to apply on top of it.
+
+        Returns:
+            The subscription
+        """
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise RuntimeError(f"Too many subscribers (max {self.max_subscribers})")
+            self._subscribers.add(subscription)
+        return subscription
+
+    def snapshot(self, version: Any) -> Dict[str, Any]:
+        """
+        Get the full state to send a new subscriber first
+
+        Args:
+            version: Current data version; the last computed state is reused while it matches
+
+        Returns:
+            State dictionary
+        """
+        with self._lock:
+            if self._state is None or self._version != version:
+                self._state = self.compute_state()
+                self._version = version
+                self.computations += 1
+            return self._state
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, version: Any) -> int:
+        """
+        Recompute the state for a new data version and push the delta
+
+        Args:
+            version: New data version
+
+        Returns:
+            Number of subscribers the delta was offered to
+        """
+        with self._lock:
+            if not self._subscribers:
+                # Nobody listening; the next subscriber computes a fresh snapshot
+                self._state, self._version = None, None
+                return 0
+            if self._state is not None and self._version == version:
+                return 0
+            previous = self._state
+            self._state = self.compute_state()
+            self._version = version
+            self.computations += 1
+            delta = diff_state(previous, self._state)
+            subscribers = list(self._subscribers)
+            self.published += 1
+        if not delta:
+            return 0
+        for subscription in subscribers:
+            subscription.offer(delta, version)
+        return len(subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get fan-out counters
+
+        Returns:
+            Dictionary with subscribers, publishes, state computations and coalesced deltas
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+            return {
+                "subscribers": len(subscribers),
+                "published": self.published,
+                "computations": self.computations,
+                "delivered": sum(s.delivered for s in subscribers),
+                "coalesced": sum(s.coalesced for s in subscribers)
+            }
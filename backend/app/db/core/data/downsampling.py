@@ -0,0 +1,247 @@
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("lttb", "minmax")
+
+
+def _bucket_rows(start: int, stop: int, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split the index range [start, stop) into near-equal buckets as a padded 2D index
+
+    Returns:
+        Tuple of (indices of shape (n_buckets, max bucket size), validity mask);
+        padding repeats the bucket's last index
+    """
+    edges = start + (np.arange(n_buckets + 1) * (stop - start)) // n_buckets
+    sizes = np.diff(edges)
+    offsets = np.arange(sizes.max())
+    mask = offsets[None, :] < sizes[:, None]
+    rows = edges[:-1, None] + np.minimum(offsets[None, :], sizes[:, None] - 1)
+    return rows, mask
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets
+
+    The first and last points are kept; every bucket in between contributes
+    the point forming the largest triangle with the previously selected point
+    and the next bucket's average. Bucket averages and candidate coordinates
+    are computed for all buckets at once; only the selection, which depends
+    on the previous pick, walks the buckets.
+
+    Args:
+        x: Increasing x values (e.g. epoch seconds)
+        y: Values
+        max_points: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted indices of the selected points
+    """
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    max_points = max(max_points, 3)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    rows, mask = _bucket_rows(1, n - 1, max_points - 2)
+    # Average of each following bucket; the last bucket looks at the last point
+    counts = mask.sum(axis=1)
+    avg_x = np.append((x[rows] * mask).sum(axis=1)[1:] / counts[1:], x[-1])
+    avg_y = np.append((y[rows] * mask).sum(axis=1)[1:] / counts[1:], y[-1])
+    bucket_x, bucket_y = x[rows], y[rows]
+    invalid = ~mask
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(len(rows)):
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i]) * (bucket_y[i] - ay) - (ax - bucket_x[i]) * (avg_y[i] - ay))
+        area[invalid[i] | np.isnan(area)] = -1.0
+        a = rows[i, int(np.argmax(area))]
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Select the minimum and maximum of each bucket
+
+    Fully vectorized and keeps every local extreme at the bucket resolution,
+    which suits noisy series where spikes must stay visible. With max_points
+    of 3 the single bucket keeps only its extreme farthest from the mean.
+
+    Args:
+        y: Values
+        max_points: Maximum number of points to keep (at least 3)
+
+    Returns:
+        Sorted unique indices, including the first and last point
+    """
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    rows, mask = _bucket_rows(0, n, max((max_points - 2) // 2, 1))
+    values = y[rows]
+    valid = mask & ~np.isnan(values)
+    picks = np.arange(len(rows))
+    lowest = rows[picks, np.where(valid, values, np.inf).argmin(axis=1)]
+    highest = rows[picks, np.where(valid, values, -np.inf).argmax(axis=1)]
+    if 2 * len(rows) + 2 > max_points:
+        center = np.nanmean(y)
+        extremes = np.where(np.abs(y[highest] - center) >= np.abs(y[lowest] - center), highest, lowest)
+        return np.unique(np.concatenate(([0, n - 1], extremes)))
+    return np.unique(np.concatenate(([0, n - 1], lowest, highest)))
+
+
+def numeric_x(values: Sequence[Any]) -> np.ndarray:
+    """
+    Convert x values (numbers, dates or date strings) to floats for LTTB
+
+    Falls back to positions when the values are neither numeric nor dates.
+    """
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.number):
+        return array.astype(float)
+    try:
+        return pd.to_datetime(pd.Series(values), utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+    except (ValueError, TypeError):
+        return np.arange(len(array), dtype=float)
+
+
+def downsample_indices(x: Optional[Sequence[Any]], y: Sequence[Any], max_points: int,
+                       method: str = "lttb") -> np.ndarray:
+    """
+    Pick the points to keep when drawing a series with at most max_points points
+
+    Args:
+        x: X values, or None for evenly spaced points
+        y: Values
+        max_points: Maximum number of points
+        method: 'lttb' (preserves the visual shape) or 'minmax' (preserves extremes)
+
+    Returns:
+        Sorted indices into the series
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported downsampling method '{method}', expected one of {METHODS}")
+    y = np.asarray(y, dtype=float)
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    x = np.arange(len(y), dtype=float) if x is None else numeric_x(x)
+    return lttb_indices(x, y, max_points)
+
+
+def downsample_records(records: List[Dict[str, Any]],
+                       max_points: int,
+                       x_key: str,
+                       y_key: str,
+                       method: str = "lttb") -> List[Dict[str, Any]]:
+    """
+    Downsample chart rows, selecting points by one value column
+
+    Args:
+        records: Rows sorted by x
+        max_points: Maximum number of rows
+        x_key: Key of the x value (number or date)
+        y_key: Key of the value that drives the selection
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        The selected rows, whole and in order
+    """
+    if len(records) <= max_points:
+        return records
+    indices = downsample_indices(
+        [row[x_key] for row in records], [row.get(y_key, np.nan) for row in records], max_points, method
+    )
+    return [records[i] for i in indices]
+
+
+class DownsampleCache:
+    """
+    Bounded LRU of downsampled point indices.
+
+    Keyed by the caller (e.g. series id, max_points and method), so repeated
+    chart requests at the usual sizes skip the selection.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of index arrays kept
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def indices(self, key: Hashable, x: Optional[Sequence[Any]], y: Sequence[Any], max_points: int,
+                method: str = "lttb") -> np.ndarray:
+        """
+        Get cached indices for a key, computing them on a miss
+
+        Args:
+            key: Identifies the series and its version
+            x, y, max_points, method: See downsample_indices
+
+        Returns:
+            Sorted indices into the series
+        """
+        key = (key, max_points, method)
+        with self._lock:
+            indices = self._entries.get(key)
+            if indices is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return indices
+            self.misses += 1
+
+        indices = downsample_indices(x, y, max_points, method)
+        with self._lock:
+            self._entries[key] = indices
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return indices
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters
+
+        Returns:
+            Dictionary with cached entries, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[DownsampleCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_downsample_cache() -> DownsampleCache:
+    """
+    Get the process-wide downsample cache, configured from the environment
+
+    Returns:
+        Shared DownsampleCache instance
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DownsampleCache(max_entries=int(os.getenv("DOWNSAMPLE_CACHE_ENTRIES", "512")))
+        return _default_cache
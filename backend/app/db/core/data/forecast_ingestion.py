@@ -0,0 +1,167 @@
+import os
+import logging
+from typing import Iterator, List, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+AGGREGATIONS = ("sum", "mean", "count", "none")
+COLUMNAR_EXTENSIONS = (".parquet", ".pq", ".feather", ".arrow", ".ipc")
+
+
+def _date_range(start_date: Optional[str], end_date: Optional[str]):
+    # End dates without a time include the whole day
+    start = pd.Timestamp(start_date) if start_date else None
+    end = None
+    if end_date:
+        end = pd.Timestamp(end_date)
+        end = end + pd.Timedelta(days=1) if end == end.normalize() else end + pd.Timedelta(1)
+    return start, end
+
+
+def _read_columnar(path: str,
+                   columns: List[str],
+                   date_column: str,
+                   start: Optional[pd.Timestamp],
+                   end: Optional[pd.Timestamp]) -> pd.DataFrame:
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ValueError("Reading Parquet/Arrow files requires pyarrow (pip install pyarrow)")
+
+    file_format = "parquet" if path.lower().endswith((".parquet", ".pq")) else "ipc"
+    dataset = ds.dataset(path, format=file_format)
+
+    # Push the date range down to the scan so row groups outside it are skipped.
+    # String dates are compared by their day prefix, which only widens the scan;
+    # the exact range is applied after loading.
+    field = ds.field(date_column)
+    field_type = dataset.schema.field(date_column).type
+    temporal = pa.types.is_timestamp(field_type) or pa.types.is_date(field_type)
+    condition = None
+    if start is not None:
+        condition = field >= (pa.scalar(start.to_pydatetime()).cast(field_type) if temporal
+                              else start.date().isoformat())
+    if end is not None:
+        upper = (pa.scalar(end.to_pydatetime()).cast(field_type) if temporal
+                 else (end.normalize() + pd.Timedelta(days=1)).date().isoformat())
+        condition = field < upper if condition is None else condition & (field < upper)
+
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def _aggregate(frame: pd.DataFrame,
+               keys: List[str],
+               target_column: str) -> pd.DataFrame:
+    return frame.groupby(keys, sort=False)[target_column].agg(["sum", "count"])
+
+
+def _finalize(partial: pd.DataFrame,
+              keys: List[str],
+              target_column: str,
+              aggregation: str) -> pd.DataFrame:
+    if aggregation == "mean":
+        values = partial["sum"] / partial["count"]
+    elif aggregation == "count":
+        values = partial["count"]
+    else:
+        values = partial["sum"]
+    return values.rename(target_column).reset_index()
+
+
+def _parse_errors_as_value_errors(chunks: Iterator[pd.DataFrame], path: str) -> Iterator[pd.DataFrame]:
+    # read_csv only reads the header up front; malformed rows surface while iterating
+    iterator = iter(chunks)
+    while True:
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        except (ValueError, TypeError, OSError) as e:
+            raise ValueError(f"Cannot parse {path}: {str(e)}") from e
+        yield chunk
+
+
+def load_forecast_series(path: str,
+                         date_column: str,
+                         target_column: str,
+                         series_column: Optional[Union[str, List[str]]] = None,
+                         frequency: Optional[str] = None,
+                         aggregation: str = "none",
+                         start_date: Optional[str] = None,
+                         end_date: Optional[str] = None,
+                         chunk_size: int = 500000) -> pd.DataFrame:
+    """
+    Load only the columns a forecast needs from a CSV, Parquet or Arrow file
+
+    Parquet/Arrow files are scanned with column projection and the date range
+    pushed down as a filter. CSV files are parsed in chunks with explicit
+    dtypes; with a frequency and an aggregation, each chunk is reduced to
+    per-period sums and counts before the next is read, so memory scales
+    with the output series rather than the file.
+
+    Args:
+        path: Path of a .csv, .parquet/.pq or .feather/.arrow/.ipc file
+        date_column: Name of column containing dates
+        target_column: Name of column containing target values
+        series_column: Name of column identifying series, or several key columns
+            (e.g. hierarchy levels), for long-format files
+        frequency: Pandas period frequency to aggregate to (e.g. 'H', 'D', 'W', 'M'); None keeps rows
+        aggregation: 'sum', 'mean' or 'count' per period, or 'none' (default) to keep rows
+        start_date: Only load rows on or after this date
+        end_date: Only load rows on or before this date
+        chunk_size: CSV rows parsed per chunk
+
+    Returns:
+        DataFrame with the series, date (period start) and target columns, sorted by series and date
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation '{aggregation}', expected one of {AGGREGATIONS}")
+    if not os.path.exists(path):
+        raise ValueError(f"File not found: {path}")
+
+    start, end = _date_range(start_date, end_date)
+    series_columns = [series_column] if isinstance(series_column, str) else list(series_column or [])
+    columns = series_columns + [date_column, target_column]
+    keys = series_columns + [date_column]
+    aggregate = frequency is not None and aggregation != "none"
+
+    if path.lower().endswith(COLUMNAR_EXTENSIONS):
+        chunks = [_read_columnar(path, columns, date_column, start, end)]
+    else:
+        dtypes = {target_column: "float64", date_column: "string"}
+        dtypes.update({column: "string" for column in series_columns})
+        try:
+            chunks = _parse_errors_as_value_errors(
+                pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_size), path
+            )
+        except ValueError as e:
+            raise ValueError(f"Cannot read columns {columns} from {path}: {str(e)}")
+
+    parts, rows_read = [], 0
+    for chunk in chunks:
+        rows_read += len(chunk)
+        chunk[date_column] = pd.to_datetime(chunk[date_column], errors="coerce")
+        chunk = chunk.dropna(subset=[date_column, target_column])
+        if start is not None:
+            chunk = chunk[chunk[date_column] >= start]
+        if end is not None:
+            chunk = chunk[chunk[date_column] < end]
+        if aggregate:
+            chunk = chunk.assign(**{date_column: chunk[date_column].dt.to_period(frequency).dt.start_time})
+            partial = _aggregate(chunk, keys, target_column)
+            # Fold into one running partial so only the output-sized result is retained
+            parts = [pd.concat(parts + [partial]).groupby(level=list(range(len(keys)))).sum()]
+        else:
+            parts.append(chunk[columns])
+
+    if aggregate:
+        result = _finalize(parts[0], keys, target_column, aggregation) if parts else pd.DataFrame(columns=columns)
+    else:
+        result = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+
+    result = result[columns].sort_values(keys, kind="stable")
+    logger.info(f"Loaded {len(result)} rows for forecasting from {rows_read} rows of {path}")
+    return result.reset_index(drop=True)
@@ -0,0 +1,408 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from app.core.data.rollup_index import RollupIndex, ALL, LEVELS, SUM_COLUMNS, bucket_ceil
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_LABELS = ("positive", "neutral", "negative")
+SENTIMENT_SCORES = {"positive": 1.0, "neutral": 0.5, "negative": 0.0}
+INTERACTION_COLUMNS = ("likes", "retweets", "upvotes", "comments", "helpful_votes")
+
+# Columns of transformed pipeline files the store reads; everything else is skipped
+_INGEST_COLUMNS = {
+    "timestamp", "platform", "product", "sentiment", "predicted_sentiment",
+    "sentiment_score", "engagement_score", *INTERACTION_COLUMNS
+}
+_KEYS = ["hour", "platform", "product", "sentiment"]
+_SUMS = SUM_COLUMNS
+
+
+def aggregate_records(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce scored records to per-hour sums
+
+    The model prediction (predicted_sentiment) is used where present, the
+    source label (sentiment) otherwise.
+
+    Args:
+        df: Records with a timestamp and sentiment label, and optional platform,
+            product, sentiment_score, engagement_score and interaction count columns
+
+    Returns:
+        DataFrame with one row per hour (UTC epoch seconds of its start),
+        platform, product and sentiment, and posts, score_sum, engagement_sum
+        and interactions columns
+    """
+    if df.empty:
+        return pd.DataFrame(columns=_KEYS + _SUMS)
+
+    label = df["predicted_sentiment"] if "predicted_sentiment" in df.columns else df.get("sentiment")
+    if label is None:
+        raise ValueError("Records need a 'sentiment' or 'predicted_sentiment' column")
+    label = label.fillna("neutral").astype(str).str.lower()
+    if "timestamp" not in df.columns:
+        raise ValueError("Records need a 'timestamp' column")
+
+    # Naive timestamps are taken as UTC
+    timestamps = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
+    frame = pd.DataFrame({
+        "hour": timestamps.dt.floor("h"),
+        "platform": df["platform"].fillna("unknown").astype(str) if "platform" in df.columns else "unknown",
+        "product": df["product"].fillna("").astype(str) if "product" in df.columns else "",
+        "sentiment": label,
+        "posts": 1
+    })
+    if "sentiment_score" in df.columns and "predicted_sentiment" not in df.columns:
+        frame["score_sum"] = pd.to_numeric(df["sentiment_score"], errors="coerce").fillna(0.5)
+    else:
+        frame["score_sum"] = label.map(SENTIMENT_SCORES).fillna(0.5)
+    frame["engagement_sum"] = (pd.to_numeric(df["engagement_score"], errors="coerce").fillna(0.0)
+                               if "engagement_score" in df.columns else 0.0)
+    interactions = [c for c in INTERACTION_COLUMNS if c in df.columns]
+    frame["interactions"] = (df[interactions].apply(pd.to_numeric, errors="coerce").fillna(0).sum(axis=1)
+                             if interactions else 0)
+
+    frame = frame.dropna(subset=["hour"])
+    frame["hour"] = (frame["hour"] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+    return frame.groupby(_KEYS, as_index=False)[_SUMS].sum()
+
+
+class MetricsStore:
+    """
+    Pre-aggregated dashboard metrics in SQLite.
+
+    Records are folded into hour/day/week rollups (posts, sentiment score,
+    engagement, interactions per platform, product and sentiment) as they
+    arrive, so dashboard reads touch a few rows per bucket of the window no
+    matter how many raw records were ingested. Every write bumps a data
+    version and a freshness timestamp; for live sentiment results the bump
+    is deferred so it happens at most once per min_touch_interval.
+    """
+
+    def __init__(self, path: str, min_touch_interval: float = 1.0):
+        """
+        Initialize the store
+
+        Args:
+            path: Path of the SQLite database file
+            min_touch_interval: Minimum seconds between version bumps caused by record_sentiment
+        """
+        self.path = path
+        self.min_touch_interval = min_touch_interval
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._last_touch = 0.0
+        self._touch_pending = False
+        self._touch_timer: Optional[threading.Timer] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.rollup = RollupIndex(self._conn)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingested_files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, "
+            "rows INTEGER NOT NULL, ingested_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "name TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _touch(self):
+        # Called inside a write transaction
+        self._conn.execute(
+            "INSERT INTO store_meta (key, value) VALUES ('version', 1) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('updated_at', ?)", (time.time(),)
+        )
+        self._last_touch = time.monotonic()
+        self._touch_pending = False
+
+    def _flush_deferred_touch(self):
+        with self._lock:
+            self._touch_timer = None
+            if not self._touch_pending:
+                return
+            with self._conn:
+                self._touch()
+        self._notify()
+
+    def _notify(self):
+        # Called after a write transaction has committed
+        if not self._listeners:
+            return
+        freshness = self.freshness()
+        for listener in list(self._listeners):
+            try:
+                listener(freshness)
+            except Exception as e:
+                logger.warning(f"Metrics store listener failed: {str(e)}")
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Call a function after every write, e.g. to drop cached responses
+
+        Args:
+            callback: Function called with the new freshness (see freshness())
+        """
+        self._listeners.append(callback)
+
+    def touch(self):
+        """Bump the data version without changing data, invalidating every derived cache"""
+        with self._lock, self._conn:
+            self._touch()
+        self._notify()
+
+    def ingest_frame(self, df: pd.DataFrame) -> int:
+        """
+        Fold scored records into the aggregates
+
+        Args:
+            df: Records as accepted by aggregate_records
+
+        Returns:
+            Number of records ingested
+        """
+        aggregated = aggregate_records(df)
+        if aggregated.empty:
+            return 0
+        with self._lock, self._conn:
+            self.rollup.add(aggregated)
+            self._touch()
+        self._notify()
+        return int(aggregated["posts"].sum())
+
+    def ingest_file(self, path: str, chunk_size: int = 200000) -> Dict[str, Any]:
+        """
+        Fold a transformed pipeline CSV into the aggregates, once
+
+        Only the columns the aggregates need are parsed, in chunks. The whole
+        file is applied in one transaction; a file already ingested with the
+        same size and modification time is skipped.
+
+        Args:
+            path: Path of a transformed_data_*.csv file
+            chunk_size: Rows parsed per chunk
+
+        Returns:
+            Dictionary with the rows ingested and whether the file was skipped
+        """
+        if not os.path.exists(path):
+            raise ValueError(f"File not found: {path}")
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT size, mtime, rows FROM ingested_files WHERE path = ?", (path,)
+            ).fetchone()
+        if known is not None:
+            if known[0] == stat.st_size and known[1] == stat.st_mtime:
+                return {"path": path, "rows": known[2], "skipped": True}
+            raise ValueError(f"{path} was already ingested and has changed since; "
+                             "write new data to a new file")
+
+        partials = []
+        rows = 0
+        for chunk in pd.read_csv(path, usecols=lambda column: column in _INGEST_COLUMNS,
+                                 chunksize=chunk_size):
+            rows += len(chunk)
+            partials.append(aggregate_records(chunk))
+            if len(partials) > 1:
+                partials = [pd.concat(partials).groupby(_KEYS, as_index=False)[_SUMS].sum()]
+
+        with self._lock, self._conn:
+            if partials and not partials[0].empty:
+                self.rollup.add(partials[0])
+            self._conn.execute(
+                "INSERT INTO ingested_files (path, size, mtime, rows, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime, rows, time.time())
+            )
+            self._touch()
+        self._notify()
+        logger.info(f"Ingested {rows} rows from {path} into the metrics store")
+        return {"path": path, "rows": rows, "skipped": False}
+
+    def record_sentiment(self,
+                         results: Iterable[Dict[str, Any]],
+                         platform: str,
+                         product: Optional[str] = None,
+                         timestamp: Optional[datetime] = None) -> int:
+        """
+        Fold sentiment analysis results into the aggregates
+
+        Args:
+            results: Results with a 'sentiment' label
+            platform: Platform the texts came from
+            product: Product the texts are about
+            timestamp: Time of the texts, UTC if naive (now if omitted)
+
+        Returns:
+            Number of results recorded
+        """
+        labels = [result.get("sentiment") for result in results]
+        aggregated = aggregate_records(pd.DataFrame({
+            "timestamp": timestamp or datetime.now(timezone.utc),
+            "platform": platform,
+            "product": product or "",
+            "predicted_sentiment": labels
+        }))
+        if aggregated.empty:
+            return 0
+
+        # Called per analyzed request: bump the version (dropping every cached
+        # dashboard response) at most once per interval, later writes in the
+        # interval are covered by one deferred bump
+        with self._lock, self._conn:
+            self.rollup.add(aggregated)
+            wait = self._last_touch + self.min_touch_interval - time.monotonic()
+            if wait <= 0:
+                self._touch()
+            else:
+                self._touch_pending = True
+                if self._touch_timer is None:
+                    self._touch_timer = threading.Timer(wait, self._flush_deferred_touch)
+                    self._touch_timer.daemon = True
+                    self._touch_timer.start()
+        if wait <= 0:
+            self._notify()
+        return int(aggregated["posts"].sum())
+
+    def put_snapshot(self, name: str, value: Dict[str, Any]):
+        """
+        Store a precomputed payload, e.g. the dashboard's demand forecast
+
+        Args:
+            name: Snapshot name
+            value: JSON-serializable payload
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (name, value, updated_at) VALUES (?, ?, ?)",
+                (name, json.dumps(value, default=str), time.time())
+            )
+            self._touch()
+        self._notify()
+
+    def get_snapshot(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM snapshots WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def freshness(self) -> Dict[str, Any]:
+        """
+        Get the data version and the time of the last write
+
+        Returns:
+            Dictionary with version (0 if never written) and updated_at (ISO 8601 or None)
+        """
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM store_meta").fetchall())
+        updated_at = meta.get("updated_at")
+        return {
+            "version": int(meta.get("version", 0)),
+            "updated_at": datetime.fromtimestamp(updated_at, timezone.utc).isoformat() if updated_at else None
+        }
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self.rollup.bounds() is None
+
+    def daily_totals(self, days: Optional[int] = None) -> pd.DataFrame:
+        """
+        Get per-day, per-sentiment sums over all platforms and products
+
+        Args:
+            days: Only the last N days up to the latest day with data (all if None)
+
+        Returns:
+            DataFrame with day, sentiment and the summed columns, sorted by day
+        """
+        query = ("SELECT bucket, sentiment, posts, score_sum, engagement_sum, interactions FROM rollup "
+                 "WHERE level = 'day' AND platform = ? AND product = ?")
+        params: List[Any] = [ALL, ALL]
+        with self._lock:
+            bounds = self.rollup.bounds()
+            if days is not None and bounds is not None:
+                query += " AND bucket >= ?"
+                params.append(int(bucket_ceil(bounds[1], "day")) - int(days) * LEVELS["day"])
+            rows = self._conn.execute(query + " ORDER BY bucket", params).fetchall()
+        frame = pd.DataFrame(rows, columns=["day", "sentiment"] + _SUMS)
+        frame["day"] = pd.to_datetime(frame["day"], unit="s").dt.strftime("%Y-%m-%d")
+        return frame
+
+    def sentiment_series(self,
+                         start: Optional[datetime] = None,
+                         end: Optional[datetime] = None,
+                         granularity: str = "day",
+                         platform: Optional[str] = None,
+                         product: Optional[str] = None,
+                         days: int = 30) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Get per-bucket, per-sentiment sums over a time range from the rollups
+
+        Args:
+            start: Range start (UTC if naive); `days` before end if omitted
+            end: Range end, exclusive (UTC if naive); the end of the latest data if omitted
+            granularity: 'hour', 'day' or 'week'
+            platform: Only this platform (all if None)
+            product: Only this product (all if None)
+            days: Range length when start is omitted
+
+        Returns:
+            Tuple of (DataFrame with bucket start timestamps, sentiment and the
+            summed columns; read statistics)
+        """
+        with self._lock:
+            bounds = self.rollup.bounds()
+            if bounds is None:
+                return pd.DataFrame(columns=["bucket", "sentiment"] + _SUMS), {"segments": 0, "rows_read": 0}
+            end_s = _epoch_seconds(end) if end is not None else int(bucket_ceil(bounds[1], granularity))
+            start_s = _epoch_seconds(start) if start is not None else end_s - int(days) * LEVELS["day"]
+            frame, stats = self.rollup.query(start_s, end_s, granularity, platform, product)
+        frame["bucket"] = pd.to_datetime(frame["bucket"], unit="s")
+        return frame, stats
+
+
+def _epoch_seconds(value: datetime) -> int:
+    timestamp = pd.Timestamp(value)
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+    return int(timestamp.timestamp())
+
+
+_default_store: Optional[MetricsStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_metrics_store() -> MetricsStore:
+    """
+    Get the process-wide dashboard metrics store, configured from the environment
+
+    Returns:
+        Shared MetricsStore instance
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MetricsStore(os.getenv("METRICS_STORE_PATH", "data/cache/dashboard_metrics.sqlite"))
+        return _default_store
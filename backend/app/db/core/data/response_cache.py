@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(path: str, params: Iterable[Tuple[str, str]], data_version: str) -> str:
+    """
+    Build a strong ETag for a response
+
+    The tag depends only on the request and the version of the data behind
+    it, so it is known before the response is computed.
+
+    Args:
+        path: Request path
+        params: Query parameters as (name, value) pairs
+        data_version: Version token of the underlying data
+
+    Returns:
+        Quoted ETag value
+    """
+    query = "&".join(f"{name}={value}" for name, value in sorted(params))
+    digest = hashlib.sha256(f"{path}?{query}\x00{data_version}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, RFC 9110)
+
+    Args:
+        if_none_match: Header value, a list of tags or "*"
+        etag: Current ETag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Bounded LRU of serialized responses keyed by ETag.
+
+    Since ETags include the data version, entries for old data are never
+    served again; invalidate() drops them eagerly after a write.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of responses kept
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, etag: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return body
+
+    def put(self, etag: str, body: bytes):
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, *args: Any) -> int:
+        """
+        Drop every cached response
+
+        Accepts and ignores arguments so it can be registered as a store write listener.
+
+        Returns:
+            Number of responses dropped
+        """
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+        if dropped:
+            logger.info(f"Invalidated {dropped} cached dashboard responses")
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters
+
+        Returns:
+            Dictionary with cached responses, hits, misses and 304 responses
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(body) for body in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified
+            }
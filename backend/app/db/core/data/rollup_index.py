@@ -0,0 +1,179 @@
+import sqlite3
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bucket widths in seconds, finest first; each level nests in the next
+LEVELS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+LEVEL_ORDER = ("hour", "day", "week")
+# Weeks start on Monday; 1970-01-05 is the first Monday after the epoch
+_WEEK_OFFSET = 4 * 86400
+# Dimension value of rollups over all platforms or products
+ALL = "*"
+
+SUM_COLUMNS = ["posts", "score_sum", "engagement_sum", "interactions"]
+
+
+def bucket_floor(seconds, level: str):
+    """Start of the bucket containing each UTC epoch second"""
+    width = LEVELS[level]
+    offset = _WEEK_OFFSET if level == "week" else 0
+    return (seconds - offset) // width * width + offset
+
+
+def bucket_ceil(seconds, level: str):
+    """Start of the first bucket at or after each UTC epoch second"""
+    width = LEVELS[level]
+    return bucket_floor(seconds + width - 1, level)
+
+
+def decompose_range(start: int, end: int, granularity: str) -> List[Tuple[str, int, int]]:
+    """
+    Cover a time range with the fewest pre-aggregated buckets
+
+    The aligned interior is read at the requested granularity; the partial
+    buckets at either edge are filled from successively finer levels. The
+    range is widened to whole hours.
+
+    Args:
+        start: Range start, UTC epoch seconds (inclusive)
+        end: Range end, UTC epoch seconds (exclusive)
+        granularity: Coarsest level to use ('hour', 'day' or 'week')
+
+    Returns:
+        List of (level, segment start, segment end) in time order
+    """
+    levels = LEVEL_ORDER[:LEVEL_ORDER.index(granularity) + 1]
+
+    def split(lo: int, hi: int, depth: int) -> List[Tuple[str, int, int]]:
+        if lo >= hi:
+            return []
+        level = levels[depth]
+        if depth == 0:
+            return [(level, lo, hi)]
+        first, last = int(bucket_ceil(lo, level)), int(bucket_floor(hi, level))
+        if first >= last:
+            return split(lo, hi, depth - 1)
+        return split(lo, first, depth - 1) + [(level, first, last)] + split(last, hi, depth - 1)
+
+    return split(int(bucket_floor(start, "hour")), int(bucket_ceil(end, "hour")), len(levels) - 1)
+
+
+class RollupIndex:
+    """
+    Multi-resolution time rollups of sentiment metrics in SQLite.
+
+    Every hour, day and week bucket holds post counts and score, engagement
+    and interaction sums per sentiment for each platform/product pair, and
+    for all platforms and/or all products (ALL). Writes start from hourly
+    partials; day and week buckets are derived from them before upserting.
+    Queries read the few rows of the covering buckets, never raw records.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Initialize the index
+
+        Args:
+            conn: SQLite connection; the caller serializes access and commits
+        """
+        self._conn = conn
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup ("
+            "level TEXT NOT NULL, platform TEXT NOT NULL, product TEXT NOT NULL, "
+            "bucket INTEGER NOT NULL, sentiment TEXT NOT NULL, posts INTEGER NOT NULL, "
+            "score_sum REAL NOT NULL, engagement_sum REAL NOT NULL, interactions REAL NOT NULL, "
+            "PRIMARY KEY (level, platform, product, bucket, sentiment)) WITHOUT ROWID"
+        )
+
+    def add(self, hourly: pd.DataFrame) -> int:
+        """
+        Fold hourly partial sums into every level and dimension rollup
+
+        Args:
+            hourly: DataFrame with hour (UTC epoch seconds of the hour start),
+                platform, product, sentiment and the SUM_COLUMNS
+
+        Returns:
+            Number of rollup rows written
+        """
+        if hourly.empty:
+            return 0
+        parts = []
+        for level in LEVEL_ORDER:
+            frame = hourly.assign(bucket=bucket_floor(hourly["hour"].to_numpy(dtype=np.int64), level))
+            for platform_all, product_all in ((False, False), (False, True), (True, False), (True, True)):
+                rolled = frame.assign(
+                    **({"platform": ALL} if platform_all else {}), **({"product": ALL} if product_all else {})
+                ).groupby(["platform", "product", "bucket", "sentiment"], as_index=False)[SUM_COLUMNS].sum()
+                parts.append(rolled.assign(level=level))
+        rows = pd.concat(parts, ignore_index=True)
+        self._conn.executemany(
+            "INSERT INTO rollup (level, platform, product, bucket, sentiment, posts, score_sum, "
+            "engagement_sum, interactions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (level, platform, product, bucket, sentiment) DO UPDATE SET "
+            "posts = posts + excluded.posts, score_sum = score_sum + excluded.score_sum, "
+            "engagement_sum = engagement_sum + excluded.engagement_sum, "
+            "interactions = interactions + excluded.interactions",
+            rows[["level", "platform", "product", "bucket", "sentiment"] + SUM_COLUMNS].astype(
+                {"bucket": np.int64, "posts": np.int64}
+            ).itertuples(index=False, name=None)
+        )
+        return len(rows)
+
+    def bounds(self) -> Optional[Tuple[int, int]]:
+        """
+        Get the covered time span
+
+        Returns:
+            Tuple of (first hour start, last hour end) in UTC epoch seconds, or None if empty
+        """
+        row = self._conn.execute(
+            "SELECT MIN(bucket), MAX(bucket) FROM rollup WHERE level = 'hour' AND platform = ? AND product = ?",
+            (ALL, ALL)
+        ).fetchone()
+        return None if row[0] is None else (int(row[0]), int(row[1]) + LEVELS["hour"])
+
+    def query(self,
+              start: int,
+              end: int,
+              granularity: str = "day",
+              platform: Optional[str] = None,
+              product: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Get per-bucket, per-sentiment sums over a time range
+
+        Args:
+            start: Range start, UTC epoch seconds (inclusive)
+            end: Range end, UTC epoch seconds (exclusive)
+            granularity: Output bucket size ('hour', 'day' or 'week')
+            platform: Only this platform (all if None)
+            product: Only this product (all if None)
+
+        Returns:
+            Tuple of (DataFrame with bucket, sentiment and the SUM_COLUMNS, sorted
+            by bucket; statistics with the segments and rows read)
+        """
+        if granularity not in LEVELS:
+            raise ValueError(f"Unsupported granularity '{granularity}', expected one of {LEVEL_ORDER}")
+        if end <= start:
+            raise ValueError("end must be after start")
+
+        segments = decompose_range(start, end, granularity)
+        rows = []
+        for level, lo, hi in segments:
+            rows.extend(self._conn.execute(
+                "SELECT bucket, sentiment, posts, score_sum, engagement_sum, interactions FROM rollup "
+                "WHERE level = ? AND platform = ? AND product = ? AND bucket >= ? AND bucket < ?",
+                (level, platform or ALL, product or ALL, lo, hi)
+            ).fetchall())
+
+        frame = pd.DataFrame(rows, columns=["bucket", "sentiment"] + SUM_COLUMNS)
+        # Edge buckets read at finer levels fold into their output bucket
+        frame["bucket"] = bucket_floor(frame["bucket"].to_numpy(dtype=np.int64), granularity)
+        result = frame.groupby(["bucket", "sentiment"], as_index=False)[SUM_COLUMNS].sum().sort_values("bucket")
+        return result.reset_index(drop=True), {"segments": len(segments), "rows_read": len(rows)}
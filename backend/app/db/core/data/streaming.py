@@ -0,0 +1,145 @@
+import json
+import logging
+import tempfile
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_lines(byte_chunks: AsyncIterator[bytes], max_line_bytes: int = 1024 * 1024) -> AsyncIterator[str]:
+    """
+    Split an async stream of byte chunks into lines
+
+    Only the current partial line is buffered, so memory stays bounded no
+    matter how large the upload is.
+
+    Args:
+        byte_chunks: Async iterator of raw body chunks
+        max_line_bytes: Maximum size of a single line
+
+    Returns:
+        Async iterator of decoded, non-empty lines
+    """
+    buffer = b""
+    async for chunk in byte_chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line exceeds {max_line_bytes} bytes")
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line.decode("utf-8")
+
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer.decode("utf-8")
+
+
+async def spool_body(byte_chunks: AsyncIterator[bytes],
+                     max_memory_bytes: int = 8 * 1024 * 1024) -> tempfile.SpooledTemporaryFile:
+    """
+    Read a request body into a spooled temporary file
+
+    The body has to be read before a StreamingResponse starts: while it runs,
+    Starlette's disconnect listener also receives from the client and throws
+    away body messages, so a body read from the response generator loses
+    chunks or never ends. Spooling keeps memory bounded, since bodies larger
+    than max_memory_bytes spill to disk.
+
+    Args:
+        byte_chunks: Async iterator of raw body chunks (request.stream())
+        max_memory_bytes: Size above which the body is moved to disk
+
+    Returns:
+        Spooled file positioned at the start; the caller closes it
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes)
+    try:
+        async for chunk in byte_chunks:
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def iter_spooled(spool: tempfile.SpooledTemporaryFile, read_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """
+    Read a spooled body back as an async stream of chunks
+
+    Args:
+        spool: File returned by spool_body
+        read_size: Bytes per chunk
+
+    Returns:
+        Async iterator of raw body chunks
+    """
+    while True:
+        chunk = spool.read(read_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_text_record(line: str, ndjson: bool = True) -> Dict[str, Any]:
+    """
+    Parse one input line into a text record
+
+    Args:
+        line: A single input line
+        ndjson: Whether the line is JSON (a string or an object with a "text" field)
+
+    Returns:
+        Dictionary with a "text" key and an optional "id" key
+    """
+    if not ndjson:
+        return {"text": line}
+
+    value = json.loads(line)
+    if isinstance(value, str):
+        return {"text": value}
+    if isinstance(value, dict) and isinstance(value.get("text"), str):
+        record = {"text": value["text"]}
+        if "id" in value:
+            record["id"] = value["id"]
+        return record
+    raise ValueError("Each NDJSON line must be a string or an object with a 'text' field")
+
+
+async def iter_record_chunks(byte_chunks: AsyncIterator[bytes],
+                             chunk_size: int,
+                             offset: int = 0,
+                             ndjson: bool = True) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Group streamed records into fixed-size chunks, skipping already processed ones
+
+    Args:
+        byte_chunks: Async iterator of raw body chunks
+        chunk_size: Number of records per chunk
+        offset: Number of leading records to skip (for resuming)
+        ndjson: Whether lines are JSON encoded
+
+    Returns:
+        Async iterator of (index of first record, records) tuples
+    """
+    index = 0
+    start = offset
+    chunk: List[Dict[str, Any]] = []
+    async for line in iter_lines(byte_chunks):
+        if index < offset:
+            index += 1
+            continue
+        try:
+            chunk.append(parse_text_record(line, ndjson=ndjson))
+        except ValueError as e:
+            raise ValueError(f"Invalid record at index {index}: {str(e)}")
+        index += 1
+        if len(chunk) >= chunk_size:
+            yield start, chunk
+            start = index
+            chunk = []
+
+    if chunk:
+        yield start, chunk
@@ -0,0 +1,178 @@
+import argparse
+import json
+import random
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_POSITIVE_WORDS = ("love", "great", "amazing", "excellent", "best", "fantastic", "recommend", "impressed")
+_NEGATIVE_WORDS = ("disappointed", "terrible", "frustrated", "bad", "poor", "waste", "avoid", "issues", "not ")
+
+
+def _stub_sentiment(text: str) -> Dict[str, Any]:
+    lowered = text.lower()
+    score = sum(word in lowered for word in _POSITIVE_WORDS) - sum(word in lowered for word in _NEGATIVE_WORDS)
+    if score > 0:
+        return {"sentiment": "positive", "confidence": 0.9}
+    if score < 0:
+        return {"sentiment": "negative", "confidence": 0.9}
+    return {"sentiment": "neutral", "confidence": 0.6}
+
+
+class StubCompletionServer:
+    """
+    Local stand-in for the OpenAI chat completion API.
+
+    Answers packed sentiment prompts in the format AsyncOpenAISentimentBackend
+    sends, with configurable latency and injected 429/500 errors, so the backend
+    can be exercised offline.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.05,
+                 rate_limit_rate: float = 0.0,
+                 error_rate: float = 0.0,
+                 retry_after: Optional[float] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize the stub server
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds each response is delayed
+            rate_limit_rate: Fraction of requests answered with 429
+            error_rate: Fraction of requests answered with 500
+            retry_after: Retry-After header value sent with 429 responses
+            seed: Random seed for reproducible error injection
+        """
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                stub._track(1)
+                try:
+                    time.sleep(stub.latency)
+                    status, payload, headers = stub._respond(self.path, request)
+                finally:
+                    stub._track(-1)
+                self._send_json(status, payload, headers)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _track(self, delta: int):
+        with self._lock:
+            if delta > 0:
+                self.requests += 1
+            self.in_flight += delta
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _respond(self, path: str, request: Dict[str, Any]):
+        if not path.endswith("/chat/completions"):
+            return 404, {"error": {"message": "Not found"}}, None
+
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+            return 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}, headers
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500, {"error": {"message": "Internal server error", "type": "server_error"}}, None
+
+        items: List[Dict[str, Any]] = json.loads(request["messages"][-1]["content"])
+        results = [{"index": item["index"], **_stub_sentiment(item["text"])} for item in items]
+        prompt_tokens = sum(len(m.get("content", "")) for m in request["messages"]) // 4
+        return 200, {
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "model": request.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps({"results": results})},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 20 * len(results)}
+        }, None
+
+    def start(self) -> "StubCompletionServer":
+        """Serve requests from a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="openai-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubCompletionServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    """Run the stub server in the foreground"""
+    parser = argparse.ArgumentParser(description="Local stub of the OpenAI chat completion API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubCompletionServer(
+        port=args.port,
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate
+    )
+    print(f"Serving stub completion API at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from app.core.ai import batch_forecasting
+
+
+@pytest.fixture(autouse=True)
+def fresh_executor(monkeypatch):
+    monkeypatch.setattr(batch_forecasting, "_default_executor", None)
+    yield
+    executor = batch_forecasting._default_executor
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def test_empty_worker_setting_uses_cpu_count(monkeypatch):
+    # .env.example ships FORECAST_BATCH_WORKERS= (empty)
+    monkeypatch.setenv("FORECAST_BATCH_WORKERS", "")
+    executor = batch_forecasting.get_default_forecast_executor()
+    assert executor is not None
+    assert executor._max_workers == (os.cpu_count() or 1)
+
+
+def test_zero_workers_disables_pool(monkeypatch):
+    monkeypatch.setenv("FORECAST_BATCH_WORKERS", "0")
+    assert batch_forecasting.get_default_forecast_executor() is None
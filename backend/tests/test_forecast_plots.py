@@ -0,0 +1,30 @@
+import os
+import time
+
+from app.core.ai.forecast_plots import ForecastResultCache
+
+ROWS = [{"ds": "2024-01-01T00:00:00", "yhat": 1.0, "yhat_lower": 0.5, "yhat_upper": 1.5}]
+
+
+def test_forecast_is_served_by_another_worker(tmp_path):
+    issuing = ForecastResultCache(cache_dir=str(tmp_path))
+    forecast_id = issuing.put(ROWS, model_id="model")
+
+    # A separate process only shares the directory
+    other = ForecastResultCache(cache_dir=str(tmp_path))
+    entry = other.get(forecast_id)
+    assert entry["forecast"] == ROWS
+    assert entry["model_id"] == "model"
+    assert other.get("unknown") is None
+
+
+def test_expired_forecasts_are_deleted(tmp_path):
+    cache = ForecastResultCache(max_entries=1, cache_dir=str(tmp_path), max_age_hours=1)
+    old_id = cache.put(ROWS)
+    stale = time.time() - 2 * 3600
+    os.utime(os.path.join(str(tmp_path), f"{old_id}.json"), (stale, stale))
+
+    cache._last_prune = 0.0
+    new_id = cache.put(ROWS)
+    assert cache.get(old_id) is None
+    assert cache.get(new_id) is not None
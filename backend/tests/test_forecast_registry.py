@@ -0,0 +1,62 @@
+import os
+import pickle
+import time
+
+import pandas as pd
+import pytest
+
+from app.core.ai.forecast_registry import ForecastModelRegistry
+
+
+class StubForecaster:
+    def train(self, **kwargs):
+        return {}
+
+
+class FailingForecaster:
+    def train(self, **kwargs):
+        raise ValueError("fit failed")
+
+
+def make_series(offset: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({"date": pd.date_range("2024-01-01", periods=5), "value": range(offset, offset + 5)})
+
+
+def train(registry: ForecastModelRegistry, data: pd.DataFrame, forecaster_class=StubForecaster) -> str:
+    model_id, _, _, _ = registry.get_or_train(data, "date", "value", "stub", factory=lambda model_type: forecaster_class())
+    return model_id
+
+
+def test_failed_training_releases_its_lock(tmp_path):
+    registry = ForecastModelRegistry(cache_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        train(registry, make_series(), FailingForecaster)
+    assert registry._train_locks == {}
+
+
+def test_unloadable_pickle_is_a_miss(tmp_path):
+    registry = ForecastModelRegistry(cache_dir=str(tmp_path))
+    model_id = train(registry, make_series())
+    # Pickled by code whose module no longer exists
+    with open(os.path.join(str(tmp_path), f"{model_id}.pkl"), "wb") as f:
+        f.write(pickle.dumps(StubForecaster()).replace(StubForecaster.__module__.encode(), b"removed_module"))
+
+    reloaded = ForecastModelRegistry(cache_dir=str(tmp_path))
+    assert reloaded.get(model_id) is None
+
+
+def test_cleanup_limits_models_on_disk(tmp_path):
+    registry = ForecastModelRegistry(cache_dir=str(tmp_path), max_on_disk=2, max_age_days=1)
+    model_ids = []
+    for offset in range(3):
+        model_ids.append(train(registry, make_series(offset)))
+        time.sleep(0.01)
+
+    remaining = {name.split(".", 1)[0] for name in os.listdir(str(tmp_path))}
+    assert remaining == set(model_ids[1:])
+
+    stale = time.time() - 2 * 86400
+    for name in os.listdir(str(tmp_path)):
+        os.utime(os.path.join(str(tmp_path), name), (stale, stale))
+    assert registry.cleanup() == 2
+    assert os.listdir(str(tmp_path)) == []
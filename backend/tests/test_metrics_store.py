@@ -0,0 +1,31 @@
+import os
+import time
+
+from app.core.data.metrics_store import MetricsStore
+
+
+def test_record_sentiment_bumps_version_at_most_once_per_interval(tmp_path):
+    store = MetricsStore(os.path.join(str(tmp_path), "metrics.sqlite"), min_touch_interval=60.0)
+    notified = []
+    store.add_listener(notified.append)
+
+    for _ in range(5):
+        store.record_sentiment([{"sentiment": "positive"}], platform="twitter")
+
+    assert store.freshness()["version"] == 1
+    assert len(notified) == 1
+    # The data itself is written right away
+    assert int(store.daily_totals()["posts"].sum()) == 5
+
+
+def test_deferred_version_bump_follows_within_the_interval(tmp_path):
+    store = MetricsStore(os.path.join(str(tmp_path), "metrics.sqlite"), min_touch_interval=0.2)
+    notified = []
+    store.add_listener(notified.append)
+
+    store.record_sentiment([{"sentiment": "positive"}], platform="twitter")
+    store.record_sentiment([{"sentiment": "negative"}], platform="twitter")
+    time.sleep(0.5)
+
+    assert store.freshness()["version"] == 2
+    assert [freshness["version"] for freshness in notified] == [1, 2]
@@ -0,0 +1,43 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.ai.openai_backend import AsyncOpenAISentimentBackend
+
+from openai_stub import StubCompletionServer
+
+
+def make_backend(server: StubCompletionServer, **kwargs) -> AsyncOpenAISentimentBackend:
+    return AsyncOpenAISentimentBackend(api_key="test", base_url=server.base_url, backoff_base=0.01, **kwargs)
+
+
+def test_failed_pack_returns_error_results():
+    with StubCompletionServer(latency=0.0, rate_limit_rate=1.0) as server:
+        backend = make_backend(server, max_retries=1, texts_per_request=2)
+        try:
+            results = backend.analyze_batch(["I love it", "Terrible", "Fine"])
+        finally:
+            backend.close()
+
+    assert [result["text"] for result in results] == ["I love it", "Terrible", "Fine"]
+    assert all(result["sentiment"] == "neutral" and "error" in result for result in results)
+    # Two packs, each tried twice
+    assert server.requests == 4
+    assert backend.stats["failed_texts"] == 3
+
+
+def test_async_calls_from_concurrent_event_loops():
+    with StubCompletionServer(latency=0.02) as server:
+        # One request in flight per loop, so each loop's requests queue on its semaphore
+        backend = make_backend(server, max_concurrency=1, texts_per_request=1)
+        texts = ["I love it", "Terrible service", "Fine"]
+        try:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                runs = [pool.submit(asyncio.run, backend.analyze_batch_async(texts)) for _ in range(2)]
+                async_results = [run.result() for run in runs]
+            blocking = backend.analyze_batch(texts)
+        finally:
+            backend.close()
+
+    for results in async_results + [blocking]:
+        assert [result["sentiment"] for result in results] == ["positive", "negative", "neutral"]
+        assert not any("error" in result for result in results)
@@ -0,0 +1,42 @@
+import ast
+import os
+from typing import Dict
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Backend module -> its copy in the pipeline image, and backend definitions the copy leaves out
+COPIES = {
+    "backend/app/db/core/ai/inference_pool.py": ("data_pipeline/spark/inference_pool.py", set()),
+    "backend/app/db/core/ai/near_duplicates.py": (
+        "data_pipeline/spark/near_duplicates.py", {"_default_index", "analyze_with_dedup"}
+    ),
+}
+
+
+def top_level_definitions(path: str) -> Dict[str, str]:
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            definitions[node.name] = ast.dump(node)
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            definitions[node.targets[0].id] = ast.dump(node)
+    return definitions
+
+
+@pytest.mark.parametrize("backend_path", sorted(COPIES))
+def test_pipeline_copy_matches_backend(backend_path):
+    copy_path, left_out = COPIES[backend_path]
+    if not os.path.exists(os.path.join(REPO_ROOT, copy_path)):
+        pytest.skip("data_pipeline is not part of this checkout")
+
+    backend = top_level_definitions(os.path.join(REPO_ROOT, backend_path))
+    copy = top_level_definitions(os.path.join(REPO_ROOT, copy_path))
+
+    missing = set(backend) - set(copy) - left_out
+    assert not missing, f"{copy_path} lacks {sorted(missing)}"
+    drifted = [name for name in backend if name in copy and backend[name] != copy[name]]
+    assert not drifted, f"{copy_path} differs from {backend_path} in {drifted}"
@@ -20,6 +20,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scrapers.social_media_scraper import SocialMediaScraper
 from spark.data_transformation import DataTransformer
+from spark.inference_pool import ProcessPoolInferenceEngine, build_sentiment_analyzer
+
+def notify_backend(backend_url: str, file_path: str):
+    """Ask the backend to ingest a transformed file into its dashboard metrics"""
+    import requests
+    
+    try:
+        response = requests.post(
+            f"{backend_url.rstrip('/')}/dashboard/ingest",
+            json={"file_path": os.path.abspath(file_path)},
+            timeout=600
+        )
+        response.raise_for_status()
+        logger.info(f"Backend ingested {file_path}: {response.json()}")
+    except Exception as e:
+        logger.error(f"Error notifying backend about {file_path}: {str(e)}")
 
 def main():
     """Main entry point for the data pipeline"""
@@ -32,6 +48,15 @@ def main():
                         help='Number of days to look back')
     parser.add_argument('--output', type=str, default='data', 
                         help='Output directory')
+    parser.add_argument('--similarity-threshold', type=float, default=None,
+                        help='Tag near-duplicate texts above this similarity during transformation')
+    parser.add_argument('--sentiment-workers', type=int, default=int(os.getenv('SENTIMENT_INFERENCE_WORKERS', '0')),
+                        help='Score combined data with a sentiment model on this many worker '
+                             'processes during transformation (0 disables scoring)')
+    parser.add_argument('--backend-url', type=str, default=os.getenv('BACKEND_API_URL'),
+                        help='Backend API base URL to notify after writing transformed data '
+                             '(e.g. http://backend:8000/api); the backend ingests the file and '
+                             'invalidates its cached dashboard responses')
     
     args = parser.parse_args()
     
@@ -93,13 +118,26 @@ def main():
                 os.path.join(args.output, file) for file in latest_files.values()
             ])
             
+            # Score sentiment across worker processes, one model copy per worker
+            if args.sentiment_workers > 0:
+                with ProcessPoolInferenceEngine(build_sentiment_analyzer,
+                                                num_workers=args.sentiment_workers) as engine:
+                    combined_data = transformer.score_sentiment(
+                        combined_data, engine, similarity_threshold=args.similarity_threshold
+                    )
+            
             # Transform and enrich data
-            enriched_data = transformer.enrich_data(combined_data)
+            enriched_data = transformer.enrich_data(
+                combined_data, similarity_threshold=args.similarity_threshold
+            )
             
             # Save transformed data
             transformed_file = os.path.join(args.output, f"transformed_data_{timestamp}.csv")
             enriched_data.to_csv(transformed_file, index=False)
             logger.info(f"Saved transformed data to {transformed_file}")
+            
+            if args.backend_url:
+                notify_backend(args.backend_url, transformed_file)
         except Exception as e:
             logger.error(f"Error in data transformation: {str(e)}")
     
@@ -5,6 +5,8 @@ from typing import List, Dict, Any, Optional
 import os
 from datetime import datetime, timedelta
 
+from spark.near_duplicates import NearDuplicateIndex, dedup_ratio
+
 logger = logging.getLogger(__name__)
 
 class DataTransformer:
@@ -18,6 +20,7 @@ class DataTransformer:
             spark_config: Dictionary of Spark configuration options
         """
         self.spark_config = spark_config or {}
+        self.near_duplicate_index = NearDuplicateIndex()
         logger.info("Initializing DataTransformer")
         
         # In a real application, this would initialize a Spark session
@@ -111,12 +114,75 @@ class DataTransformer:
         
         return combined_df
     
-    def enrich_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def score_sentiment(self, df: pd.DataFrame, engine: Any,
+                        text_column: str = 'text',
+                        chunk_size: int = 4096,
+                        similarity_threshold: Optional[float] = None) -> pd.DataFrame:
+        """
+        Score texts with a sentiment model
+        
+        Args:
+            df: Input DataFrame, e.g. the output of combine_data_sources
+            engine: Object providing analyze_batch(texts), such as the backend's
+                ProcessPoolInferenceEngine for multi-core scoring
+            text_column: Column containing text to score
+            chunk_size: Number of texts sent to the engine at a time
+            similarity_threshold: If set, only one text per near-duplicate cluster
+                is scored and its result is shared with the rest of the cluster
+            
+        Returns:
+            DataFrame with predicted_sentiment and sentiment_confidence columns, plus
+            near_duplicate_cluster when clustering ran (reused by enrich_data)
+        """
+        logger.info(f"Scoring sentiment for {len(df)} rows")
+        
+        # Make a copy to avoid modifying the original
+        scored_df = df.copy()
+        
+        if text_column not in scored_df.columns or scored_df.empty:
+            return scored_df
+        
+        all_texts = scored_df[text_column].fillna("").astype(str).tolist()
+        
+        if similarity_threshold is not None:
+            representatives = self.near_duplicate_index.cluster(all_texts, similarity_threshold)
+            unique, inverse = np.unique(representatives, return_inverse=True)
+            texts = [all_texts[i] for i in unique]
+            logger.info(f"Near-duplicate dedup ratio: {dedup_ratio(representatives)}")
+        else:
+            inverse = None
+            texts = all_texts
+        
+        labels = []
+        confidences = []
+        
+        # Send texts in chunks so the engine can keep all workers busy without holding everything at once
+        for start in range(0, len(texts), chunk_size):
+            results = engine.analyze_batch(texts[start:start + chunk_size])
+            labels.extend(result.get('sentiment') for result in results)
+            confidences.extend(result.get('confidence') for result in results)
+        
+        if inverse is not None:
+            # Expand cluster results back to every row
+            labels = np.array(labels, dtype=object)[inverse]
+            confidences = np.array(confidences, dtype=object)[inverse]
+            scored_df['near_duplicate_cluster'] = representatives
+        
+        scored_df['predicted_sentiment'] = labels
+        scored_df['sentiment_confidence'] = confidences
+        
+        return scored_df
+    
+    def enrich_data(self, df: pd.DataFrame,
+                    similarity_threshold: Optional[float] = None) -> pd.DataFrame:
         """
         Enrich the data with additional features
         
         Args:
             df: Input DataFrame
+            similarity_threshold: If set, tag near-duplicate texts (retweets, template
+                variants, copy-pasted reviews) with a shared near_duplicate_cluster id;
+                clusters already assigned by score_sentiment are kept
             
         Returns:
             Enriched DataFrame
@@ -170,6 +236,14 @@ class DataTransformer:
         if 'text' in enriched_df.columns:
             enriched_df['text_length'] = enriched_df['text'].str.len()
         
+        # Cluster near-duplicate texts so downstream scoring can run once per cluster
+        if (similarity_threshold is not None and 'text' in enriched_df.columns
+                and 'near_duplicate_cluster' not in enriched_df.columns):
+            texts = enriched_df['text'].fillna("").astype(str).tolist()
+            representatives = self.near_duplicate_index.cluster(texts, similarity_threshold)
+            enriched_df['near_duplicate_cluster'] = representatives
+            logger.info(f"Near-duplicate dedup ratio: {dedup_ratio(representatives)}")
+        
         # Calculate moving averages for sentiment (if we have dates)
         if 'date' in enriched_df.columns and 'sentiment_score' in enriched_df.columns:
             # Group by date and calculate daily average sentiment
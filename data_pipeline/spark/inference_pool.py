@@ -0,0 +1,319 @@
+import atexit
+import itertools
+import os
+import queue
+import threading
+import time
+import logging
+import multiprocessing as mp
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Mirrors backend/app/db/core/ai/inference_pool.py; the pipeline image is built
+# separately from the backend, so it carries its own copy.
+# backend/tests/test_pipeline_copies.py fails when the shared definitions drift apart
+
+DEFAULT_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+
+def _configure_threads(intra_op_threads: int):
+    # Must run before torch initializes its thread pools in this process
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(intra_op_threads)
+    try:
+        import torch
+        torch.set_num_threads(intra_op_threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+
+def _worker_main(worker_id: int,
+                 analyzer_factory: Callable[[], Any],
+                 intra_op_threads: int,
+                 task_queue: Any,
+                 result_queue: Any):
+    """Worker process loop: build the model once, then pull shards until told to stop"""
+    _configure_threads(intra_op_threads)
+    try:
+        analyzer = analyzer_factory()
+    except Exception as e:
+        result_queue.put(("failed", worker_id, str(e)))
+        return
+    result_queue.put(("ready", worker_id, None))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, texts = task
+        # Tells the engine which shard is lost if this process dies mid-shard
+        result_queue.put(("started", task_id, worker_id))
+        try:
+            result_queue.put(("result", task_id, analyzer.analyze_batch(texts)))
+        except Exception as e:
+            result_queue.put(("error", task_id, str(e)))
+
+
+class ProcessPoolInferenceEngine:
+    """
+    Shards sentiment batches across a pool of worker processes.
+
+    Each worker loads its own copy of the model with a fixed number of
+    intra-op threads. Shards go through one shared queue that idle workers
+    pull from, so a worker that finishes early immediately takes the next
+    shard instead of waiting behind a slower one. A worker that dies (e.g.
+    OOM-killed) fails only the shard it was working on and is restarted, up
+    to max_restarts times over the engine's lifetime.
+    """
+
+    def __init__(self,
+                 analyzer_factory: Callable[[], Any],
+                 num_workers: Optional[int] = None,
+                 intra_op_threads: Optional[int] = None,
+                 shard_size: int = 32,
+                 start_method: str = "spawn",
+                 max_restarts: int = 3):
+        """
+        Initialize the engine and start the worker processes
+
+        Args:
+            analyzer_factory: Picklable zero-argument function that builds an analyzer in a worker
+            num_workers: Number of worker processes (defaults to cores / intra_op_threads)
+            intra_op_threads: Torch threads per worker (defaults to 2)
+            shard_size: Number of texts sent to a worker at a time
+            start_method: multiprocessing start method ("spawn" avoids forking torch thread pools)
+            max_restarts: Worker restarts allowed before the engine gives up and fails every shard
+        """
+        cores = os.cpu_count() or 1
+        self.intra_op_threads = intra_op_threads or min(2, cores)
+        self.num_workers = num_workers or max(1, cores // self.intra_op_threads)
+        self.shard_size = shard_size
+        self.max_restarts = max_restarts
+        self.restarts = 0
+
+        self._ctx = mp.get_context(start_method)
+        self._analyzer_factory = analyzer_factory
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._closed = False
+        self._error: Optional[str] = None
+        self._ready = set()
+        # Worker id -> id of the shard it last started
+        self._in_flight: Dict[int, int] = {}
+
+        self._processes = [self._start_worker(i) for i in range(self.num_workers)]
+
+        self._collector = threading.Thread(target=self._collect, name="sentiment-pool-collector", daemon=True)
+        self._collector.start()
+        atexit.register(self.shutdown)
+        logger.info(
+            f"Started {self.num_workers} inference workers with {self.intra_op_threads} threads each"
+        )
+
+    def _start_worker(self, worker_id: int) -> Any:
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._analyzer_factory, self.intra_op_threads, self._task_queue, self._result_queue),
+            name=f"sentiment-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def _fail_pending(self, message: str):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(message))
+
+    def _replace_dead_workers(self) -> bool:
+        # Returns False once the restart budget is spent and the engine has failed
+        for worker_id, process in enumerate(self._processes):
+            if process.is_alive():
+                continue
+            self._ready.discard(worker_id)
+            message = f"Inference worker {process.name} exited unexpectedly (exit code {process.exitcode})"
+            logger.error(message)
+            task_id = self._in_flight.pop(worker_id, None)
+            if task_id is not None:
+                with self._pending_lock:
+                    future = self._pending.pop(task_id, None)
+                if future is not None and not future.done():
+                    future.set_exception(RuntimeError(message))
+            if self.restarts >= self.max_restarts:
+                self._error = f"{message}; giving up after {self.restarts} restarts"
+                self._fail_pending(self._error)
+                return False
+            self.restarts += 1
+            self._processes[worker_id] = self._start_worker(worker_id)
+        return True
+
+    def _collect(self):
+        next_check = time.monotonic() + 1.0
+        while True:
+            try:
+                kind, key, payload = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if self._closed:
+                    return
+                kind = None
+            except (EOFError, OSError):
+                return
+
+            if kind == "ready":
+                self._ready.add(key)
+            elif kind == "started":
+                self._in_flight[payload] = key
+            elif kind == "failed":
+                self._error = f"Inference worker {key} failed to load model: {payload}"
+                logger.error(self._error)
+                self._fail_pending(self._error)
+            elif kind is not None:
+                with self._pending_lock:
+                    future = self._pending.pop(key, None)
+                if future is not None:
+                    if kind == "result":
+                        future.set_result(payload)
+                    else:
+                        future.set_exception(RuntimeError(payload))
+
+            # Check for dead workers even while other workers keep results flowing;
+            # after a model load failure every shard fails anyway, so nothing is restarted
+            if time.monotonic() >= next_check and not self._closed and not self._error:
+                next_check = time.monotonic() + 1.0
+                if not self._replace_dead_workers():
+                    return
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue one shard of texts
+
+        Args:
+            texts: Texts to analyze in a single worker call
+
+        Returns:
+            Future resolving to the list of results for the shard
+        """
+        if self._closed:
+            raise RuntimeError("Inference engine has been shut down")
+        if self._error:
+            raise RuntimeError(self._error)
+
+        future: Future = Future()
+        task_id = next(self._task_ids)
+        with self._pending_lock:
+            self._pending[task_id] = future
+        self._task_queue.put((task_id, texts))
+        return future
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of multiple texts across the worker pool
+
+        Args:
+            texts: List of texts to analyze
+
+        Returns:
+            List of dictionaries with sentiment analysis results, in input order
+        """
+        futures = [
+            self.submit(texts[start:start + self.shard_size])
+            for start in range(0, len(texts), self.shard_size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze sentiment of a single text
+
+        Args:
+            text: Text to analyze
+
+        Returns:
+            Dictionary with sentiment analysis results
+        """
+        return self.analyze_batch([text])[0]
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get worker pool status
+
+        Returns:
+            Dictionary with worker counts and outstanding shards
+        """
+        return {
+            "workers": self.num_workers,
+            "ready_workers": len(self._ready),
+            "alive_workers": sum(p.is_alive() for p in self._processes),
+            "restarts": self.restarts,
+            "intra_op_threads": self.intra_op_threads,
+            "pending_shards": len(self._pending),
+            "error": self._error
+        }
+
+    def shutdown(self, timeout: float = 10.0):
+        """
+        Stop the workers after they finish their current shard
+
+        Args:
+            timeout: Seconds to wait for each worker before terminating it
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._fail_pending("Inference engine has been shut down")
+        self._collector.join(timeout)
+        logger.info("Inference workers stopped")
+
+    def __enter__(self) -> "ProcessPoolInferenceEngine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+class TransformersSentimentAnalyzer:
+    """Hugging Face sentiment classifier with the backend's default model and labels"""
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: int = 32):
+        """
+        Load the model
+
+        Args:
+            model_name: Hugging Face model id (defaults to SENTIMENT_MODEL_NAME)
+            batch_size: Number of texts per forward pass
+        """
+        from transformers import pipeline
+
+        self.model_name = model_name or os.getenv("SENTIMENT_MODEL_NAME", DEFAULT_MODEL_NAME)
+        self.batch_size = batch_size
+        self._classifier = pipeline("sentiment-analysis", model=self.model_name, truncation=True)
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        outputs = self._classifier(texts, batch_size=self.batch_size)
+        return [
+            {"text": text, "sentiment": output["label"].lower(), "confidence": float(output["score"])}
+            for text, output in zip(texts, outputs)
+        ]
+
+
+def build_sentiment_analyzer() -> TransformersSentimentAnalyzer:
+    """Analyzer factory for ProcessPoolInferenceEngine workers (must be picklable)"""
+    return TransformersSentimentAnalyzer()
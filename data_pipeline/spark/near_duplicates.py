@@ -0,0 +1,164 @@
+import functools
+import re
+import zlib
+import logging
+import numpy as np
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Mirrors backend/app/db/core/ai/near_duplicates.py; the pipeline image is built
+# separately from the backend, so it carries its own copy.
+# backend/tests/test_pipeline_copies.py fails when the shared definitions drift apart
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=64)
+def optimal_lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick the LSH band/row split that best separates pairs around a threshold
+
+    Minimizes the sum of the false positive and false negative probability
+    mass of the banding S-curve 1 - (1 - s^r)^b.
+
+    Args:
+        threshold: Jaccard similarity threshold
+        num_perm: Number of MinHash permutations
+
+    Returns:
+        Tuple of (bands, rows per band)
+    """
+    s = np.linspace(0.0, 1.0, 201)
+    best, best_error = (num_perm, 1), np.inf
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands < 1:
+            break
+        candidate = 1 - (1 - s ** rows) ** bands
+        # Uniform grid over [0, 1], so the mean approximates the integral
+        false_positive = np.where(s < threshold, candidate, 0.0).mean()
+        false_negative = np.where(s >= threshold, 1 - candidate, 0.0).mean()
+        error = false_positive + false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH near-duplicate detection over short texts.
+
+    Texts are normalized and split into character shingles; MinHash signatures
+    are computed for all permutations at once with NumPy. Candidate pairs come
+    from LSH banding and are verified against the estimated Jaccard similarity
+    to the candidate cluster's representative.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """
+        Initialize the index
+
+        Args:
+            num_perm: Number of MinHash permutations
+            shingle_size: Characters per shingle
+            seed: Seed for the permutation parameters
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        text = _WHITESPACE_RE.sub(" ", text).strip().lower()
+        k = self.shingle_size
+        if len(text) <= k:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + k] for i in range(len(text) - k + 1)}
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute MinHash signatures
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Array of shape (n, num_perm)
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            hashes = self._shingle_hashes(text)
+            # All permutations of all shingles in one broadcast: (num_perm, n_shingles)
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+            signatures[i] = (permuted & _MAX_HASH).min(axis=1)
+        return signatures
+
+    def cluster(self, texts: List[str], threshold: float = 0.8) -> np.ndarray:
+        """
+        Cluster texts whose estimated Jaccard similarity reaches the threshold
+
+        Texts are visited in order; each joins the most similar earlier
+        cluster whose representative it matches, or starts a new one. Every
+        member is therefore within the threshold of its representative, and
+        similarity does not chain (A~B and B~C never pull C in with A).
+
+        Args:
+            texts: List of texts
+            threshold: Minimum similarity for two texts to share a cluster
+
+        Returns:
+            Array with the index of each text's cluster representative (its first member)
+        """
+        n = len(texts)
+        representatives = np.arange(n)
+        if n < 2:
+            return representatives
+
+        signatures = self.signatures(texts)
+        bands, rows = optimal_lsh_params(threshold, self.num_perm)
+        band_sigs = [np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows]) for band in range(bands)]
+        # Per band: bucket key -> representatives of the texts seen in that bucket
+        buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+
+        for i in range(n):
+            keys = [band_sig[i].tobytes() for band_sig in band_sigs]
+            candidates = set()
+            for bucket, key in zip(buckets, keys):
+                candidates.update(bucket.get(key, ()))
+            if candidates:
+                # Verify against the representatives themselves, never through other members
+                candidates = np.array(sorted(candidates))
+                similarity = (signatures[candidates] == signatures[i]).mean(axis=1)
+                best = int(np.argmax(similarity))
+                if similarity[best] >= threshold:
+                    representatives[i] = candidates[best]
+            for bucket, key in zip(buckets, keys):
+                bucket.setdefault(key, set()).add(int(representatives[i]))
+
+        return representatives
+
+_default_index = NearDuplicateIndex()
+
+
+
+def dedup_ratio(representatives: np.ndarray) -> float:
+    """
+    Share of texts that do not need their own inference
+
+    Args:
+        representatives: Cluster representative index per text
+
+    Returns:
+        1 - clusters / texts
+    """
+    if len(representatives) == 0:
+        return 0.0
+    return round(1 - len(np.unique(representatives)) / len(representatives), 4)
@@ -85,6 +85,27 @@ export const forecastApi = {
   },
 };
 
+// Fold a dashboard stream delta into the current state, deleting fields sent as null
+export const applyDashboardDelta = (state, delta) => {
+  const next = { ...state };
+  Object.entries(delta).forEach(([key, value]) => {
+    if (value === null) {
+      delete next[key];
+    } else if (
+      typeof value === "object" &&
+      !Array.isArray(value) &&
+      typeof next[key] === "object" &&
+      next[key] !== null &&
+      !Array.isArray(next[key])
+    ) {
+      next[key] = applyDashboardDelta(next[key], value);
+    } else {
+      next[key] = value;
+    }
+  });
+  return next;
+};
+
 // Dashboard API calls
 export const dashboardApi = {
   // Get dashboard metrics
@@ -110,6 +131,24 @@ export const dashboardApi = {
       throw error;
     }
   },
+
+  // Subscribe to live dashboard updates instead of polling; returns an unsubscribe function.
+  // Deltas hold only changed fields (nested objects are partial) and null for removed
+  // fields; fold them into the snapshot with applyDashboardDelta
+  subscribeToUpdates: (onSnapshot, onDelta) => {
+    const source = new EventSource(`${API_BASE_URL}/dashboard/stream`);
+    source.addEventListener("snapshot", (event) =>
+      onSnapshot(JSON.parse(event.data), event.lastEventId)
+    );
+    source.addEventListener("delta", (event) =>
+      onDelta(JSON.parse(event.data), event.lastEventId)
+    );
+    source.onerror = (error) => {
+      // EventSource reconnects by itself and receives a fresh snapshot
+      console.error("Error in dashboard stream:", error);
+    };
+    return () => source.close();
+  },
 };
 
 export default {